@@ -0,0 +1,11 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+# Route polls, streams and bids to the async views (auctions/urls.py)
+os.environ.setdefault('AUCTION_ASYNC_VIEWS', 'True')
+application = get_asgi_application()
+
+# POST /api/fast/bids/ is answered before Django's middleware stack (auctions/bid_ingest.py)
+from auctions.bid_ingest import BidIngestASGI  # noqa: E402 (needs the app registry)
+application = BidIngestASGI(application)
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'auctions.compression.CompressionMiddleware',  # JSON API responses only
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # Add for i18n
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +61,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'auction_site.wsgi.application'
+ASGI_APPLICATION = 'auction_site.asgi.application'
 
 # Use SQLite for Django internal needs; main data stored in Excel/CSV
 DATABASES = {
@@ -69,6 +71,54 @@ DATABASES = {
     }
 }
 
+# Auction data storage: 'csv' (ExcelAdapter, files in DATA_DIR) or 'sqlite' (SqliteAdapter, WAL mode).
+# Move data between the two with `python sqlite_sync.py import|export`.
+AUCTION_STORAGE_BACKEND = os.getenv('AUCTION_STORAGE_BACKEND', 'csv')
+AUCTION_SQLITE_PATH = os.getenv('AUCTION_SQLITE_PATH', str(DATA_DIR / 'auction.sqlite3'))
+
+# Live updates over Server-Sent Events (api/stream/...). Clients beyond the limit fall back to polling.
+# Under ASGI (run_asgi_server.py) an open stream is just a waiting coroutine:
+AUCTION_SSE_MAX_STREAMS = int(os.getenv('AUCTION_SSE_MAX_STREAMS', '1000'))
+# Under waitress (run_server.py) every open stream holds one of the WAITRESS_THREADS server threads
+# for up to AUCTION_SSE_MAX_SECONDS, taking it from page loads and bids. Streams are therefore off
+# there by default (0); any value set is capped at half the threads.
+WAITRESS_THREADS = int(os.getenv('WAITRESS_THREADS', '64'))
+AUCTION_SSE_WSGI_MAX_STREAMS = min(int(os.getenv('AUCTION_SSE_WSGI_MAX_STREAMS', '0')), WAITRESS_THREADS // 2)
+# Streams are closed after this many seconds and the browser reconnects
+AUCTION_SSE_MAX_SECONDS = int(os.getenv('AUCTION_SSE_MAX_SECONDS', '300'))
+
+# Poll, stream and bid views for the server type. auction_site/asgi.py turns this on, so uvicorn
+# (run_asgi_server.py) gets the async views; WSGI (waitress, runserver) keeps the sync ones, which it
+# calls directly instead of through async_to_sync and a thread-pool hop on every poll and bid.
+AUCTION_ASYNC_VIEWS = os.getenv('AUCTION_ASYNC_VIEWS', 'False') == 'True'
+
+# Thread pools for blocking storage calls made by the async views (ASGI, see run_asgi_server.py).
+# Bids use their own pool so they never wait behind polls.
+AUCTION_READ_WORKERS = int(os.getenv('AUCTION_READ_WORKERS', '8'))
+AUCTION_WRITE_WORKERS = int(os.getenv('AUCTION_WRITE_WORKERS', '4'))
+
+# Group commit of concurrent bids: the bid writer waits this many milliseconds after the first bid of
+# a batch so more bids share its append/fsync. With 0 (default) it never waits; bids that arrive
+# while a write is in progress still go out together in the next one.
+# A batch holds at most one bid per waiting server thread, so raise AUCTION_WRITE_WORKERS (ASGI)
+# or WAITRESS_THREADS along with it.
+AUCTION_BID_GROUP_COMMIT_MS = float(os.getenv('AUCTION_BID_GROUP_COMMIT_MS', '0'))
+
+# Fast bid route (POST /api/fast/bids/, auctions/bid_ingest.py): the product page hands out a
+# signed bidder token valid this many seconds; logging out does not revoke tokens already issued.
+AUCTION_BID_TOKEN_MAX_AGE = int(os.getenv('AUCTION_BID_TOKEN_MAX_AGE', str(12 * 3600)))
+
+# Compression of JSON API responses (polls): brotli when the optional package is installed, else gzip.
+# Smaller responses are sent as they are; the levels trade CPU per poll for bytes on the wire.
+AUCTION_COMPRESS_MIN_SIZE = int(os.getenv('AUCTION_COMPRESS_MIN_SIZE', '512'))
+AUCTION_GZIP_LEVEL = int(os.getenv('AUCTION_GZIP_LEVEL', '6'))
+AUCTION_BROTLI_QUALITY = int(os.getenv('AUCTION_BROTLI_QUALITY', '4'))
+
+# Resized copies of uploaded product photos (needs Pillow; without it pages use the originals).
+# Built in the background under data_photo/_derived/; backfill with `python build_image_derivatives.py`.
+AUCTION_IMAGE_WORKERS = int(os.getenv('AUCTION_IMAGE_WORKERS', '2'))
+AUCTION_IMAGE_WEBP = os.getenv('AUCTION_IMAGE_WEBP', 'True') == 'True'
+
 LANGUAGE_CODE = 'zh-hant'  # Default language
 TIME_ZONE = 'Asia/Taipei'
 USE_I18N = True
@@ -87,9 +137,22 @@ LOCALE_PATHS = [
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+# {% static %} puts the content hash in file names so browsers can cache them for a year.
+# Run `python build_static_assets.py` on deploy to add precompressed .gz/.br copies.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'auctions.static_files.HashedStaticStorage'},
+}
+# runserver serves /static/ itself through the finders, so they must resolve the hashed names too
+STATICFILES_FINDERS = [
+    'auctions.static_files.HashedNameFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
 
 # Media files (User uploaded or data photos)
 MEDIA_URL = '/data_photo/'
 MEDIA_ROOT = BASE_DIR / 'data_photo'
+# Photos keep their names when replaced, so browsers reuse them only this long before revalidating
+AUCTION_MEDIA_MAX_AGE = int(os.getenv('AUCTION_MEDIA_MAX_AGE', '300'))
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
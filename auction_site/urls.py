@@ -1,14 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf.urls.i18n import i18n_patterns
-from django.conf import settings
-from django.views.static import serve
+from auctions.static_files import serve_media, serve_static
 from django.views.i18n import set_language
 
-# Media files served without language prefix
+# Media files served without language prefix (cache headers, 304s, Range: see auctions/static_files.py)
 urlpatterns = [
-    re_path(r'^data_photo/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
-    re_path(r'^static/(?P<path>.*)$', serve, {'document_root': settings.BASE_DIR / 'static'}),
+    re_path(r'^data_photo/(?P<path>.*)$', serve_media),
+    re_path(r'^static/(?P<path>.*)$', serve_static),
     path('i18n/setlang/', set_language, name='set_language'),
 ]
 
@@ -3,3 +3,7 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
 application = get_wsgi_application()
+
+# POST /api/fast/bids/ is answered before Django's middleware stack (auctions/bid_ingest.py)
+from auctions.bid_ingest import BidIngestWSGI  # noqa: E402 (needs the app registry)
+application = BidIngestWSGI(application)
@@ -1,14 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse, HttpResponseForbidden
-from django.conf import settings
 from .services import AdminService, ProductService
-from .excel_adapter import ExcelAdapter
+from .storage import get_adapter, get_service
+
+# The admin pages only manage these picture types
+ADMIN_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
 
 # Initialize services
-# Note: Ideally dependency injection or singleton pattern, but instantiating here is simple for Django
-adapter = ExcelAdapter(settings.DATA_DIR)
-admin_service = AdminService(adapter)
-product_service = ProductService(adapter)
+# Shared with the bidder-facing views through the storage registry, so admin edits
+# reach the same caches and write listeners
+adapter = get_adapter()
+admin_service = get_service(AdminService)
+product_service = get_service(ProductService)
 
 def admin_login_view(request):
     if request.method == 'POST':
@@ -38,23 +41,14 @@ def admin_products_list(request):
     
     products = product_service.get_all_products()
     
-    # 為每個產品添加第一張圖片
+    # 為每個產品添加第一張圖片 (from the in-memory image manifest, no folder scans)
+    image_table = adapter.image_manifest.table()
     for product in products:
-        try:
-            photo_dir = Path(settings.BASE_DIR) / 'data_photo' / str(product['id'])
-            if photo_dir.exists():
-                images = sorted([
-                    f for f in photo_dir.iterdir() 
-                    if f.suffix.lower() in ['.jpg', '.jpeg', '.png']
-                ])
-                if images:
-                    # 使用第一張圖片
-                    product['first_image_url'] = f"/data_photo/{product['id']}/{images[0].name}"
-                else:
-                    product['first_image_url'] = None
-            else:
-                product['first_image_url'] = None
-        except Exception as e:
+        images = [f for f in image_table.get(product['id'], ()) if f.lower().endswith(ADMIN_IMAGE_EXTENSIONS)]
+        if images:
+            # 使用第一張圖片
+            product['first_image_url'] = f"/data_photo/{product['id']}/{images[0]}"
+        else:
             product['first_image_url'] = None
     
     return render(request, 'admin_products_list.html', {'products': products})
@@ -153,15 +147,7 @@ def admin_product_delete(request, product_id):
 def admin_bids_list(request):
     if not request.session.get('is_admin'):
         return redirect('auctions:admin_login')
-    # Use adapter directly or via generic service
-    # Just reading raw CSV is fine for now
-    import pandas as pd
-    f = adapter.bids_path
-    try:
-        df = pd.read_csv(f)
-        bids = df.sort_values('bid_timestamp', ascending=False).to_dict('records')
-    except:
-        bids = []
+    bids = adapter.get_all_bids()
     return render(request, 'admin_bids_list.html', {'bids': bids})
 
 # API endpoints for image management
@@ -173,20 +159,11 @@ from django.views.decorators.http import require_http_methods
 def get_product_images(request, product_id):
     """Get list of existing images for a product"""
     try:
-        photo_dir = Path(settings.BASE_DIR) / 'data_photo' / str(product_id)
-        
-        if not photo_dir.exists():
-            return JsonResponse({'success': True, 'images': []})
-        
-        # Get all image files
-        image_files = []
-        for file in sorted(photo_dir.iterdir()):
-            if file.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                image_files.append({
-                    'filename': file.name,
-                    'url': f'/data_photo/{product_id}/{file.name}'
-                })
-        
+        image_files = [
+            {'filename': name, 'url': f'/data_photo/{product_id}/{name}'}
+            for name in adapter.image_manifest.images(product_id)
+            if name.lower().endswith(ADMIN_IMAGE_EXTENSIONS)
+        ]
         return JsonResponse({'success': True, 'images': image_files})
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)})
@@ -197,16 +174,19 @@ def upload_product_images(request, product_id):
     if not request.session.get('is_admin'):
         return JsonResponse({'success': False, 'message': '未授權'}, status=403)
     
+    manifest = adapter.image_manifest
     try:
-        photo_dir = Path(settings.BASE_DIR) / 'data_photo' / str(product_id)
+        photo_dir = Path(manifest.folder(product_id))
         photo_dir.mkdir(parents=True, exist_ok=True)
         
         # Handle deletions first
         delete_images = request.POST.getlist('delete_images')
         for filename in delete_images:
             file_path = photo_dir / filename
-            if file_path.exists() and file_path.suffix.lower() in ['.jpg', '.jpeg', '.png']:
+            if file_path.exists() and file_path.suffix.lower() in ADMIN_IMAGE_EXTENSIONS:
                 file_path.unlink()
+                adapter.image_derivatives.remove(product_id, filename)
+        manifest.refresh(product_id)
         
         # Get uploaded files
         uploaded_files = request.FILES.getlist('images')
@@ -215,17 +195,16 @@ def upload_product_images(request, product_id):
             return JsonResponse({'success': False, 'message': '沒有檔案上傳'})
         
         # Get existing images to determine numbering
-        existing_images = sorted([
-            f for f in photo_dir.iterdir() 
-            if f.suffix.lower() in ['.jpg', '.jpeg', '.png']
-        ])
+        existing_images = [
+            f for f in manifest.images(product_id) if f.lower().endswith(ADMIN_IMAGE_EXTENSIONS)
+        ]
         next_number = len(existing_images) + 1
         
         uploaded_count = 0
         for file in uploaded_files:
             # Validate file type
             file_ext = os.path.splitext(file.name)[1].lower()
-            if file_ext not in ['.jpg', '.jpeg', '.png']:
+            if file_ext not in ADMIN_IMAGE_EXTENSIONS:
                 continue
             
             # Save with numbered filename
@@ -235,9 +214,12 @@ def upload_product_images(request, product_id):
             with open(file_path, 'wb+') as destination:
                 for chunk in file.chunks():
                     destination.write(chunk)
+            # Thumbnail/medium copies are resized in the background; pages use the original until then
+            adapter.image_derivatives.schedule(product_id, new_filename)
             
             uploaded_count += 1
             next_number += 1
+        manifest.refresh(product_id)
         
         return JsonResponse({
             'success': True,
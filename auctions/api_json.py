@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder gives the same output, only slower
+    orjson = None
+
+
+# (datetime, tzinfo) -> ISO 8601 string. A catalog has few distinct start/end times and
+# snapshot rows share their datetime objects, so each one is formatted about once.
+_ISO_CACHE_SIZE = 16384
+_iso_cache = {}
+
+
+def isoformat(value):
+    key = (value, value.tzinfo)
+    text = _iso_cache.get(key)
+    if text is None:
+        if len(_iso_cache) >= _ISO_CACHE_SIZE:
+            _iso_cache.clear()
+        text = _iso_cache[key] = value.isoformat()
+    return text
+
+
+def _default(obj):
+    """Values the JSON encoders don't know: NumPy/pandas scalars, datetimes (stdlib path), Decimals."""
+    if isinstance(obj, datetime):
+        return isoformat(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+def compact_row(row, fields=None):
+    """
+    Copy of a product/bid dict for an API payload, limited to `fields` if given.
+    Whole-number floats (24010.0, ids read from a CSV column with blanks) become
+    ints and datetimes become ISO 8601 strings.
+    """
+    keys = row.keys() if fields is None else fields
+    out = {}
+    for key in keys:
+        value = row.get(key)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, datetime):
+            value = isoformat(value)
+        out[key] = value
+    return out
+
+
+if orjson is not None:
+    # Datetimes go through _default: orjson's own formatting is slow with pytz time zones
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(data):
+        """`data` as compact UTF-8 JSON bytes."""
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(data):
+        """`data` as compact UTF-8 JSON bytes."""
+        return _encoder.encode(data).encode('utf-8')
+
+
+class ApiJsonResponse(HttpResponse):
+    """JsonResponse for the API hot paths (polls, events): one pass through dumps()."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
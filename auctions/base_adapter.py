@@ -0,0 +1,317 @@
+import os
+import logging
+from datetime import datetime
+import pandas as pd
+import pytz
+from .change_tracker import ChangeTracker
+from .image_manifest import get_image_manifest
+from .image_derivatives import get_derivative_pipeline
+from .bid_summary import FINAL_STATUSES
+from .group_commit import GroupCommitter
+
+logger = logging.getLogger(__name__)
+TAIPEI_TZ = pytz.timezone('Asia/Taipei')
+
+class BaseAdapter:
+    """
+    Storage-independent helpers shared by ExcelAdapter and SqliteAdapter.
+    Subclasses implement the read/write methods and call `_notify_write`
+    after every mutation.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._write_listeners = []
+        self._changes = ChangeTracker()
+        photo_root = os.path.join(data_dir, '..', 'data_photo')
+        self.image_manifest = get_image_manifest(photo_root)
+        self.image_derivatives = get_derivative_pipeline(photo_root)
+        # Single writer of bids: save_bid calls that arrive while a batch is being
+        # written wait and go out together in the next one
+        self._group_commit = GroupCommitter(self._save_bids, 0)
+
+    def add_write_listener(self, listener):
+        """
+        Register `listener(event, product_id, data)`, called after every successful
+        mutation. `event` is the adapter method name ('save_bid', 'update_product',
+        'save_product', 'delete_product'); `data` is the method's result or updates.
+        """
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, event, product_id, data=None):
+        for listener in list(self._write_listeners):
+            try:
+                listener(event, product_id, data)
+            except Exception as e:
+                # A broken cache hook must never fail the write that already happened
+                logger.warning(f"Write listener failed for {event} on product {product_id}: {e}")
+
+    def get_product_statuses(self):
+        """{product_id: derived status} for the whole catalog, without building product dicts."""
+        return self._status_timeline().statuses()
+
+    def get_next_status_change(self):
+        """
+        Epoch seconds of the next moment any product changes status (or None).
+        Anything derived from statuses stays valid until then, unless data changes.
+        """
+        return self._status_timeline().next_change()
+
+    def get_product_changes(self, since=None):
+        """
+        (version, changed_ids, removed_ids): the current catalog version, the ids
+        of products whose price, bid count, status, end time or highest bidder
+        changed after version `since`, and the ids of products deleted since.
+        Both id lists are None when `since` can not be answered incrementally
+        (missing, or from before this process started).
+        """
+        version = self._changes.observe(self._product_fingerprints())
+        delta = self._changes.changed_since(since)
+        return (version, *delta) if delta is not None else (version, None, None)
+
+    def _fingerprint(self, product):
+        """The fields of a product the list page displays; `product` must carry a derived status."""
+        return (
+            product.get('current_price'), product.get('bids_count'), product.get('status'),
+            product.get('end_time'), self._normalize_id(product.get('highest_bidder_id')),
+        )
+
+    def _normalize_id(self, value):
+        """
+        標準化 ID：將各種格式的 ID（如 1244, 1244.0, "1244.0"）統一轉換為整數字串（如 "1244"）。
+        這解決了 CSV 資料中 ID 格式不一致的問題。
+        """
+        if pd.isna(value) or str(value).strip() == '':
+            return ''
+        try:
+            # 處理可能帶有 .0 的字串或數值
+            return str(int(float(value)))
+        except (ValueError, TypeError):
+            return str(value).strip()
+
+    def _ensure_aware(self, val):
+        """Robustly convert a value (string, datetime, Timestamp) to an aware Taipei datetime."""
+        if not val or pd.isna(val) or val == '':
+            return None
+            
+        dt = None
+        if isinstance(val, (datetime, pd.Timestamp)):
+            dt = val.to_pydatetime() if isinstance(val, pd.Timestamp) else val
+        elif isinstance(val, str) and val.strip():
+            s = val.strip()
+            # Try ISO formats and common variations
+            # Python < 3.11 fromisoformat is strict, so we use strptime fallbacks
+            formats = [
+                "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M",
+                "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
+                "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M"
+            ]
+            
+            # Try fromisoformat first
+            try:
+                dt = datetime.fromisoformat(s.replace('Z', '+00:00'))
+            except ValueError:
+                for fmt in formats:
+                    try:
+                        dt = datetime.strptime(s, fmt)
+                        break
+                    except ValueError:
+                        continue
+        
+        if dt:
+            if dt.tzinfo is None:
+                dt = TAIPEI_TZ.localize(dt)
+            return dt
+        return None
+
+    def _derive_status(self, product):
+        """
+        Derive status based on time, unless explicitly Unsold.
+        """
+        if product.get('status') == 'Unsold':
+            return 'Unsold'
+            
+        start_dt = self._ensure_aware(product.get('start_time'))
+        end_dt = self._ensure_aware(product.get('end_time'))
+        
+        if not start_dt or not end_dt:
+            return product.get('status', 'Upcoming')
+
+        now = datetime.now(TAIPEI_TZ)
+        
+        if now < start_dt:
+            return 'Upcoming'
+        elif now > end_dt:
+            return 'Closed'
+        else:
+            return 'Open'
+
+    def _convert_product_times(self, product):
+        """Helper to convert various time formats to timezone-aware datetime objects."""
+        for field in ['start_time', 'end_time']:
+            val = product.get(field)
+            dt = self._ensure_aware(val)
+            if dt:
+                product[field] = dt
+            else:
+                # Ensure it's not a NaN object to avoid template issues
+                if pd.isna(val) or val is None:
+                    product[field] = ''
+                
+        return product
+
+    def get_product_images(self, product_id):
+        """
+        Image file names in data_photo/{product_id}, sorted.
+        Served from the shared image manifest instead of listing the folder each call.
+        """
+        try:
+            return self.image_manifest.images(product_id)
+        except Exception:
+            return []
+
+    def get_image_variants(self, product_id):
+        """
+        [{'name', 'url', 'thumb', 'medium'}] for each image of a product. A size
+        not built yet (or without Pillow) falls back to the original's URL.
+        """
+        derived_table = self.image_derivatives.table()
+        variants = []
+        for name in self.get_product_images(product_id):
+            url = f"/data_photo/{product_id}/{name}"
+            variants.append({
+                'name': name,
+                'url': url,
+                'thumb': self.image_derivatives.url(product_id, name, 'thumb', table=derived_table) or url,
+                'medium': self.image_derivatives.url(product_id, name, 'medium', table=derived_table) or url,
+            })
+        return variants
+
+    def _set_main_image(self, product, image_table, derived_table):
+        """main_image (original) and main_image_thumb (small derivative, else the original)."""
+        product_id = product['id']
+        images = image_table.get(product_id)
+        if not images:
+            product['main_image'] = product['main_image_thumb'] = None
+            return
+        product['main_image'] = f"/data_photo/{product_id}/{images[0]}"
+        product['main_image_thumb'] = (
+            self.image_derivatives.url(product_id, images[0], 'thumb', table=derived_table)
+            or product['main_image']
+        )
+
+    def enable_group_commit(self, window_ms):
+        """
+        Let the bid writer wait `window_ms` after the first bid of a batch for more to
+        join it. With 0 it never waits: only bids that arrive during a write are batched.
+        """
+        self._group_commit.window = max(window_ms, 0) / 1000
+
+    def save_bid(self, product_id, employee_id, amount, rules=None):
+        """
+        Transactional save of a bid: checks, bid record and product update
+        (current price, highest bidder, bid count) as one atomic step.
+
+        `rules(product, last_bid)` is called inside the critical section with the
+        product as it stands there (derived status, current price and highest
+        bidder) and its latest bid record or None. Raising rejects the bid; a
+        returned dict of product fields (anti-sniper end_time) is written
+        together with the bid.
+
+        Raises:
+            LookupError: if the product does not exist
+            ValueError: if the bid breaks an invariant (see _check_bid_invariants)
+        """
+        request = {'product_id': int(product_id), 'employee_id': employee_id, 'amount': amount, 'rules': rules}
+        outcome = self._group_commit.submit(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def _save_bids(self, requests):
+        """
+        Check and persist a batch of bid requests ({'product_id', 'employee_id',
+        'amount', 'rules'}) in order. Returns one outcome per request: its
+        result dict, or the exception that rejected it.
+        """
+        raise NotImplementedError
+
+    def _check_bid_invariants(self, state, employee_id, amount):
+        """
+        Invariants every storage backend enforces inside its bid critical section.
+
+        Args:
+            state: dict with current_price, highest_bidder_id, bids_count and start_price
+                   of the product as seen under the lock
+
+        Raises:
+            ValueError: if the bid must be rejected
+        """
+        # CRITICAL: Self-bidding restriction check inside the lock
+        current_highest_bidder = self._normalize_id(state.get('highest_bidder_id', ''))
+        new_bidder = self._normalize_id(employee_id)
+        if current_highest_bidder == new_bidder:
+            raise ValueError("You are already the highest bidder (Race condition guarded)")
+
+        # For first bid: allow amount == start_price  
+        # For subsequent bids: amount must be > current_price
+        if state.get('bids_count', 0) == 0:
+            # First bid: must be >= start_price (usually should equal start_price)
+            if amount < float(state.get('start_price') or 0):
+                raise ValueError("First bid must be at least the starting price")
+        else:
+            # Subsequent bids: must be > current_price
+            if amount <= float(state.get('current_price') or 0):
+                 # Race condition detected
+                 raise ValueError("Race condition: Price already updated")
+
+    def _bid_summary(self):
+        """The up-to-date BidderSummary of all bids."""
+        raise NotImplementedError
+
+    def _product_names(self, product_ids):
+        """{product_id: name} of the given products that exist."""
+        raise NotImplementedError
+
+    def get_bids_for_employee(self, employee_id):
+        """
+        The "My Bids" page: one row per product the employee bid on, most recent
+        first, read from the bid summary instead of regrouping their history.
+        """
+        entries = self._bid_summary().entries(employee_id)
+        if not entries:
+            return []
+        timeline = self._status_timeline()
+        names = self._product_names([e['product_id'] for e in entries])
+
+        result = []
+        for entry in entries:
+            pid = entry['product_id']
+            status = str(timeline.status_of(pid) or '')
+            # Winning: the employee holds the latest (highest) bid and the product is not marked "Unsold" (流標)
+            is_winning = entry['leading'] and status != 'Unsold'
+            if status in FINAL_STATUSES:
+                state = 'won' if is_winning else 'lost'
+            else:
+                state = 'winning' if is_winning else 'outbid'
+            result.append({
+                'product_id': pid,
+                'product_name': names.get(pid, f'Unknown Product ({pid})'),
+                'bid_count': entry['bid_count'],
+                'max_amount': entry['max_amount'],
+                'is_winning': is_winning,
+                'state': state,
+                'bids': entry['bids'],
+            })
+        return result
+
+    def user_has_any_bids(self, bidder_id):
+        """
+        Check if a user has made any bids.
+        Used for first-time bid confirmation feature.
+        """
+        return self._bid_summary().has_bids(bidder_id)
+
+    def get_outbid_product_ids(self, employee_id):
+        """Products the employee bid on where someone else now holds the highest bid (outbid notices)."""
+        return self._bid_summary().outbid_products(employee_id)
@@ -0,0 +1,178 @@
+import json
+import time
+import logging
+import threading
+from http import HTTPStatus
+from importlib import import_module
+from django.conf import settings
+from django.core import signing
+from common.exceptions import BusinessException, SystemException
+from .services import BidService
+from .storage import get_service
+from .executors import run_write
+from . import api_json
+
+logger = logging.getLogger(__name__)
+
+# Bids posted here skip Django's URL routing and middleware (sessions, locale, CSRF,
+# messages, auth): the bidder comes from a signed token handed out with the product page.
+BID_INGEST_PATH = '/api/fast/bids/'
+BID_TOKEN_HEADER = 'X-Bid-Token'
+BID_TOKEN_SALT = 'auctions.bid-token'
+MAX_BODY_BYTES = 4096
+
+_HEADERS = [('Content-Type', 'application/json'), ('Cache-Control', 'no-store')]
+
+# Tokens are bound to the login session. Whether it is still alive is looked up at most
+# once per SESSION_CHECK_SECONDS per session, not per bid; logging out revokes at once
+# in this process, a session ended by another process is noticed within that time.
+SESSION_CHECK_SECONDS = 30
+_sessions = {}    # session key -> (alive, monotonic time of the check)
+_sessions_lock = threading.Lock()
+
+
+def issue_bid_token(employee_id, session_key):
+    """Signed, timestamped token naming the bidder and their session; checked with the SECRET_KEY."""
+    return signing.dumps([str(employee_id), session_key], salt=BID_TOKEN_SALT)
+
+
+def revoke_bid_tokens(session_key):
+    """Tokens bound to `session_key` stop working right away (logout)."""
+    if session_key:
+        _remember_session(session_key, False)
+
+
+def bidder_from_token(token):
+    """
+    The employee id of a valid token, or None if it is missing, forged, older than
+    AUCTION_BID_TOKEN_MAX_AGE or its session has ended.
+    """
+    if not token:
+        return None
+    try:
+        employee_id, session_key = signing.loads(token, salt=BID_TOKEN_SALT, max_age=settings.AUCTION_BID_TOKEN_MAX_AGE)
+    except (signing.BadSignature, ValueError, TypeError):  # Also SignatureExpired and tokens of the old format
+        return None
+    return employee_id if session_key and _session_alive(session_key) else None
+
+
+def _session_alive(session_key):
+    with _sessions_lock:
+        cached = _sessions.get(session_key)
+    if cached and time.monotonic() - cached[1] < SESSION_CHECK_SECONDS:
+        return cached[0]
+    alive = import_module(settings.SESSION_ENGINE).SessionStore().exists(session_key)
+    _remember_session(session_key, alive)
+    return alive
+
+
+def _remember_session(session_key, alive):
+    now = time.monotonic()
+    with _sessions_lock:
+        if len(_sessions) >= 4096:
+            # Expired checks would be redone anyway
+            for key in [k for k, (_, checked) in _sessions.items() if now - checked >= SESSION_CHECK_SECONDS]:
+                del _sessions[key]
+        _sessions[session_key] = (alive, now)
+
+
+def ingest(body, token, service=None):
+    """
+    Place one bid from a raw JSON body {"productId", "amount"}.
+    Returns (HTTP status, payload) with the same payloads as views.place_bid.
+    """
+    employee_id = bidder_from_token(token)
+    if not employee_id:
+        return 401, {'success': False, 'message': 'User not logged in', 'errorCode': 'UNAUTHORIZED'}
+    try:
+        data = json.loads(body)
+        product_id = int(data['productId'])
+        amount = int(data['amount'])
+    except (ValueError, KeyError, TypeError):
+        return 400, {'success': False, 'message': 'Invalid bid payload', 'errorCode': 'INVALID_PAYLOAD'}
+
+    try:
+        return 200, (service or get_service(BidService)).place_bid(product_id, employee_id, amount)
+    except BusinessException as e:
+        logger.info(f"Bid business error: {e.message}")
+        return 400, {'success': False, 'message': e.message, 'errorCode': e.code}
+    except SystemException as e:
+        logger.error(f"Bid system error: {e.message}")
+        return 500, {'success': False, 'message': '系統繁忙，請稍後重試', 'errorCode': 'INTERNAL_ERROR'}
+    except Exception:
+        logger.error("Unexpected error in bid ingest", exc_info=True)
+        return 500, {'success': False, 'message': '未知錯誤', 'errorCode': 'UNKNOWN_ERROR'}
+
+
+def _method_not_allowed():
+    return 405, {'success': False, 'message': 'POST required', 'errorCode': 'METHOD_NOT_ALLOWED'}
+
+
+def _too_large():
+    return 413, {'success': False, 'message': 'Request too large', 'errorCode': 'INVALID_PAYLOAD'}
+
+
+class BidIngestWSGI:
+    """Wraps the Django WSGI application (waitress, run_server.py) and answers BID_INGEST_PATH itself."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') != BID_INGEST_PATH:
+            return self.app(environ, start_response)
+
+        if environ.get('REQUEST_METHOD') != 'POST':
+            status, payload = _method_not_allowed()
+        else:
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+            if length > MAX_BODY_BYTES:
+                status, payload = _too_large()
+            else:
+                body = environ['wsgi.input'].read(length)
+                status, payload = ingest(body, environ.get('HTTP_X_BID_TOKEN'))
+
+        content = api_json.dumps(payload)
+        start_response(
+            f"{status} {HTTPStatus(status).phrase}",
+            _HEADERS + [('Content-Length', str(len(content)))],
+        )
+        return [content]
+
+
+class BidIngestASGI:
+    """ASGI counterpart of BidIngestWSGI (run_asgi_server.py); the bid runs on the write pool."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != BID_INGEST_PATH:
+            return await self.app(scope, receive, send)
+
+        if scope['method'] != 'POST':
+            status, payload = _method_not_allowed()
+        else:
+            body, more_body = b'', True
+            while more_body and len(body) <= MAX_BODY_BYTES:
+                message = await receive()
+                body += message.get('body', b'')
+                more_body = message.get('more_body', False)
+            if len(body) > MAX_BODY_BYTES:
+                status, payload = _too_large()
+            else:
+                headers = dict(scope['headers'])
+                token = headers.get(BID_TOKEN_HEADER.lower().encode('latin-1'), b'').decode('latin-1')
+                status, payload = await run_write(ingest, body, token)
+
+        content = api_json.dumps(payload)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode(), v.encode()) for k, v in _HEADERS]
+                       + [(b'content-length', str(len(content)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': content})
@@ -0,0 +1,224 @@
+import os
+import csv
+import io
+import threading
+import portalocker
+from .bid_summary import BidderSummary
+
+BID_COLUMNS = ['id', 'product_id', 'bidder_id', 'amount', 'bid_timestamp']
+
+# One journal per bids file, shared by every adapter in the process
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path):
+    key = os.path.abspath(path)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = _journals[key] = BidJournal(key)
+        return journal
+
+
+def _to_number(value):
+    """'24010.0' -> 24010, '24010.5' -> 24010.5, '' -> None"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        num = float(value)
+    except ValueError:
+        return None
+    return int(num) if num.is_integer() else num
+
+
+class BidJournal:
+    """
+    Append-only view of bids.csv.
+
+    A bid is written as one fsync'd CSV line at the end of the file; nothing is
+    ever rewritten. The journal keeps the parsed history in memory and only
+    reads the bytes appended since its last look (by this or another process),
+    so the next bid id and each product's latest bid are O(1) lookups, and
+    every bidder's "My Bids" summary is kept current as lines are parsed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._inode = None
+        self._offset = 0          # bytes of the file already parsed
+        self._columns = None
+        self._bids = []           # parsed records in file order
+        self._last_id = 0
+        self._tails = {}          # product_id -> {'last_bid': record, 'count': n}
+        self._summary = BidderSummary()   # per-bidder "My Bids", fed by _apply
+
+    def _parse_record(self, row):
+        rec = dict(zip(self._columns, row))
+        product_id = _to_number(rec.get('product_id'))
+        if product_id is None:
+            # Blank separator rows (",,,,") left behind by Excel edits
+            return None
+        rec['id'] = _to_number(rec.get('id'))
+        rec['product_id'] = int(product_id)
+        rec['amount'] = _to_number(rec.get('amount'))
+        rec['bidder_id'] = (rec.get('bidder_id') or '').strip()
+        return rec
+
+    def _apply(self, rec):
+        self._bids.append(rec)
+        if isinstance(rec['id'], int) and rec['id'] > self._last_id:
+            self._last_id = rec['id']
+        tail = self._tails.setdefault(rec['product_id'], {'last_bid': None, 'count': 0})
+        tail['last_bid'] = rec
+        tail['count'] += 1
+        self._summary.add(rec)
+
+    def refresh(self, locked=False):
+        """
+        Parse whatever was appended since the last call. Cheap when nothing changed.
+        `locked` means the caller holds the file lock, so an unterminated last
+        line is complete (Excel-saved file) rather than an append in progress.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._reset()
+                return
+
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                # Replaced or truncated (e.g. restored from a backup): start over
+                self._reset()
+                self._inode = st.st_ino
+            if st.st_size == self._offset:
+                return
+
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read(st.st_size - self._offset)
+
+            # Only consume complete lines; a concurrent writer may be mid-append
+            if not locked:
+                end = chunk.rfind(b'\n')
+                if end < 0:
+                    return
+                chunk = chunk[:end + 1]
+            self._offset += len(chunk)
+
+            text = chunk.decode('utf-8', errors='replace')
+            if self._columns is None:
+                text = text.lstrip('\ufeff')
+            for row in csv.reader(io.StringIO(text)):
+                if not row:
+                    continue
+                if self._columns is None:
+                    self._columns = [c.strip() for c in row]
+                    continue
+                rec = self._parse_record(row)
+                if rec is not None:
+                    self._apply(rec)
+
+    def next_id(self):
+        with self._lock:
+            self.refresh()
+            return self._last_id + 1
+
+    def records(self):
+        """All parsed bids in file order (copies)."""
+        with self._lock:
+            self.refresh()
+            return [dict(rec) for rec in self._bids]
+
+    def tail(self, product_id):
+        """Latest bid and bid count of a product: {'last_bid': record, 'count': n} or None."""
+        with self._lock:
+            self.refresh()
+            tail = self._tails.get(int(product_id))
+            return dict(tail) if tail else None
+
+    def summary(self):
+        """The BidderSummary of the bids parsed so far, brought up to date first."""
+        with self._lock:
+            self.refresh()
+            return self._summary
+
+    def append(self, product_id, bidder_id, amount, bid_timestamp, check=None):
+        """
+        Durably append one bid and return its record (with the assigned id).
+        The id is taken under the file lock, so it stays unique across processes.
+
+        `check(tail)` is called under the same lock with the product's up-to-date
+        tail (see `tail()`); raising from it aborts the append. This is what keeps
+        bid invariants safe against other processes writing the same file.
+        """
+        def plan(tail):
+            if check is not None:
+                check(tail(product_id))
+            return [(product_id, bidder_id, amount, bid_timestamp)]
+        return self.append_many(plan)[0]
+
+    def append_many(self, plan):
+        """
+        Durably append several bids with one write and one fsync (group commit).
+
+        `plan(tail)` is called under the file lock, where `tail(product_id)` gives
+        up-to-date tails as `tail()` does; it returns the (product_id, bidder_id,
+        amount, bid_timestamp) tuples to append, in order. Returns their records
+        with the assigned ids. Raising from `plan` aborts the append.
+        """
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                portalocker.lock(f, portalocker.LOCK_EX)
+                try:
+                    self.refresh(locked=True)
+
+                    def tail(product_id):
+                        tail = self._tails.get(int(product_id))
+                        return dict(tail) if tail else None
+
+                    bids = plan(tail)
+                    if not bids:
+                        return []
+                    size = os.fstat(f.fileno()).st_size
+                    prefix = b''
+                    if self._columns is None and size == 0:
+                        prefix = (','.join(BID_COLUMNS) + '\n').encode('utf-8')
+                    elif size and self._last_byte() != b'\n':
+                        # Files saved by Excel may lack the trailing newline
+                        prefix = b'\n'
+                    columns = self._columns or BID_COLUMNS
+
+                    records = []
+                    buf = io.StringIO()
+                    writer = csv.writer(buf, lineterminator='\n')
+                    for product_id, bidder_id, amount, bid_timestamp in bids:
+                        rec = {
+                            'id': self._last_id + 1 + len(records),
+                            'product_id': int(product_id),
+                            'bidder_id': bidder_id,
+                            'amount': amount,
+                            'bid_timestamp': bid_timestamp,
+                        }
+                        writer.writerow([rec.get(c, '') for c in columns])
+                        records.append(rec)
+
+                    f.write(prefix + buf.getvalue().encode('utf-8'))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                    # Pick our own lines back up so memory mirrors the file byte for byte
+                    self.refresh(locked=True)
+                    return records
+                finally:
+                    portalocker.unlock(f)
+
+    def _last_byte(self):
+        with open(self.path, 'rb') as r:
+            r.seek(-1, os.SEEK_END)
+            return r.read(1)
@@ -0,0 +1,35 @@
+import os
+import threading
+
+
+class BidSequencer:
+    """
+    Single writer of each bids file.
+
+    Bids reach ExcelAdapter._save_bids in batches from the adapter's
+    GroupCommitter, which is the queue: bids arriving while a batch commits
+    form the next batch, in arrival order, so every product's bids keep their
+    order and bids on unrelated products share one journal append and one
+    products.csv write instead of waiting for each other's.
+
+    The writer lock makes the commit of a batch (journal append, then the
+    product rows) exclusive per file across every adapter in the process, so
+    product rows are always written in bid order.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writers = {}    # absolute bids path -> Lock
+
+    def writer(self, path):
+        """Lock held by the one batch committing bids to `path` (use as a context manager)."""
+        key = os.path.abspath(path)
+        with self._lock:
+            lock = self._writers.get(key)
+            if lock is None:
+                lock = self._writers[key] = threading.Lock()
+            return lock
+
+
+# Shared by every adapter in the process, like the journal and snapshots
+sequencer = BidSequencer()
@@ -0,0 +1,80 @@
+import threading
+
+# Statuses after which a product's leader is final
+FINAL_STATUSES = ('Closed', 'Unsold', 'Ended')
+
+
+def _bidder_key(bidder_id):
+    """
+    Same normalization as BaseAdapter._normalize_id: 1, '0001', '1.0' and 1244.0
+    (CSV columns read back as floats) are all one bidder.
+    """
+    text = str(bidder_id).strip()
+    try:
+        return str(int(float(text)))
+    except (ValueError, OverflowError):
+        return text
+
+
+class BidderSummary:
+    """
+    Materialized "My Bids": per bidder and product the bid count, own max bid
+    and bid history, plus the current leader of every product. Fed one bid at
+    a time in write order, so the page and outbid checks never regroup a
+    bidder's history or scan other bidders' bids.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._by_bidder = {}    # bidder_id -> {product_id: entry}; the keys are the "has bid" set
+            self._leaders = {}      # product_id -> bidder_id of the latest bid
+
+    def add(self, bid):
+        """
+        Apply one bid record (product_id, bidder_id, amount, bid_timestamp).
+        Returns the bidder it outbid: the previous leader, if someone else.
+        """
+        product_id, bidder_id = int(bid['product_id']), _bidder_key(bid['bidder_id'])
+        with self._lock:
+            products = self._by_bidder.setdefault(bidder_id, {})
+            entry = products.get(product_id)
+            if entry is None:
+                entry = products[product_id] = {'product_id': product_id, 'bid_count': 0, 'max_amount': None, 'bids': []}
+            entry['bid_count'] += 1
+            entry['bids'].append({'amount': bid.get('amount'), 'bid_timestamp': bid.get('bid_timestamp')})
+            amount = bid.get('amount')
+            if amount is not None and (entry['max_amount'] is None or amount > entry['max_amount']):
+                entry['max_amount'] = amount
+
+            previous = self._leaders.get(product_id)
+            self._leaders[product_id] = bidder_id
+            return previous if previous not in (None, bidder_id) else None
+
+    def has_bids(self, bidder_id):
+        return _bidder_key(bidder_id) in self._by_bidder
+
+    def leader(self, product_id):
+        return self._leaders.get(int(product_id))
+
+    def entries(self, bidder_id):
+        """
+        The bidder's products, most recently bid on first (copies):
+        {'product_id', 'bid_count', 'max_amount', 'leading', 'bids' (newest first)}.
+        """
+        with self._lock:
+            entries = [
+                dict(entry, leading=self._leaders.get(pid) == _bidder_key(bidder_id), bids=entry['bids'][::-1])
+                for pid, entry in self._by_bidder.get(_bidder_key(bidder_id), {}).items()
+            ]
+        entries.sort(key=lambda e: str(e['bids'][0]['bid_timestamp'] or ''), reverse=True)
+        return entries
+
+    def outbid_products(self, bidder_id):
+        """Ids of the products the bidder has bid on where someone else now leads."""
+        key = _bidder_key(bidder_id)
+        with self._lock:
+            return [pid for pid in self._by_bidder.get(key, {}) if self._leaders.get(pid) != key]
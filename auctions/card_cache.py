@@ -0,0 +1,57 @@
+import threading
+from django.template.loader import get_template
+from django.utils import translation
+
+CARD_TEMPLATE = 'partials/product_card.html'
+
+# Every product field the card template displays: a card is re-rendered only when one changes
+CARD_FIELDS = (
+    'status', 'current_price', 'bids_count', 'start_time', 'end_time',
+    'highest_bidder_id', 'winner_name', 'name', 'main_image', 'main_image_thumb',
+)
+
+
+class CardCache:
+    """
+    Rendered product cards of the products page, per language and product id,
+    with the CARD_FIELDS values they were rendered from. A page render reuses
+    the HTML of every card whose values are unchanged.
+    """
+
+    def __init__(self, template_name=CARD_TEMPLATE):
+        self.template_name = template_name
+        self._lock = threading.Lock()
+        self._cards = {}    # (language, product_id) -> (field values, html)
+
+    def render(self, products):
+        """HTML of each product's card, in order."""
+        language = translation.get_language()
+        template = get_template(self.template_name)
+        cached = self._cards
+        fresh, cards = {}, []
+        for product in products:
+            key = (language, product['id'])
+            version = tuple(product.get(field) for field in CARD_FIELDS)
+            hit = cached.get(key)
+            if hit is not None and hit[0] == version:
+                html = hit[1]
+            else:
+                html = template.render({'p': product, 'LANGUAGE_CODE': language})
+            fresh[key] = (version, html)
+            cards.append(html)
+
+        with self._lock:
+            # Copy on write: concurrent renders read self._cards without the lock.
+            # Cards of deleted products are dropped with the rest of this language's old entries.
+            cards_by_key = {key: card for key, card in self._cards.items() if key[0] != language}
+            cards_by_key.update(fresh)
+            self._cards = cards_by_key
+        return cards
+
+    def clear(self):
+        with self._lock:
+            self._cards = {}
+
+
+# Shared by every request in the process
+card_cache = CardCache()
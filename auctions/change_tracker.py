@@ -0,0 +1,52 @@
+import time
+import threading
+
+
+class ChangeTracker:
+    """
+    Monotonic version counter over the product catalog.
+
+    Every `observe()` compares each product's fingerprint (the fields the list
+    page shows) with the previous one and stamps changed products with a new
+    version. Versions start at the current time in milliseconds, so they keep
+    increasing across restarts; a `since` older than this process can not be
+    answered incrementally and callers fall back to a full list.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = time.time_ns() // 1_000_000
+        self._base = self._version
+        self._fingerprints = {}   # product_id -> fingerprint tuple
+        self._changed_at = {}     # product_id -> version of its last change
+        self._removed_at = {}     # product_id -> version it was deleted at
+
+    def observe(self, fingerprints):
+        """Record the current `{product_id: fingerprint}` and return the version."""
+        with self._lock:
+            changed = [pid for pid, fp in fingerprints.items() if self._fingerprints.get(pid) != fp]
+            removed = [pid for pid in self._fingerprints if pid not in fingerprints]
+            if changed or removed:
+                self._version = max(self._version + 1, time.time_ns() // 1_000_000)
+                for pid in changed:
+                    self._changed_at[pid] = self._version
+                    self._removed_at.pop(pid, None)
+                for pid in removed:
+                    self._changed_at.pop(pid, None)
+                    self._removed_at[pid] = self._version
+                self._fingerprints = dict(fingerprints)
+            return self._version
+
+    def changed_since(self, since):
+        """
+        (changed ids, removed ids) of the products changed or deleted after version
+        `since`, or None when `since` predates this tracker (or comes from the
+        future) and everything must be sent.
+        """
+        with self._lock:
+            if since is None or since < self._base or since > self._version:
+                return None
+            return (
+                [pid for pid, version in self._changed_at.items() if version > since],
+                [pid for pid, version in self._removed_at.items() if version > since],
+            )
@@ -0,0 +1,54 @@
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+
+def _accepts(request, encoding):
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() == encoding:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli (when installed) or gzip for JSON API responses of at least
+    AUCTION_COMPRESS_MIN_SIZE bytes. Pages, files (served precompressed, see
+    static_files.py) and streams such as the SSE endpoints are left alone.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith('application/json'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.AUCTION_COMPRESS_MIN_SIZE:
+            return response
+
+        if brotli is not None and _accepts(request, 'br'):
+            encoding = 'br'
+            compressed = brotli.compress(response.content, quality=settings.AUCTION_BROTLI_QUALITY)
+        elif _accepts(request, 'gzip'):
+            encoding = 'gzip'
+            compressed = gzip.compress(response.content, compresslevel=settings.AUCTION_GZIP_LEVEL, mtime=0)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body differs byte for byte from the uncompressed one (same rule as Django's GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
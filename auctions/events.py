@@ -0,0 +1,119 @@
+import queue
+import asyncio
+import threading
+from collections import defaultdict
+
+# Event types pushed to browsers over /api/stream/...
+BID_PLACED = 'bid-placed'
+PRICE_CHANGED = 'price-changed'
+ANTI_SNIPER_EXTENDED = 'anti-sniper-extended'
+STATUS_CHANGED = 'status-changed'
+
+# Events a slow subscriber may fall behind by before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One listener's queue of (event_type, product_id, data) tuples."""
+
+    def __init__(self, bus, product_id):
+        self.product_id = product_id
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        # Set by get_async(): the event loop of an ASGI stream waiting on this queue
+        self._loop = None
+        self._wakeup = None
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # The client missed events; it resyncs through a regular poll
+            self.overflowed = True
+        if self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed: the stream is gone
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def get_async(self, timeout=None):
+        """Like get(), but waits on the running event loop instead of blocking a thread."""
+        if self._wakeup is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        # put() sets the event through the loop, so it can't slip in between here and the wait
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for auction events.
+
+    Subscribers listen to one product or, with product_id=None, to all of them.
+    Publishing never blocks: each subscriber has a bounded queue. Only bids
+    handled by this process are seen, so clients keep a slow safety poll.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)   # product_id (or None) -> {Subscription}
+        self._count = 0
+
+    def subscribe(self, product_id=None, limit=None):
+        """A new Subscription, or None when `limit` subscriptions are already open."""
+        key = int(product_id) if product_id is not None else None
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return None
+            subscription = Subscription(self, key)
+            self._subscribers[key].add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.product_id)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscribers[subscription.product_id]
+
+    def publish(self, event_type, product_id, data=None):
+        product_id = int(product_id)
+        event = (event_type, product_id, data or {})
+        with self._lock:
+            targets = list(self._subscribers.get(product_id, ())) + list(self._subscribers.get(None, ()))
+        for subscription in targets:
+            subscription.put(event)
+
+    def subscriber_count(self):
+        with self._lock:
+            return self._count
+
+
+# Shared by every view and service in the process
+bus = EventBus()
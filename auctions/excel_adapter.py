@@ -1,16 +1,81 @@
 import os
+import time
 import logging
+import tempfile
+import threading
 import pandas as pd
 import portalocker
-import pytz
 from datetime import datetime
+from .base_adapter import BaseAdapter, TAIPEI_TZ
+from .bid_journal import get_journal
+from .bid_sequencer import sequencer
+from .status_timeline import StatusTimeline
 
 logger = logging.getLogger(__name__)
-TAIPEI_TZ = pytz.timezone('Asia/Taipei')
 
-class ExcelAdapter:
+# Whole-number product columns; CSVs saved with blanks read them back as floats (24010.0)
+INTEGRAL_PRODUCT_COLUMNS = ('start_price', 'current_price', 'bids_count')
+
+# Process-wide cache of parsed CSV files: path -> (stat signature, payload).
+# Shared by every ExcelAdapter instance so the pollers only pay a stat() per call.
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+# Full-file writes replace the data file, so their lock lives on a sidecar file next to it
+LOCK_SUFFIX = '.lock'
+# Windows refuses to replace a file another process has open (a reader, Excel): retry briefly
+REPLACE_ATTEMPTS = 10
+
+
+def _replace_csv(path, df, encoding='utf-8'):
+    """
+    Write `df` to a temp file next to `path`, fsync it and rename it over `path`.
+    Readers and a crash mid-write see the old file or the new one, never a partial one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(tmp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.01 * (attempt + 1))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if os.name == 'posix':
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _file_signature(path):
+    """Cheap change detector for a data file: (mtime_ns, size, inode)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ExcelAdapter(BaseAdapter):
     def __init__(self, data_dir):
-        self.data_dir = data_dir
+        super().__init__(data_dir)
         os.makedirs(self.data_dir, exist_ok=True)
         self.employees_path = os.path.join(self.data_dir, 'employees.csv')
         self.products_path = os.path.join(self.data_dir, 'products.csv')
@@ -23,246 +88,295 @@ class ExcelAdapter:
         ]:
             if not os.path.exists(p):
                 pd.DataFrame(columns=cols).to_csv(p, index=False, encoding='utf-8-sig')
+        # bids.csv is append-only; the journal tracks its tail in memory
+        self.journal = get_journal(self.bids_path)
+
+    def _lock(self, path):
+        """
+        Exclusive lock for a read-modify-write of `path`, held on `<path>.lock`
+        (the data file itself is replaced by every write). Readers take no lock.
+        """
+        lock = open(path + LOCK_SUFFIX, 'a')
+        portalocker.lock(lock, portalocker.LOCK_EX)
+        return lock
+
+    def _unlock(self, lock):
+        if lock.closed:
+            return
+        try:
+            portalocker.unlock(lock)
+        finally:
+            lock.close()
 
-    def _lock_and_read(self, path):
-        f = open(path, 'r+', encoding='utf-8')
-        portalocker.lock(f, portalocker.LOCK_EX)
+    def _lock_and_read(self, path, snapshot=None):
+        """
+        Lock `path` and return (lock, frame to modify). When `snapshot` (a payload of
+        _cached) is still the current parse of the file, a copy of its frame is used
+        instead of reading and parsing the file again.
+        """
+        lock = self._lock(path)
+        if snapshot is not None and self._is_current(path, snapshot):
+            return lock, snapshot['frame'].copy()
         try:
-            df = pd.read_csv(f)
+            df = pd.read_csv(path, encoding='utf-8-sig')
         except Exception:
             df = pd.DataFrame()
-        return f, df
+        return lock, df
 
-    def _write_and_unlock(self, f, df):
-        f.seek(0)
-        f.truncate()
-        df.to_csv(f, index=False)
-        f.flush()
-        portalocker.unlock(f)
-        f.close()
+    def _write_and_unlock(self, lock, path, df):
+        try:
+            _replace_csv(path, df)
+            self._invalidate(path)
+            if os.path.abspath(path) == os.path.abspath(self.products_path):
+                # We already hold the new content: patch the shared snapshot instead of re-parsing
+                self._prime(path, self._products_from_frame(df))
+        finally:
+            self._unlock(lock)
 
-    def _normalize_id(self, value):
+    def _set_cell(self, df, i, key, value):
         """
-        標準化 ID：將各種格式的 ID（如 1244, 1244.0, "1244.0"）統一轉換為整數字串（如 "1244"）。
-        這解決了 CSV 資料中 ID 格式不一致的問題。
+        df.at[i, key] = value, widening the column to object first when it was parsed
+        as numeric (e.g. an all-empty highest_bidder_id column) and cannot hold `value`.
         """
-        if pd.isna(value) or str(value).strip() == '':
-            return ''
-        try:
-            # 處理可能帶有 .0 的字串或數值
-            return str(int(float(value)))
-        except (ValueError, TypeError):
-            return str(value).strip()
-
-    def _ensure_aware(self, val):
-        """Robustly convert a value (string, datetime, Timestamp) to an aware Taipei datetime."""
-        if not val or pd.isna(val) or val == '':
-            return None
-            
-        dt = None
-        if isinstance(val, (datetime, pd.Timestamp)):
-            dt = val.to_pydatetime() if isinstance(val, pd.Timestamp) else val
-        elif isinstance(val, str) and val.strip():
-            s = val.strip()
-            # Try ISO formats and common variations
-            # Python < 3.11 fromisoformat is strict, so we use strptime fallbacks
-            formats = [
-                "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M",
-                "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
-                "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M"
-            ]
-            
-            # Try fromisoformat first
-            try:
-                dt = datetime.fromisoformat(s.replace('Z', '+00:00'))
-            except:
-                for fmt in formats:
-                    try:
-                        dt = datetime.strptime(s, fmt)
-                        break
-                    except: continue
-        
-        if dt:
-            if dt.tzinfo is None:
-                dt = TAIPEI_TZ.localize(dt)
-            return dt
-        return None
+        if key in df.columns and isinstance(value, str) and pd.api.types.is_numeric_dtype(df[key]):
+            df[key] = df[key].astype(object)
+        df.at[i, key] = value
 
-    def _derive_status(self, product):
+    def _cached(self, path, builder):
         """
-        Derive status based on time, unless explicitly Unsold.
+        Return the parsed payload for `path`, rebuilding it with `builder()` only
+        when the file's mtime/size/inode changed since the last build.
         """
-        if product.get('status') == 'Unsold':
-            return 'Unsold'
-            
-        start_dt = self._ensure_aware(product.get('start_time'))
-        end_dt = self._ensure_aware(product.get('end_time'))
-        
-        if not start_dt or not end_dt:
-            return product.get('status', 'Upcoming')
-
-        now = datetime.now(TAIPEI_TZ)
-        
-        if now < start_dt:
-            return 'Upcoming'
-        elif now > end_dt:
-            return 'Closed'
-        else:
-            return 'Open'
+        key = os.path.abspath(path)
+        signature = _file_signature(path)
+        with _snapshots_lock:
+            entry = _snapshots.get(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            return entry[1]
+
+        # Signature is taken before the read, so a concurrent write only makes
+        # the next call rebuild again; it can never pin a stale payload.
+        payload = builder()
+        with _snapshots_lock:
+            _snapshots[key] = (signature, payload)
+        return payload
+
+    def _prime(self, path, payload):
+        """Install `payload` as the snapshot of `path` as it is on disk right now (caller holds the lock)."""
+        signature = _file_signature(path)
+        if signature is not None:
+            with _snapshots_lock:
+                _snapshots[os.path.abspath(path)] = (signature, payload)
+
+    def _is_current(self, path, payload):
+        """Whether `payload` is the cached parse of `path` as it is on disk right now (caller holds the lock)."""
+        signature = _file_signature(path)
+        with _snapshots_lock:
+            entry = _snapshots.get(os.path.abspath(path))
+        return entry is not None and entry[1] is payload and signature is not None and entry[0] == signature
+
+    def _invalidate(self, path):
+        """Drop the cached snapshot of `path` after this process wrote it."""
+        with _snapshots_lock:
+            _snapshots.pop(os.path.abspath(path), None)
+
+    def _load_products_snapshot(self):
+        return self._products_from_frame(pd.read_csv(self.products_path, encoding='utf-8-sig'))
+
+    def _products_from_frame(self, df):
+        """
+        Normalize a products frame into snapshot rows (NaN -> '', int ids, aware datetimes).
+        Works column by column: NaN is filled once per column, ids and prices get typed
+        conversions, and each distinct start/end time string is parsed only once.
+        Status is left as stored; it depends on the clock and is derived per call
+        from the snapshot's StatusTimeline.
+        """
+        if 'id' not in df.columns:
+            return {'rows': [], 'by_id': {}, 'timeline': StatusTimeline([]), 'frame': df}
+
+        # Skip empty rows or rows without a numeric ID
+        ids = pd.to_numeric(df['id'], errors='coerce')
+        keep = (ids.notna() & (ids != 0)).to_numpy()
+        dropped = len(df) - int(keep.sum())
+        if dropped and df['id'][~keep].notna().any():
+            logger.warning(f"Skipped {dropped} product rows without a valid id")
+
+        columns = {}
+        for name in df.columns:
+            if name == 'id':
+                columns[name] = ids[keep].astype('int64').tolist()
+            elif name in INTEGRAL_PRODUCT_COLUMNS:
+                columns[name] = self._number_cells(df[name][keep])
+            elif name in ('start_time', 'end_time'):
+                columns[name] = self._time_cells(df[name][keep])
+            else:
+                col = df[name][keep]
+                columns[name] = col.astype(object).where(col.notna(), '').tolist()
+
+        names = list(columns)
+        rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+        by_id = {}
+        for p in rows:
+            by_id.setdefault(p['id'], p)
+
+        # The parsed frame itself lets writers skip re-reading the file (see _lock_and_read)
+        return {'rows': rows, 'by_id': by_id, 'timeline': StatusTimeline(rows), 'frame': df}
+
+    def _number_cells(self, col):
+        """Prices/counts as ints when whole (24010.0 -> 24010), '' for blanks, other text untouched."""
+        num = pd.to_numeric(col, errors='coerce')
+        if num.notna().all() and (num % 1 == 0).all():
+            return num.astype('int64').tolist()
+        cells = []
+        for raw, n in zip(col.tolist(), num.tolist()):
+            if pd.isna(n):
+                cells.append('' if pd.isna(raw) else raw)
+            else:
+                cells.append(int(n) if float(n).is_integer() else n)
+        return cells
+
+    def _time_cells(self, col):
+        """Aware datetimes; each distinct value goes through _ensure_aware once."""
+        parsed = {}
+        cells = []
+        for raw in col.tolist():
+            if pd.isna(raw):
+                cells.append('')
+                continue
+            if raw not in parsed:
+                dt = self._ensure_aware(raw)
+                parsed[raw] = dt if dt else raw
+            cells.append(parsed[raw])
+        return cells
+
+    def _products_snapshot(self):
+        return self._cached(self.products_path, self._load_products_snapshot)
+
+    def _status_timeline(self):
+        return self._products_snapshot()['timeline']
 
     def get_all_products(self):
-        df = pd.read_csv(self.products_path, encoding='utf-8-sig')
-        
-        products = df.to_dict(orient='records')
+        snapshot = self._products_snapshot()
+        image_table = self.image_manifest.table()
+        derived_table = self.image_derivatives.table()
         valid_products = []
-        for p in products:
-            # Skip empty rows or rows without ID
-            if not p.get('id') or pd.isna(p.get('id')):
-                continue
-                
-            try:
-                # Clean numerical values
-                p['id'] = int(float(p['id']))
-                
-                # Sanitize other fields (replace NaN with empty string)
-                for key in p:
-                    if pd.isna(p[key]):
-                        p[key] = ''
-                
-                # Convert times FIRST, then derive status
-                p = self._convert_product_times(p)
-                p['status'] = self._derive_status(p)
-                
-                imgs = self.get_product_images(p['id'])
-                if imgs:
-                    p['main_image'] = f"/data_photo/{p['id']}/{imgs[0]}"
-                else:
-                    p['main_image'] = None
-                valid_products.append(p)
-            except Exception as e:
-                logger.warning(f"Error processing product row: {e}")
-                continue
-                
+        for row, status in zip(snapshot['rows'], snapshot['timeline'].status_list()):
+            # Callers decorate the dicts (winner_name, ISO end_time...), so hand out copies
+            p = dict(row)
+            p['status'] = status
+            self._set_main_image(p, image_table, derived_table)
+            valid_products.append(p)
+
         return valid_products
 
+    def _product_fingerprints(self):
+        snapshot = self._products_snapshot()
+        fingerprints = {}
+        for row, status in zip(snapshot['rows'], snapshot['timeline'].status_list()):
+            fingerprints[row['id']] = self._fingerprint(dict(row, status=status))
+        return fingerprints
+
+    def get_data_version(self):
+        """Opaque token that changes whenever products, bids or employees change on disk."""
+        return '|'.join(str(_file_signature(p)) for p in (self.products_path, self.bids_path, self.employees_path))
+
     def get_product_by_id(self, product_id):
-        df = pd.read_csv(self.products_path, encoding='utf-8-sig')
-        res = df[df['id'] == int(product_id)]
-        if res.empty:
+        snapshot = self._products_snapshot()
+        row = snapshot['by_id'].get(int(product_id))
+        if row is None:
             return None
-            
-        product = res.iloc[0].to_dict()
-        # Sanitize (replace NaN with empty string)
-        for key in product:
-            if pd.isna(product[key]):
-                product[key] = ''
-            
-        # Convert times FIRST, then derive status
-        product = self._convert_product_times(product)
-        product['status'] = self._derive_status(product)
-        
-        return product
 
-    def _convert_product_times(self, product):
-        """Helper to convert various time formats to timezone-aware datetime objects."""
-        for field in ['start_time', 'end_time']:
-            val = product.get(field)
-            dt = self._ensure_aware(val)
-            if dt:
-                product[field] = dt
-            else:
-                # Ensure it's not a NaN object to avoid template issues
-                if pd.isna(val) or val is None:
-                    product[field] = ''
-                
+        product = dict(row)
+        product['status'] = snapshot['timeline'].status_of(product['id'])
+
         return product
 
-    def get_product_images(self, product_id):
+    def _load_employee_index(self):
         """
-        Scan data_photo/{product_id} directory for images.
-        Returns list of Media URL paths.
+        Parse employees.csv once into lookup tables keyed by normalized employeeId
+        and by lowercased email. Rebuilt by `_cached` whenever the file changes.
         """
-        try:
-            photo_dir = os.path.join(self.data_dir, '..', 'data_photo', str(product_id))
-            if not os.path.exists(photo_dir):
-                return []
-            
-            files = sorted(os.listdir(photo_dir))
-            # Filter partial extension check or just simple one
-            images = [f for f in files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))]
-            
-            # Use settings.MEDIA_URL but we are in adapter, maybe strict dep on settings is fine or pass it in.
-            # Using relative path assuming usage with {{ MEDIA_URL }} or similar in template
-            # For simplicity, returning full relative URL path if we assume '/media/' prefix.
-            # But adapter shouldn't know URL config ideally.
-            # Let's return filenames, view can construct URL.
-            return images
-        except Exception:
-            return []
+        # 嘗試不同編碼讀取
+        df = None
+        for enc in ['utf-8-sig', 'utf-8', 'cp950']:
+            try:
+                df = pd.read_csv(self.employees_path, dtype=str, encoding=enc)
+                break
+            except UnicodeDecodeError:
+                continue
+
+        index = {'by_id': {}, 'by_email': {}, 'has_email': False}
+        if df is None:
+            return index
+
+        # 清理欄位名稱（去除不可見字元與空白）與欄位值的前後空白
+        df.columns = [str(c).strip() for c in df.columns]
+        for col in df.columns:
+            df[col] = df[col].str.strip()
+        index['has_email'] = 'email' in df.columns
+
+        for row in df.to_dict(orient='records'):
+            emp_id = self._normalize_id(row.get('employeeId', ''))
+            if emp_id:
+                # First row wins, same as the old top-down scan
+                index['by_id'].setdefault(emp_id, row)
+            email = row.get('email')
+            if isinstance(email, str) and email:
+                index['by_email'].setdefault(email.lower(), row)
+
+        return index
+
+    def _employee_index(self):
+        return self._cached(self.employees_path, self._load_employee_index)
 
     def get_employee_by_employeeId(self, employeeId):
         """
         極致魯棒的員工查詢：支援多種編碼、自動修剪欄位空白、標準化 ID 比較。
         """
         try:
-            # 嘗試不同編碼讀取
-            df = None
-            for enc in ['utf-8-sig', 'utf-8', 'cp950']:
-                try:
-                    df = pd.read_csv(self.employees_path, dtype=str, encoding=enc)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if df is None:
-                return None
-
-            # 清理欄位名稱（去除不可見字元與空白）
-            df.columns = [str(c).strip() for c in df.columns]
-            
             target_id = self._normalize_id(employeeId)
             if not target_id:
                 return None
 
-            # 遍歷尋找，同樣對 CSV 內的 ID 進行標準化
-            for _, row in df.iterrows():
-                # 確保取到的欄位值是字串且標準化
-                row_emp_id = self._normalize_id(row.get('employeeId', ''))
-                if row_emp_id == target_id:
-                    return row.to_dict()
-            
-            return None
+            emp = self._employee_index()['by_id'].get(target_id)
+            return dict(emp) if emp else None
         except Exception as e:
             logger.error(f"Error in lookup for {employeeId}: {str(e)}")
             return None
 
+    def get_employees_by_ids(self, employee_ids):
+        """
+        Batch lookup for resolving bidder names of a whole bid history at once.
+
+        Args:
+            employee_ids: Iterable of employeeId values in any format (1244, 1244.0, "1244")
+
+        Returns:
+            dict: {employee_id as given: employee dict} for the ids that exist
+        """
+        try:
+            by_id = self._employee_index()['by_id']
+        except Exception as e:
+            logger.error(f"Error reading employees CSV: {str(e)}")
+            return {}
+
+        found = {}
+        for employee_id in employee_ids:
+            emp = by_id.get(self._normalize_id(employee_id))
+            if emp:
+                found[employee_id] = dict(emp)
+        return found
+
     def get_employee_by_email(self, email):
         try:
-            # Try utf-8-sig first, fallback to cp950 (Traditional Chinese)
-            try:
-                df = pd.read_csv(self.employees_path, dtype=str, encoding='utf-8-sig')
-            except UnicodeDecodeError:
-                df = pd.read_csv(self.employees_path, dtype=str, encoding='cp950')
-            
-            # Robustness: strip whitespaces from column names
-            df.columns = [c.strip() for c in df.columns]
-            
-            if 'email' not in df.columns:
-                logger.error(f"Column 'email' not found in {self.employees_path}. Available: {df.columns.tolist()}")
-                return None
-                
-            # Robustness: strip whitespaces from data and case-insensitive comparison
-            target_email = str(email).strip().lower()
-            df['email_clean'] = df['email'].str.strip().str.lower()
-            
-            res = df[df['email_clean'] == target_email]
-            if res.empty:
+            index = self._employee_index()
+            if not index['has_email']:
+                logger.error(f"Column 'email' not found in {self.employees_path}")
                 return None
-            
-            # Return original data (as dict) without the 'email_clean' temp column
-            result = res.iloc[0].to_dict()
-            result.pop('email_clean', None)
-            return result
+
+            # Robustness: strip whitespaces and case-insensitive comparison
+            emp = index['by_email'].get(str(email).strip().lower())
+            return dict(emp) if emp else None
         except FileNotFoundError:
             logger.error(f"Employees file not found at {self.employees_path}")
             return None
@@ -270,191 +384,170 @@ class ExcelAdapter:
             logger.error(f"Error reading employees CSV: {str(e)}")
             return None
 
+    def _bids_frame(self):
+        """Cached DataFrame of bids.csv. Shared between callers: never mutate it in place."""
+        return self._cached(self.bids_path, lambda: pd.read_csv(self.bids_path, encoding='utf-8-sig'))
+
+    def get_all_bids(self):
+        """Every bid, newest first (admin bid list)."""
+        try:
+            return self._bids_frame().sort_values('bid_timestamp', ascending=False).to_dict('records')
+        except Exception:
+            return []
+
     def get_bids_for_product(self, product_id, limit=10):
-        df = pd.read_csv(self.bids_path, encoding='utf-8-sig')
+        df = self._bids_frame()
         res = df[df['product_id'] == int(product_id)].sort_values('bid_timestamp', ascending=False)
         return res.head(limit).to_dict(orient='records')
 
-    def get_bids_for_employee(self, employee_id):
-        # Specify dtypes to ensure product_id is integer, not float
-        df_bids = pd.read_csv(self.bids_path, encoding='utf-8-sig', 
-                             dtype={'product_id': 'Int64'})  # Use Int64 to handle NaN
-        # Filter by bidder_id (employee_id should be string usually, but let's ensure type safety)
-        # In save_bid we saved it as is. In login we stored it as string/from csv.
-        # Let's ensure comparison works.
-        res = df_bids[df_bids['bidder_id'].astype(str) == str(employee_id)].sort_values('bid_timestamp', ascending=False)
-        
-        bids = res.to_dict(orient='records')
-        
-        # Enrich with product name, highest_bidder_id, and status
-        if not bids:
-            return []
-            
-        df_prod = pd.read_csv(self.products_path, encoding='utf-8-sig',
-                             dtype={'id': 'Int64'})  # Ensure product id is integer
-        df_prod = df_prod.fillna('')
-        
-        # Create maps for product information
-        prod_map = df_prod.set_index('id')['name'].to_dict()
-        highest_bidder_map = df_prod.set_index('id')['highest_bidder_id'].to_dict()
-        status_map = df_prod.set_index('id')['status'].to_dict()
-        
-        # Track the highest bid per product for this employee
-        product_highest_bids = {}
-        for b in bids:
-            pid = b.get('product_id')
-            amount = b.get('amount', 0)
-            if pid not in product_highest_bids or amount > product_highest_bids[pid]:
-                product_highest_bids[pid] = amount
-        # Group bids by product
-        from collections import defaultdict
-        grouped_bids = defaultdict(lambda: {'bids': []})
-        
-        for b in bids:
-            pid = b.get('product_id')
-            product_name = prod_map.get(pid, f'Unknown Product ({pid})')
-            
-            # Determine if this bid is a winning bid
-            highest_bidder = self._normalize_id(highest_bidder_map.get(pid, ''))
-            product_status = str(status_map.get(pid, ''))
-            is_highest_for_employee = (b.get('amount', 0) == product_highest_bids.get(pid, -1))
-            
-            # Winning conditions:
-            # 1. This employee is the highest bidder for the product
-            # 2. This is the employee's highest bid on this product
-            # 3. Product is not marked as "Unsold" (流標)
-            is_winning = (
-                self._normalize_id(employee_id) == highest_bidder and 
-                is_highest_for_employee and
-                product_status != 'Unsold'
-            )
-            
-            # Add to grouped structure
-            if 'product_name' not in grouped_bids[pid]:
-                grouped_bids[pid]['product_id'] = int(pid)  # Convert to int for URL reverse
-                grouped_bids[pid]['product_name'] = product_name
-                grouped_bids[pid]['is_winning'] = is_winning
-            
-            grouped_bids[pid]['bids'].append({
-                'amount': b.get('amount'),
-                'bid_timestamp': b.get('bid_timestamp')
-            })
-        
-        # Convert to list and add bid counts
-        result = []
-        for pid, data in grouped_bids.items():
-            data['bid_count'] = len(data['bids'])
-            result.append(data)
-        
-        # Sort by latest bid timestamp (first bid in each group)
-        result.sort(key=lambda x: x['bids'][0]['bid_timestamp'] if x['bids'] else '', reverse=True)
-        
-        return result
-
-    def user_has_any_bids(self, bidder_id):
+    def get_bid_stats(self, product_id):
+        """(bid count, latest bid id) of a product, from the journal tail."""
+        tail = self.journal.tail(product_id)
+        return (tail['count'], tail['last_bid']['id']) if tail else (0, None)
+
+    def get_top_bids(self, product_ids=None):
         """
-        Check if a user has made any bids.
-        Used for first-time bid confirmation feature.
-        
+        Highest bid of every product in a single pass over bids.csv.
+
         Args:
-            bidder_id: Employee ID to check
-            
+            product_ids: Optional iterable of product ids to restrict the result to
+
         Returns:
-            bool: True if user has any bid records, False if this would be their first bid
+            dict: {product_id (int): bid record} for products that have at least one bid
         """
-        try:
-            df_bids = pd.read_csv(self.bids_path, encoding='utf-8-sig')
-            if df_bids.empty:
-                return False
-            
-            # Check if this bidder has any records
-            user_bids = df_bids[df_bids['bidder_id'].astype(str) == str(bidder_id)]
-            return not user_bids.empty
-        except Exception:
-            # If there's an error reading, assume user has no bids (safer)
-            return False
+        df = self._bids_frame()
+        if df.empty:
+            return {}
+
+        df = df.dropna(subset=['product_id', 'amount'])
+        if product_ids is not None:
+            df = df[df['product_id'].isin([int(pid) for pid in product_ids])]
+        if df.empty:
+            return {}
 
-    def save_bid(self, product_id, employee_id, amount):
+        # Prices only go up, so the max amount per product is also its latest bid
+        top = df.loc[df.groupby('product_id')['amount'].idxmax()]
+        return {int(bid['product_id']): bid for bid in top.to_dict(orient='records')}
+
+    def _bid_summary(self):
+        return self.journal.summary()
+
+    def _product_names(self, product_ids):
+        by_id = self._products_snapshot()['by_id']
+        return {pid: by_id[pid].get('name', '') for pid in product_ids if pid in by_id}
+
+    def _save_bids(self, requests):
         """
-        Transactional save of a bid.
-        Updates 'bids.csv' and 'products.csv' safely.
+        Validate and persist bids in arrival order: one journal append (one fsync)
+        for every accepted bid and one products.csv write for every product touched.
+
+        Called with whole batches by the adapter's single writer (see BidSequencer),
+        so concurrent bids, on one product or many, share these two writes.
         """
-        f_prod, df_prod = self._lock_and_read(self.products_path)
-        f_bids, df_bids = self._lock_and_read(self.bids_path)
-        try:
-            prod_idx = df_prod.index[df_prod['id'] == int(product_id)].tolist()
-            if not prod_idx:
-                raise Exception("Product not found during save") # Should have been caught in service
-            
-            i = prod_idx[0]
-            product = df_prod.loc[i]
-            
-            # Re-read basics for race condition check (though files are locked now)
-            # Logic is moved to Service, but we are inside lock now.
-            # Ideally Service does checks, but for file-based DB, we might need to re-verify inside lock?
-            # For this simple app, we trust Service checks OR we repeat minimal checks if strictly needed.
-            # Let's assumes Service checks were for UX, but here we just write.
-            # But wait, if two requests come in, Service check passes for both, then they race for lock.
-            # So we SHOULD strictly check invariants here: e.g. amount > current_price.
-            
-            current_price = float(product.get('current_price') if not pd.isna(product.get('current_price')) else product.get('start_price',0))
-            bids_count = int(product.get('bids_count', 0)) if not pd.isna(product.get('bids_count')) else 0
-            
-            # CRITICAL: Self-bidding restriction check inside the lock
-            current_highest_bidder = self._normalize_id(product.get('highest_bidder_id', ''))
-            new_bidder = self._normalize_id(employee_id)
-            if current_highest_bidder == new_bidder:
-                raise ValueError("You are already the highest bidder (Race condition guarded)")
-
-            # For first bid: allow amount == start_price  
-            # For subsequent bids: amount must be > current_price
-            if bids_count == 0:
-                # First bid: must be >= start_price (usually should equal start_price)
-                start_price = float(product.get('start_price', 0))
-                if amount < start_price:
-                    raise ValueError("First bid must be at least the starting price")
-            else:
-                # Subsequent bids: must be > current_price
-                if amount <= current_price:
-                     # Race condition detected
-                     raise ValueError("Race condition: Price already updated")
-
-            # Append bid
-            new_id = 1 if df_bids.empty else int(df_bids['id'].max()) + 1
-            ts = datetime.now(TAIPEI_TZ).isoformat()
-            new_bid = {'id': new_id, 'product_id': int(product_id), 'bidder_id': employee_id, 'amount': amount, 'bid_timestamp': ts}
-            
-            # concat is preferred over append (deprecated) in newer pandas, but sticking to style if older.
-            # Using basic list append logic if dataframe is too heavy? No, stick to DF.
-            df_bids = pd.concat([df_bids, pd.DataFrame([new_bid])], ignore_index=True)
-            
-            # Update product
-            df_prod.at[i, 'current_price'] = amount
-            df_prod.at[i, 'highest_bidder_id'] = employee_id
-            df_prod.at[i, 'last_bid_time'] = ts
-            bids_count = int(product.get('bids_count', 0)) if not pd.isna(product.get('bids_count')) else 0
-            df_prod.at[i, 'bids_count'] = bids_count + 1
-            
-            self._write_and_unlock(f_bids, df_bids)
-            self._write_and_unlock(f_prod, df_prod)
-            
-            return {'success': True, 'bidId': new_id, 'newPrice': amount, 'timestamp': ts}
-            
+        outcomes = [None] * len(requests)
+        accepted = []   # (request index, updates written with the bid)
+        states = {}     # product_id -> the product as it stands after the earlier bids of the batch
+
+        snapshot = None
+
+        with sequencer.writer(self.bids_path):
+            def plan(tail):
+                # Runs under the file lock. Two requests can both pass earlier checks and then
+                # race for the product, so the rules and invariants (amount > current price,
+                # not self-outbid) are enforced here. The journal tail is authoritative for
+                # anything appended after the last products.csv write.
+                nonlocal snapshot
+                # Taken here, not before the lock: an admin edit (end time, status, price) from
+                # another process that lands while this batch waits for the lock is checked against
+                snapshot = self._products_snapshot()
+                for i, req in enumerate(requests):
+                    product_id = req['product_id']
+                    try:
+                        current = states.get(product_id)
+                        if current is None:
+                            current = states[product_id] = self._bid_state(snapshot, product_id, tail(product_id))
+                        updates = {}
+                        if req['rules'] is not None:
+                            updates = req['rules'](current, current['last_bid']) or {}
+                        self._check_bid_invariants(current, req['employee_id'], req['amount'])
+                    except Exception as e:
+                        outcomes[i] = e
+                        continue
+
+                    ts = datetime.now(TAIPEI_TZ).isoformat()
+                    current.update(
+                        current_price=req['amount'],
+                        highest_bidder_id=req['employee_id'],
+                        bids_count=current['bids_count'] + 1,
+                        last_bid={'product_id': product_id, 'bidder_id': req['employee_id'],
+                                  'amount': req['amount'], 'bid_timestamp': ts},
+                    )
+                    if 'end_time' in updates:
+                        current['end_time'] = self._ensure_aware(updates['end_time'])
+                    accepted.append((i, dict(updates, last_bid_time=ts), current['bids_count']))
+                return [(requests[i]['product_id'], requests[i]['employee_id'], requests[i]['amount'],
+                         updates['last_bid_time']) for i, updates, _ in accepted]
 
-        except Exception as e:
-            # Unlock on error
-            try:
-                portalocker.unlock(f_bids)
-                f_bids.close()
-            except: pass
             try:
-                portalocker.unlock(f_prod)
-                f_prod.close()
-            except: pass
-            raise e
+                records = self.journal.append_many(plan)
+            except Exception as e:
+                # Nothing was appended (e.g. bids.csv held open by Excel): every bid not
+                # already rejected fails with the error, including when plan never ran
+                return [e if outcome is None else outcome for outcome in outcomes]
+
+            if records:
+                self._invalidate(self.bids_path)
+                # Update products in one write (still holding the writer, so row updates keep bid order)
+                rows = {}
+                for (i, updates, _), rec in zip(accepted, records):
+                    rows.setdefault(rec['product_id'], {}).update(updates, **{
+                        'current_price': rec['amount'],
+                        'highest_bidder_id': rec['bidder_id'],
+                        'bids_count': states[rec['product_id']]['bids_count'],
+                    })
+                try:
+                    # Rows are patched into the frame of the snapshot the bids were checked against:
+                    # no second read/parse of products.csv unless another writer changed it meanwhile
+                    self._write_product_rows(rows, snapshot=snapshot)
+                except Exception:
+                    # The bids are durable in bids.csv, whose tail later bids are checked
+                    # against; only the products.csv copy of price/bidder lags until the next write
+                    logger.error(f"Bids {[rec['id'] for rec in records]} saved but products.csv update failed", exc_info=True)
+
+        for (i, updates, bids_count), rec in zip(accepted, records):
+            result = {'success': True, 'bidId': rec['id'], 'newPrice': rec['amount'], 'timestamp': rec['bid_timestamp'],
+                      'bidsCount': bids_count}
+            outcomes[i] = result
+            extra = {k: v for k, v in updates.items() if k != 'last_bid_time'}
+            self._notify_write('save_bid', rec['product_id'], dict(extra, **result, bidder_id=rec['bidder_id']))
+        return outcomes
+
+    def _bid_state(self, snapshot, product_id, tail):
+        """The product as a bid sees it: derived status, and price and highest bidder from the journal tail."""
+        product = snapshot['by_id'].get(product_id)
+        if product is None:
+            raise LookupError("Product not found during save")
+        bids_count = int(float(product.get('bids_count') or 0))
+        if tail:
+            last_bid = tail['last_bid']
+            current_price = last_bid['amount']
+            highest_bidder_id = last_bid['bidder_id']
+            bids_count = max(bids_count, tail['count'])
+        else:
+            last_bid = None
+            current_price = product.get('current_price') or product.get('start_price')
+            highest_bidder_id = product.get('highest_bidder_id', '')
+        return dict(
+            product,
+            status=snapshot['timeline'].status_of(product_id),
+            current_price=current_price,
+            highest_bidder_id=highest_bidder_id,
+            bids_count=bids_count,
+            last_bid=last_bid,
+        )
 
     def save_product(self, product_dict):
-        f, df = self._lock_and_read(self.products_path)
+        lock, df = self._lock_and_read(self.products_path)
         try:
             # Generate ID - handle case where 'id' column might not exist
             if df.empty or 'id' not in df.columns:
@@ -478,55 +571,61 @@ class ExcelAdapter:
                     product_dict[k] = v
                     
             df = pd.concat([df, pd.DataFrame([product_dict])], ignore_index=True)
-            self._write_and_unlock(f, df)
-            return new_id
-        except Exception as e:
-            try:
-                portalocker.unlock(f)
-                f.close()
-            except: pass
-            raise e
+            self._write_and_unlock(lock, self.products_path, df)
+        except Exception:
+            self._unlock(lock)
+            raise
+        self._notify_write('save_product', new_id, product_dict)
+        return new_id
 
     def update_product(self, product_id, updates):
-        f, df = self._lock_and_read(self.products_path)
+        self._write_product_fields(product_id, updates)
+        self._notify_write('update_product', int(product_id), updates)
+        return True
+
+    def _write_product_fields(self, product_id, updates):
+        return self._write_product_rows({int(product_id): updates})
+
+    def _write_product_rows(self, updates_by_id, snapshot=None):
+        """
+        Apply {product_id: updates} with one locked rewrite of products.csv, starting
+        from `snapshot`'s frame when it is still current (see _lock_and_read).
+        """
+        lock, df = self._lock_and_read(self.products_path, snapshot)
         try:
-            idx_list = df.index[df['id'] == int(product_id)].tolist()
-            if not idx_list:
-                raise ValueError("Product not found")
-            
-            i = idx_list[0]
-            for k, v in updates.items():
-                # Safety check: If setting an empty string to a numeric column, use None/NaN
-                if v == '' and k in df.columns and pd.api.types.is_numeric_dtype(df[k]):
-                    df.at[i, k] = None
-                else:
-                    df.at[i, k] = v
-                
-            self._write_and_unlock(f, df)
+            for product_id, updates in updates_by_id.items():
+                idx_list = df.index[df['id'] == int(product_id)].tolist()
+                if not idx_list:
+                    raise ValueError("Product not found")
+
+                i = idx_list[0]
+                for k, v in updates.items():
+                    # Safety check: If setting an empty string to a numeric column, use None/NaN
+                    if v == '' and k in df.columns and pd.api.types.is_numeric_dtype(df[k]):
+                        df.at[i, k] = None
+                    else:
+                        self._set_cell(df, i, k, v)
+
+            self._write_and_unlock(lock, self.products_path, df)
             return True
-        except Exception as e:
-            try:
-                portalocker.unlock(f)
-                f.close()
-            except: pass
-            raise e
+        except Exception:
+            self._unlock(lock)
+            raise
 
     def delete_product(self, product_id):
-        f, df = self._lock_and_read(self.products_path)
+        lock, df = self._lock_and_read(self.products_path)
         try:
             idx_list = df.index[df['id'] == int(product_id)].tolist()
             if not idx_list:
                  # Already gone is fine
-                 self._write_and_unlock(f, df)
+                 self._write_and_unlock(lock, self.products_path, df)
                  return True
             
             # Hard delete
             df = df.drop(idx_list[0])
-            self._write_and_unlock(f, df)
-            return True
-        except Exception as e:
-            try:
-                portalocker.unlock(f)
-                f.close()
-            except: pass
-            raise e
+            self._write_and_unlock(lock, self.products_path, df)
+        except Exception:
+            self._unlock(lock)
+            raise
+        self._notify_write('delete_product', int(product_id))
+        return True
@@ -0,0 +1,30 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+# Blocking storage calls made from async views run on two fixed-size pools:
+# polls and streams share the read pool, bids get their own write pool, so a
+# flood of polls at closing time can queue up without delaying a single bid.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(kind):
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            workers = settings.AUCTION_READ_WORKERS if kind == 'read' else settings.AUCTION_WRITE_WORKERS
+            pool = _pools[kind] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'auction-{kind}')
+        return pool
+
+
+def run_read(func, *args, **kwargs):
+    """Await `func(*args, **kwargs)` on the read pool (polling, streams)."""
+    return asyncio.get_running_loop().run_in_executor(_pool('read'), functools.partial(func, *args, **kwargs))
+
+
+def run_write(func, *args, **kwargs):
+    """Await `func(*args, **kwargs)` on the write pool (bids)."""
+    return asyncio.get_running_loop().run_in_executor(_pool('write'), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,61 @@
+import threading
+import time
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.outcomes = None
+        self.done = threading.Event()
+
+
+class GroupCommitter:
+    """
+    Group commit of concurrent requests.
+
+    The first request to arrive while no batch is open becomes the leader of a
+    new one: it waits `window` seconds for more requests, closes the batch and
+    hands all of them to `commit(items)`, which persists them together and
+    returns one outcome per item, in order. The other requests of the batch
+    just wait for their outcome.
+
+    One batch commits at a time. Requests arriving during a commit form the
+    next batch, so batches grow with the load instead of queueing one by one.
+    """
+
+    def __init__(self, commit, window):
+        self._commit = commit
+        self.window = window
+        self._lock = threading.Lock()          # guards self._batch
+        self._commit_lock = threading.Lock()   # one batch commits at a time
+        self._batch = None
+
+    def submit(self, item):
+        """Outcome of `item` as returned by commit(); an exception raised by commit() is every item's outcome."""
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+            slot = len(batch.items)
+            batch.items.append(item)
+
+        if not leader:
+            batch.done.wait()
+            return batch.outcomes[slot]
+
+        if self.window > 0:
+            time.sleep(self.window)
+        with self._commit_lock:
+            with self._lock:
+                # Close the batch: later requests start the next one
+                self._batch = None
+            try:
+                batch.outcomes = self._commit(batch.items)
+            except Exception as e:
+                batch.outcomes = [e] * len(batch.items)
+            finally:
+                if batch.outcomes is None:
+                    batch.outcomes = [RuntimeError("Group commit aborted")] * len(batch.items)
+                batch.done.set()
+        return batch.outcomes[slot]
@@ -0,0 +1,132 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .image_manifest import get_image_manifest
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional: without it every page keeps using the originals
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels of each derivative
+DERIVATIVE_SIZES = {
+    'thumb': 400,    # product cards, carousel thumbnails
+    'medium': 1200,  # product detail main picture
+}
+JPEG_QUALITY = 80
+WEBP_QUALITY = 75
+
+# data_photo/_derived/<product_id>/<stem>-<size>.jpg|.webp; the folder name is not
+# a product id, so the originals' manifest and the admin pages never see it
+DERIVED_DIR = '_derived'
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_derivative_pipeline(photo_root):
+    key = os.path.abspath(photo_root)
+    with _pipelines_lock:
+        pipeline = _pipelines.get(key)
+        if pipeline is None:
+            pipeline = _pipelines[key] = DerivativePipeline(key)
+        return pipeline
+
+
+def derivative_name(filename, size, ext='jpg'):
+    return f"{os.path.splitext(filename)[0]}-{size}.{ext}"
+
+
+class DerivativePipeline:
+    """
+    Builds resized thumbnail/medium copies (JPEG, plus WebP when enabled and
+    supported) of uploaded product pictures on a small background pool, and
+    answers which derivatives exist from an image manifest of the derived folder.
+    """
+
+    def __init__(self, photo_root):
+        self.photo_root = photo_root
+        self.derived_root = os.path.join(photo_root, DERIVED_DIR)
+        self.manifest = get_image_manifest(self.derived_root)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def _webp(self):
+        return settings.AUCTION_IMAGE_WEBP and features.check('webp')
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=settings.AUCTION_IMAGE_WORKERS, thread_name_prefix='auction-images'
+                )
+            return self._pool
+
+    def schedule(self, product_id, filename):
+        """Queue derivative generation for one original; returns the Future (None without Pillow)."""
+        if not self.enabled:
+            return None
+        return self._executor().submit(self._build_logged, int(product_id), filename)
+
+    def _build_logged(self, product_id, filename):
+        try:
+            return self.build(product_id, filename)
+        except Exception as e:
+            logger.warning(f"Could not build derivatives of {product_id}/{filename}: {e}")
+            return []
+
+    def build(self, product_id, filename):
+        """Write every derivative of data_photo/<product_id>/<filename> now; returns the file names."""
+        source = os.path.join(self.photo_root, str(product_id), filename)
+        target_dir = os.path.join(self.derived_root, str(product_id))
+        os.makedirs(target_dir, exist_ok=True)
+
+        written = []
+        with Image.open(source) as original:
+            picture = ImageOps.exif_transpose(original).convert('RGB')
+        for size, edge in DERIVATIVE_SIZES.items():
+            resized = picture.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            formats = [('jpg', 'JPEG', {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True})]
+            if self._webp():
+                formats.append(('webp', 'WEBP', {'quality': WEBP_QUALITY, 'method': 4}))
+            for ext, fmt, options in formats:
+                name = derivative_name(filename, size, ext)
+                tmp = os.path.join(target_dir, f".{name}.tmp")
+                resized.save(tmp, fmt, **options)
+                os.replace(tmp, os.path.join(target_dir, name))
+                written.append(name)
+
+        self.manifest.refresh(product_id)
+        return written
+
+    def remove(self, product_id, filename):
+        """Delete the derivatives of an original that was deleted."""
+        target_dir = os.path.join(self.derived_root, str(int(product_id)))
+        for size in DERIVATIVE_SIZES:
+            for ext in ('jpg', 'webp'):
+                try:
+                    os.remove(os.path.join(target_dir, derivative_name(filename, size, ext)))
+                except OSError:
+                    pass
+        self.manifest.refresh(product_id)
+
+    def table(self):
+        """{product_id: derivative file names}; pass to url() when resolving many images."""
+        return self.manifest.table()
+
+    def url(self, product_id, filename, size, ext='jpg', table=None):
+        """URL of a built derivative, or None if it does not exist (yet)."""
+        table = self.table() if table is None else table
+        name = derivative_name(filename, size, ext)
+        if name in table.get(int(product_id), ()):
+            return f"/data_photo/{DERIVED_DIR}/{product_id}/{name}"
+        return None
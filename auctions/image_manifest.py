@@ -0,0 +1,119 @@
+import os
+import time
+import threading
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# Seconds between mtime checks of the individual product folders
+REVALIDATE_SECONDS = 5
+
+# One manifest per photo root, shared by every adapter and view in the process
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_image_manifest(root):
+    key = os.path.abspath(root)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _manifests[key] = ImageManifest(key)
+        return manifest
+
+
+class ImageManifest:
+    """
+    In-memory listing of data_photo/<product_id>/ image files.
+
+    A call costs one stat() of the photo root: a folder added or removed
+    changes its mtime and triggers a full rescan. Files copied into an existing
+    folder by hand are picked up by a sweep over the folder mtimes every
+    REVALIDATE_SECONDS. Uploads through the admin call `refresh()` so their
+    changes show up immediately.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._root_mtime = None
+        self._checked_at = 0.0
+        self._mtimes = {}    # product_id -> folder mtime_ns
+        self._images = {}    # product_id -> sorted image file names (non-empty)
+
+    def folder(self, product_id):
+        return os.path.join(self.root, str(int(product_id)))
+
+    def images(self, product_id):
+        """Sorted image file names of a product (a copy)."""
+        return list(self.table().get(int(product_id), ()))
+
+    def table(self):
+        """{product_id: sorted image file names}; treat as read-only."""
+        with self._lock:
+            self._revalidate()
+            return self._images
+
+    def refresh(self, product_id):
+        """Re-list one product folder now, after files were saved to or deleted from it."""
+        with self._lock:
+            self._list(int(product_id))
+
+    def _revalidate(self):
+        try:
+            root_mtime = os.stat(self.root).st_mtime_ns
+        except OSError:
+            self._root_mtime = None
+            self._mtimes, self._images = {}, {}
+            return
+
+        if root_mtime != self._root_mtime:
+            self._scan(root_mtime)
+        elif time.monotonic() - self._checked_at >= REVALIDATE_SECONDS:
+            for product_id, mtime in list(self._mtimes.items()):
+                try:
+                    current = os.stat(self.folder(product_id)).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != mtime:
+                    self._list(product_id)
+            self._checked_at = time.monotonic()
+
+    def _scan(self, root_mtime):
+        mtimes, images = {}, {}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.is_dir() or not entry.name.isdigit():
+                    continue
+                listing = self._read_folder(int(entry.name))
+                if listing:
+                    mtimes[int(entry.name)], names = listing
+                    if names:
+                        images[int(entry.name)] = names
+        self._mtimes, self._images = mtimes, images
+        self._root_mtime = root_mtime
+        self._checked_at = time.monotonic()
+
+    def _list(self, product_id):
+        # Copy on write: table() hands the current dict out without a lock
+        mtimes, images = dict(self._mtimes), dict(self._images)
+        listing = self._read_folder(product_id)
+        if listing:
+            mtimes[product_id], names = listing
+        else:
+            mtimes.pop(product_id, None)
+            names = None
+        if names:
+            images[product_id] = names
+        else:
+            images.pop(product_id, None)
+        self._mtimes, self._images = mtimes, images
+
+    def _read_folder(self, product_id):
+        """(folder mtime_ns, sorted image names) or None if the folder is gone."""
+        path = self.folder(product_id)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        except OSError:
+            return None
+        return mtime, names
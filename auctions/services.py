@@ -3,6 +3,7 @@ import pytz
 from datetime import datetime, timedelta
 from common.exceptions import BusinessException, SystemException
 from common.logger import get_logger
+from . import events
 
 logger = get_logger(__name__)
 
@@ -19,73 +20,41 @@ class BidService:
 
     def place_bid(self, product_id, employee_id, amount):
         """
-        Coordinates the bidding process: validation -> execution.
-        Includes anti-sniper mechanism: extends end time if bid within threshold.
+        Coordinates the bidding process: validation -> execution, as one atomic adapter call.
+        The adapter hands the product and its latest bid, as they stand inside its bid
+        critical section, to `rules`, which validates the bid and decides the
+        anti-sniper extension (end time pushed back when the bid lands within the
+        threshold). The bid and the extension are written together.
         """
         try:
-            # 1. Fetch Product
-            product = self.adapter.get_product_by_id(product_id)
-            if not product:
-                raise BusinessException("Product not found", code='PRODUCT_NOT_FOUND')
+            extension = {}
 
-            # 2. Validate Business Rules
-            self._validate_bid_rules(product, employee_id, amount)
+            def rules(product, last_bid):
+                self._validate_bid_rules(product, last_bid, employee_id, amount)
+                new_end_time = self._anti_sniper_end_time(product, employee_id)
+                if new_end_time is None:
+                    return None
+                extension['new_end_time'] = new_end_time.strftime("%Y-%m-%dT%H:%M:%S%z")
+                return {'end_time': extension['new_end_time']}
 
-            # 3. Execute Bid via Adapter (persistence)
-            result = self.adapter.save_bid(product_id, employee_id, amount)
-            
-            # 4. Anti-Sniper: Check if we need to extend the auction time
             try:
-                end_time = product.get('end_time')
-                if end_time and isinstance(end_time, datetime):
-                    # Ensure end_time is aware (from Taipei)
-                    if end_time.tzinfo is None:
-                        end_time = TAIPEI_TZ.localize(end_time)
-                    
-                    # Current time must also be Aware Taipei Time
-                    current_time = datetime.now(TAIPEI_TZ)
-                    time_remaining = (end_time - current_time).total_seconds()
-                    
-                    # 🔍 診斷日誌：記錄每次出價的時間資訊
-                    logger.info(
-                        f"⏱️  Anti-sniper check | Product: {product_id} | "
-                        f"User: {employee_id} | "
-                        f"Current Time: {current_time.strftime('%H:%M:%S.%f')[:-3]} | "
-                        f"End Time: {end_time.strftime('%H:%M:%S.%f')[:-3]} | "
-                        f"Time Remaining: {time_remaining:.2f}s | "
-                        f"Threshold: {ANTI_SNIPER_THRESHOLD_SECONDS}s"
-                    )
-                    
-                    # If bid within threshold and auction hasn't ended yet
-                    if 0 < time_remaining < ANTI_SNIPER_THRESHOLD_SECONDS:
-                        # Extend the auction by ANTI_SNIPER_EXTEND_SECONDS from the original end time
-                        new_end_time = end_time + timedelta(seconds=ANTI_SNIPER_EXTEND_SECONDS)
-                        self.adapter.update_product(product_id, {
-                            'end_time': new_end_time.strftime("%Y-%m-%dT%H:%M:%S%z")
-                        })
-                        
-                        result['time_extended'] = True
-                        result['new_end_time'] = new_end_time.strftime("%Y-%m-%dT%H:%M:%S%z")
-                        result['extension_seconds'] = ANTI_SNIPER_EXTEND_SECONDS
-                        
-                        logger.info(
-                            f"✅ Anti-sniper TRIGGERED | Product: {product_id} | "
-                            f"Extended by {ANTI_SNIPER_EXTEND_SECONDS}s | "
-                            f"New end time: {new_end_time.strftime('%H:%M:%S')}"
-                        )
-                    else:
-                        result['time_extended'] = False
-                        if time_remaining <= 0:
-                            logger.info(f"❌ Anti-sniper NOT triggered | Product: {product_id} | Reason: Auction already ended")
-                        else:
-                            logger.info(f"❌ Anti-sniper NOT triggered | Product: {product_id} | Reason: {time_remaining:.2f}s > {ANTI_SNIPER_THRESHOLD_SECONDS}s threshold")
-                else:
-                    result['time_extended'] = False
-            except Exception as ext_error:
-                # Don't fail the bid if time extension fails - log and continue
-                logger.error(f"Failed to extend auction time for product {product_id}: {str(ext_error)}", exc_info=True)
-                result['time_extended'] = False
-            
+                result = self.adapter.save_bid(product_id, employee_id, amount, rules=rules)
+            except LookupError:
+                raise BusinessException("Product not found", code='PRODUCT_NOT_FOUND')
+
+            result['time_extended'] = bool(extension)
+            if extension:
+                result['new_end_time'] = extension['new_end_time']
+                result['extension_seconds'] = ANTI_SNIPER_EXTEND_SECONDS
+                logger.info(
+                    f"✅ Anti-sniper TRIGGERED | Product: {product_id} | "
+                    f"Extended by {ANTI_SNIPER_EXTEND_SECONDS}s | "
+                    f"New end time: {extension['new_end_time']}"
+                )
+
+            # Push to live streams (SSE); never fails the bid
+            self._publish_bid_events(product_id, employee_id, result)
+
             logger.info(f"Bid placed successfully: user={employee_id}, product={product_id}, amount={amount}")
             return result
 
@@ -96,7 +65,72 @@ class BidService:
             logger.error(f"System error during bid: {str(e)}", exc_info=True)
             raise SystemException("Internal system error processing bid", original_exception=e)
 
-    def _validate_bid_rules(self, product, employee_id, amount):
+    def _publish_bid_events(self, product_id, employee_id, result):
+        try:
+            events.bus.publish(events.BID_PLACED, product_id, {
+                'id': result.get('bidId'),
+                'bidder_id': employee_id,
+                'amount': result.get('newPrice'),
+                'bid_timestamp': result.get('timestamp'),
+            })
+            events.bus.publish(events.PRICE_CHANGED, product_id, {
+                'current_price': result.get('newPrice'),
+                'highest_bidder_id': employee_id,
+                'bids_count': result.get('bidsCount'),
+            })
+            if result.get('time_extended'):
+                events.bus.publish(events.ANTI_SNIPER_EXTENDED, product_id, {
+                    'end_time': result.get('new_end_time'),
+                    'extension_seconds': result.get('extension_seconds'),
+                })
+        except Exception as e:
+            logger.warning(f"Failed to publish bid events for product {product_id}: {str(e)}")
+
+    def _anti_sniper_end_time(self, product, employee_id):
+        """New end time if this bid lands within the anti-sniper threshold, else None. Never fails the bid."""
+        try:
+            end_time = product.get('end_time')
+            if not end_time or not isinstance(end_time, datetime):
+                return None
+            # Ensure end_time is aware (from Taipei)
+            if end_time.tzinfo is None:
+                end_time = TAIPEI_TZ.localize(end_time)
+
+            # Current time must also be Aware Taipei Time
+            current_time = datetime.now(TAIPEI_TZ)
+            time_remaining = (end_time - current_time).total_seconds()
+
+            # 🔍 診斷日誌：記錄每次出價的時間資訊
+            logger.info(
+                f"⏱️  Anti-sniper check | Product: {product.get('id')} | "
+                f"User: {employee_id} | "
+                f"Current Time: {current_time.strftime('%H:%M:%S.%f')[:-3]} | "
+                f"End Time: {end_time.strftime('%H:%M:%S.%f')[:-3]} | "
+                f"Time Remaining: {time_remaining:.2f}s | "
+                f"Threshold: {ANTI_SNIPER_THRESHOLD_SECONDS}s"
+            )
+
+            # If bid within threshold and auction hasn't ended yet
+            if 0 < time_remaining < ANTI_SNIPER_THRESHOLD_SECONDS:
+                # Extend the auction by ANTI_SNIPER_EXTEND_SECONDS from the original end time
+                return end_time + timedelta(seconds=ANTI_SNIPER_EXTEND_SECONDS)
+            if time_remaining <= 0:
+                logger.info(f"❌ Anti-sniper NOT triggered | Product: {product.get('id')} | Reason: Auction already ended")
+            else:
+                logger.info(f"❌ Anti-sniper NOT triggered | Product: {product.get('id')} | Reason: {time_remaining:.2f}s > {ANTI_SNIPER_THRESHOLD_SECONDS}s threshold")
+        except Exception as ext_error:
+            # Don't fail the bid if time extension fails - log and continue
+            logger.error(f"Failed to extend auction time for product {product.get('id')}: {str(ext_error)}", exc_info=True)
+        return None
+
+    def _validate_bid_rules(self, product, last_bid, employee_id, amount):
+        """
+        Business rules of a bid, checked inside the adapter's bid critical section.
+
+        Args:
+            product: The product as it stands under the lock (derived status, current price, highest bidder)
+            last_bid: The product's latest bid record, or None if it has no bids
+        """
         # Rule: Status must be active
         status = str(product.get('status', '')).lower().strip()
         if status not in ['active', 'open', '進行中']:
@@ -106,12 +140,10 @@ class BidService:
         current_price = int(product.get('current_price') or product.get('start_price', 0))
         start_price = int(product.get('start_price', 0))
         
-        recent_bids = self.adapter.get_bids_for_product(product['id'], limit=1)
-        
-        if not recent_bids and amount < start_price:
+        if last_bid is None and amount < start_price:
             raise BusinessException("Bid amount lower than starting price", code='INVALID_BID_AMOUNT')
             
-        if recent_bids and amount <= current_price:
+        if last_bid is not None and amount <= current_price:
             raise BusinessException("Bid amount must be higher than current price", code='INVALID_BID_AMOUNT')
             
         if amount > 999999: # Cap
@@ -125,20 +157,20 @@ class BidService:
             raise BusinessException("你已經是目前最高出價者囉！", code='ALREADY_HIGHEST_BIDDER')
 
         # Rule: Frequency Check (< 1 second)
-        if recent_bids:
-            last_bid = recent_bids[0]
+        if last_bid is not None:
             # Ensure we compare normalized IDs
             if self.adapter._normalize_id(last_bid.get('bidder_id')) == normalized_employee_id:
                 try:
                     last_ts = datetime.fromisoformat(str(last_bid['bid_timestamp']))
                     if last_ts.tzinfo is None:
                         last_ts = TAIPEI_TZ.localize(last_ts)
-                    
-                    if (datetime.now(TAIPEI_TZ) - last_ts).total_seconds() < 1:
-                        raise BusinessException("出價太頻繁，請稍後再試", code='BID_TOO_FREQUENT')
+                    too_frequent = (datetime.now(TAIPEI_TZ) - last_ts).total_seconds() < 1
                 except Exception as eval_err:
                     logger.warning(f"Error checking bid frequency: {eval_err}")
-                    pass
+                    too_frequent = False
+                # Raised outside the try: a broad except must not swallow the rejection
+                if too_frequent:
+                    raise BusinessException("出價太頻繁，請稍後再試", code='BID_TOO_FREQUENT')
 
 class AuthService:
     def __init__(self, adapter):
@@ -0,0 +1,440 @@
+import os
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from .base_adapter import BaseAdapter, TAIPEI_TZ
+from .bid_journal import BID_COLUMNS
+from .bid_summary import BidderSummary
+from .excel_adapter import _replace_csv
+from .status_timeline import StatusTimeline
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_COLUMNS = ['id', 'name', 'start_price', 'current_price', 'status', 'start_time', 'end_time',
+                   'last_bid_time', 'brand', 'description', 'bids_count', 'highest_bidder_id']
+EMPLOYEE_COLUMNS = ['id', 'employeeId', 'name', 'department', 'email', 'admin', 'pwd']
+NUMERIC_PRODUCT_COLUMNS = {'start_price', 'current_price', 'bids_count'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    start_price NUMERIC,
+    current_price NUMERIC,
+    status TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    last_bid_time TEXT,
+    brand TEXT,
+    description TEXT,
+    bids_count INTEGER NOT NULL DEFAULT 0,
+    highest_bidder_id TEXT
+);
+CREATE TABLE IF NOT EXISTS bids (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL,
+    bidder_id TEXT NOT NULL,
+    amount NUMERIC NOT NULL,
+    bid_timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bids_product_ts ON bids(product_id, bid_timestamp);
+CREATE INDEX IF NOT EXISTS idx_bids_bidder ON bids(bidder_id);
+CREATE TABLE IF NOT EXISTS employees (
+    employee_key TEXT PRIMARY KEY,  -- normalized employeeId (see _normalize_id)
+    id TEXT,
+    employeeId TEXT,
+    name TEXT,
+    department TEXT,
+    email TEXT,
+    admin TEXT,
+    pwd TEXT,
+    email_key TEXT                  -- stripped, lowercased email
+);
+CREATE INDEX IF NOT EXISTS idx_employees_email ON employees(email_key);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0);
+"""
+
+
+class SqliteAdapter(BaseAdapter):
+    """
+    Drop-in replacement for ExcelAdapter backed by SQLite in WAL mode.
+
+    Readers never block the writer, and every mutation is a short row-level
+    transaction instead of a full-file rewrite. Product photos still live in
+    data_photo/ next to `data_dir`. Use `import_csv` / `export_csv` to move data
+    to and from the CSV layout the Excel-based admin workflow expects.
+    """
+
+    def __init__(self, data_dir, db_path=None):
+        super().__init__(data_dir)
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.db_path = str(db_path or os.path.join(self.data_dir, 'auction.sqlite3'))
+        self._local = threading.local()
+        self._snapshot = None  # (data version, {'rows', 'by_id', 'timeline'})
+        self._summary_lock = threading.Lock()
+        self._reset_bid_summary()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT: takes the write lock up front so checks and writes are atomic."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        # Every committed write bumps the version the poll ETags are built from
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+        conn.execute('COMMIT')
+
+    def _upsert(self, conn, table, row, key):
+        cols = list(row)
+        updates = ', '.join(f'{c}=excluded.{c}' for c in cols if c != key)
+        conn.execute(
+            f'INSERT INTO {table} ({", ".join(cols)}) VALUES ({", ".join("?" for _ in cols)}) '
+            f'ON CONFLICT({key}) DO UPDATE SET {updates}',
+            [row[c] for c in cols]
+        )
+
+    def _product_from_row(self, row):
+        product = {k: ('' if row[k] is None else row[k]) for k in row.keys()}
+        product = self._convert_product_times(product)
+        product['status'] = self._derive_status(product)
+        return product
+
+    def _clean_product_values(self, product_dict):
+        """Keep known columns only, store datetimes as ISO strings and '' numerics as NULL."""
+        row = {}
+        for k, v in product_dict.items():
+            if k not in PRODUCT_COLUMNS:
+                logger.warning(f"Ignoring unknown product field '{k}'")
+                continue
+            if isinstance(v, datetime):
+                v = v.isoformat()
+            elif v is not None and not isinstance(v, str) and pd.isna(v):
+                v = None
+            if v == '' and k in NUMERIC_PRODUCT_COLUMNS:
+                v = None
+            row[k] = v
+        return row
+
+    # --- Products ---
+
+    def get_all_products(self):
+        snapshot = self._products_snapshot()
+        image_table = self.image_manifest.table()
+        derived_table = self.image_derivatives.table()
+        products = []
+        for row, status in zip(snapshot['rows'], snapshot['timeline'].status_list()):
+            # Callers decorate the dicts (winner_name, ISO end_time...), so hand out copies
+            p = dict(row)
+            p['status'] = status
+            self._set_main_image(p, image_table, derived_table)
+            products.append(p)
+        return products
+
+    def _products_snapshot(self):
+        """
+        Catalog rows (times converted, status as stored), the same rows by id and
+        their StatusTimeline, rebuilt only when the data version moves. Statuses are derived per call
+        from the timeline in one vectorized pass, as in ExcelAdapter.
+        """
+        version = self.get_data_version()
+        cached = self._snapshot
+        if cached is None or cached[0] != version:
+            rows = self._conn().execute('SELECT * FROM products ORDER BY rowid').fetchall()
+            products = [self._convert_product_times({k: ('' if r[k] is None else r[k]) for k in r.keys()}) for r in rows]
+            cached = self._snapshot = (version, {
+                'rows': products,
+                'by_id': {int(p['id']): p for p in products},
+                'timeline': StatusTimeline(products),
+            })
+        return cached[1]
+
+    def _status_timeline(self):
+        """StatusTimeline of the catalog, rebuilt only when the data version moves."""
+        return self._products_snapshot()['timeline']
+
+    def _product_fingerprints(self):
+        statuses = self.get_product_statuses()
+        rows = self._conn().execute(
+            'SELECT id, current_price, bids_count, end_time, highest_bidder_id FROM products'
+        ).fetchall()
+        return {r['id']: self._fingerprint(dict(r, status=statuses.get(r['id']))) for r in rows}
+
+    def get_data_version(self):
+        return str(self._conn().execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0])
+
+    def get_product_by_id(self, product_id):
+        # Same rows and timeline as get_all_products, so a product poll and the list agree at a status boundary
+        snapshot = self._products_snapshot()
+        row = snapshot['by_id'].get(int(product_id))
+        if row is None:
+            return None
+        product = dict(row)
+        product['status'] = snapshot['timeline'].status_of(product['id'])
+        return product
+
+    def save_product(self, product_dict):
+        with self._transaction() as conn:
+            new_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM products').fetchone()[0]
+            product_dict['id'] = new_id
+
+            # Default fields (same as ExcelAdapter)
+            defaults = {
+                'status': 'Upcoming',
+                'current_price': product_dict.get('start_price'),
+                'bids_count': 0,
+                'highest_bidder_id': '',
+                'last_bid_time': '',
+                'start_time': datetime.now(TAIPEI_TZ).isoformat(),
+                'end_time': datetime.now(TAIPEI_TZ).isoformat()
+            }
+            for k, v in defaults.items():
+                if k not in product_dict:
+                    product_dict[k] = v
+
+            self._upsert(conn, 'products', self._clean_product_values(product_dict), 'id')
+        self._notify_write('save_product', new_id, product_dict)
+        return new_id
+
+    def update_product(self, product_id, updates):
+        row = self._clean_product_values(updates)
+        row.pop('id', None)
+        with self._transaction() as conn:
+            if conn.execute('SELECT 1 FROM products WHERE id = ?', (int(product_id),)).fetchone() is None:
+                raise ValueError("Product not found")
+            if row:
+                assignments = ', '.join(f'{k} = ?' for k in row)
+                conn.execute(f'UPDATE products SET {assignments} WHERE id = ?', [*row.values(), int(product_id)])
+        self._notify_write('update_product', int(product_id), updates)
+        return True
+
+    def delete_product(self, product_id):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM products WHERE id = ?', (int(product_id),))
+        self._notify_write('delete_product', int(product_id))
+        return True
+
+    # --- Employees ---
+
+    def _employee_from_row(self, row):
+        return {k: row[k] for k in EMPLOYEE_COLUMNS}
+
+    def get_employee_by_employeeId(self, employeeId):
+        target_id = self._normalize_id(employeeId)
+        if not target_id:
+            return None
+        row = self._conn().execute('SELECT * FROM employees WHERE employee_key = ?', (target_id,)).fetchone()
+        return self._employee_from_row(row) if row else None
+
+    def get_employees_by_ids(self, employee_ids):
+        keys = {}
+        for employee_id in employee_ids:
+            key = self._normalize_id(employee_id)
+            if key:
+                keys.setdefault(key, []).append(employee_id)
+        if not keys:
+            return {}
+
+        placeholders = ', '.join('?' for _ in keys)
+        rows = self._conn().execute(
+            f'SELECT * FROM employees WHERE employee_key IN ({placeholders})', list(keys)
+        ).fetchall()
+        found = {}
+        for row in rows:
+            for employee_id in keys[row['employee_key']]:
+                found[employee_id] = self._employee_from_row(row)
+        return found
+
+    def get_employee_by_email(self, email):
+        row = self._conn().execute(
+            'SELECT * FROM employees WHERE email_key = ? LIMIT 1', (str(email).strip().lower(),)
+        ).fetchone()
+        return self._employee_from_row(row) if row else None
+
+    # --- Bids ---
+
+    def _bid_from_row(self, row):
+        return {k: row[k] for k in BID_COLUMNS}
+
+    def get_all_bids(self):
+        rows = self._conn().execute('SELECT * FROM bids ORDER BY bid_timestamp DESC').fetchall()
+        return [self._bid_from_row(r) for r in rows]
+
+    def get_bids_for_product(self, product_id, limit=10):
+        rows = self._conn().execute(
+            'SELECT * FROM bids WHERE product_id = ? ORDER BY bid_timestamp DESC LIMIT ?',
+            (int(product_id), int(limit))
+        ).fetchall()
+        return [self._bid_from_row(r) for r in rows]
+
+    def get_bid_stats(self, product_id):
+        row = self._conn().execute(
+            'SELECT COUNT(*) AS n, MAX(id) AS last_id FROM bids WHERE product_id = ?', (int(product_id),)
+        ).fetchone()
+        return (row['n'], row['last_id'])
+
+    def get_top_bids(self, product_ids=None):
+        # SQLite returns the bare columns of the row holding MAX(amount)
+        rows = self._conn().execute(
+            'SELECT id, product_id, bidder_id, MAX(amount) AS amount, bid_timestamp FROM bids GROUP BY product_id'
+        ).fetchall()
+        wanted = None if product_ids is None else {int(pid) for pid in product_ids}
+        return {
+            r['product_id']: self._bid_from_row(r)
+            for r in rows if wanted is None or r['product_id'] in wanted
+        }
+
+    def _bid_summary(self):
+        """BidderSummary caught up with the bids inserted since the last call (by any process)."""
+        with self._summary_lock:
+            rows = self._conn().execute(
+                'SELECT * FROM bids WHERE id > ? ORDER BY id', (self._summary_last_id,)
+            ).fetchall()
+            for row in rows:
+                self._summary.add(self._bid_from_row(row))
+            if rows:
+                self._summary_last_id = rows[-1]['id']
+            return self._summary
+
+    def _reset_bid_summary(self):
+        with self._summary_lock:
+            self._summary = BidderSummary()
+            self._summary_last_id = 0
+
+    def _product_names(self, product_ids):
+        product_ids = sorted(set(product_ids))
+        placeholders = ', '.join('?' for _ in product_ids)
+        return {
+            r['id']: r['name'] or ''
+            for r in self._conn().execute(f'SELECT id, name FROM products WHERE id IN ({placeholders})', product_ids)
+        }
+
+    def _save_bids(self, requests):
+        """
+        Rules, invariant checks, bid inserts and product updates of a batch of bids
+        in one short IMMEDIATE transaction (one commit), in arrival order. Each bid
+        reads the rows as the earlier bids of the batch left them; a rejected bid
+        writes nothing.
+        """
+        outcomes = [None] * len(requests)
+        accepted = []   # (request index, bid id, timestamp, extra product fields, bids count)
+        with self._transaction() as conn:
+            for i, req in enumerate(requests):
+                try:
+                    accepted.append((i, *self._insert_bid(conn, req)))
+                except Exception as e:
+                    outcomes[i] = e
+
+        for i, bid_id, ts, updates, bids_count in accepted:
+            req = requests[i]
+            result = {'success': True, 'bidId': bid_id, 'newPrice': req['amount'], 'timestamp': ts,
+                      'bidsCount': bids_count}
+            outcomes[i] = result
+            self._notify_write('save_bid', req['product_id'], dict(updates, **result, bidder_id=req['employee_id']))
+        return outcomes
+
+    def _insert_bid(self, conn, req):
+        """Check and write one bid inside the open transaction. Returns (bid id, timestamp, extra product fields, bids count)."""
+        product_id, employee_id, amount = req['product_id'], req['employee_id'], req['amount']
+        row = conn.execute('SELECT * FROM products WHERE id = ?', (product_id,)).fetchone()
+        if row is None:
+            raise LookupError("Product not found during save")
+
+        product = dict(
+            self._product_from_row(row),
+            current_price=row['current_price'] if row['current_price'] is not None else row['start_price'],
+            highest_bidder_id=row['highest_bidder_id'] or '',
+            bids_count=row['bids_count'] or 0,
+        )
+        updates = {}
+        if req['rules'] is not None:
+            last_bid = conn.execute(
+                'SELECT * FROM bids WHERE product_id = ? ORDER BY id DESC LIMIT 1', (product_id,)
+            ).fetchone()
+            updates = req['rules'](product, self._bid_from_row(last_bid) if last_bid else None) or {}
+        self._check_bid_invariants(product, employee_id, amount)
+
+        ts = datetime.now(TAIPEI_TZ).isoformat()
+        cur = conn.execute(
+            'INSERT INTO bids (product_id, bidder_id, amount, bid_timestamp) VALUES (?, ?, ?, ?)',
+            (product_id, str(employee_id), amount, ts)
+        )
+        extra = self._clean_product_values(updates)
+        assignments = ''.join(f', {k} = ?' for k in extra)
+        conn.execute(
+            'UPDATE products SET current_price = ?, highest_bidder_id = ?, last_bid_time = ?, '
+            f'bids_count = COALESCE(bids_count, 0) + 1{assignments} WHERE id = ?',
+            (amount, str(employee_id), ts, *extra.values(), product_id)
+        )
+        return cur.lastrowid, ts, updates, product['bids_count'] + 1
+
+    # --- CSV import / export ---
+
+    def import_csv(self, csv_dir):
+        """
+        Upsert products, bids and employees from a CSV data folder (ExcelAdapter layout).
+        Returns the number of rows imported per table.
+        """
+        from .excel_adapter import ExcelAdapter
+        source = ExcelAdapter(csv_dir)
+        products = source._load_products_snapshot()['rows']
+        bids = [b for b in source.journal.records() if b['id'] is not None and b['amount'] is not None]
+        employees = list(source._employee_index()['by_id'].values())
+
+        with self._transaction() as conn:
+            for p in products:
+                known = {k: p[k] for k in PRODUCT_COLUMNS if k in p}
+                self._upsert(conn, 'products', self._clean_product_values(known), 'id')
+            for b in bids:
+                self._upsert(conn, 'bids', {k: b.get(k) for k in BID_COLUMNS}, 'id')
+            for e in employees:
+                row = {k: (None if pd.isna(e.get(k)) else e.get(k)) for k in EMPLOYEE_COLUMNS}
+                row['employee_key'] = self._normalize_id(e.get('employeeId'))
+                row['email_key'] = (row['email'] or '').strip().lower() or None
+                self._upsert(conn, 'employees', row, 'employee_key')
+
+        # Imported bids may sit below ids the summary has already applied
+        self._reset_bid_summary()
+        return {'products': len(products), 'bids': len(bids), 'employees': len(employees)}
+
+    def export_csv(self, csv_dir):
+        """
+        Write products.csv, bids.csv and employees.csv (UTF-8 with BOM, for Excel).
+        Each file is written to a temp name and renamed, so readers never see half a file.
+        """
+        os.makedirs(csv_dir, exist_ok=True)
+        conn = self._conn()
+        tables = {
+            'products.csv': ('SELECT * FROM products ORDER BY id', PRODUCT_COLUMNS),
+            'bids.csv': ('SELECT * FROM bids ORDER BY id', BID_COLUMNS),
+            'employees.csv': ('SELECT * FROM employees ORDER BY rowid', EMPLOYEE_COLUMNS),
+        }
+        counts = {}
+        for filename, (query, columns) in tables.items():
+            rows = [{c: r[c] for c in columns} for r in conn.execute(query)]
+            _replace_csv(os.path.join(csv_dir, filename), pd.DataFrame(rows, columns=columns), encoding='utf-8-sig')
+            counts[filename.split('.')[0]] = len(rows)
+        return counts
@@ -0,0 +1,220 @@
+import os
+import re
+import hashlib
+import mimetypes
+import threading
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from .compression import _accepts
+
+# Cache lifetime of a URL carrying the file's content hash: it changes whenever the file does
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASH_LENGTH = 12
+
+# Extensions worth keeping .gz/.br copies of (see build_static_assets.py)
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json', '.html', '.txt', '.map')
+# Content-Encoding -> sidecar suffix, in order of preference
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+_HASHED_NAME = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileIndex:
+    """
+    Content hashes of the files under one root, recomputed only when a
+    file's size or mtime changes (one stat() per lookup).
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+        self._lock = threading.Lock()
+        self._hashes = {}    # relative path -> (size, mtime_ns, hash)
+
+    def stat(self, name):
+        """(absolute path, os.stat_result) of a regular file under the root, or None."""
+        try:
+            path = safe_join(self.root, name)
+            st = os.stat(path)
+        except (OSError, ValueError, SuspiciousFileOperation):
+            return None    # Missing, or a path escaping the root
+        if not os.path.isfile(path):
+            return None
+        return path, st
+
+    def content_hash(self, name):
+        found = self.stat(name)
+        if found is None:
+            return None
+        path, st = found
+        with self._lock:
+            cached = self._hashes.get(name)
+            if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+                return cached[2]
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()[:HASH_LENGTH]
+        with self._lock:
+            self._hashes[name] = (st.st_size, st.st_mtime_ns, content_hash)
+        return content_hash
+
+    def hashed_name(self, name):
+        """'js/polling.js' -> 'js/polling.<hash>.js' (unchanged if the file does not exist)."""
+        content_hash = self.content_hash(name)
+        if content_hash is None:
+            return name
+        base, ext = os.path.splitext(name)
+        return f"{base}.{content_hash}{ext}"
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(root):
+    key = os.path.abspath(str(root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = FileIndex(key)
+        return index
+
+
+class HashedStaticStorage(StaticFilesStorage):
+    """
+    `{% static %}` URLs with the content hash in the file name, computed from
+    static/ on the fly, so there is no collectstatic step. serve_static()
+    strips the hash again and marks such URLs cacheable forever.
+    """
+
+    def url(self, name):
+        index = get_file_index(settings.STATICFILES_DIRS[0])
+        return super().url(index.hashed_name(name))
+
+
+
+class HashedNameFinder(FileSystemFinder):
+    """
+    FileSystemFinder that also resolves the hashed names of HashedStaticStorage
+    to their file. `manage.py runserver` serves /static/ through the finders
+    (StaticFilesHandler) before serve_static() is ever reached.
+    """
+
+    def find(self, path, find_all=False, **kwargs):
+        found = super().find(path, find_all=find_all, **kwargs)
+        match = None if found else _HASHED_NAME.match(path)
+        if match:
+            found = super().find(match['base'] + match['ext'], find_all=find_all, **kwargs)
+        return found
+
+
+def serve_static(request, path):
+    index = get_file_index(settings.STATICFILES_DIRS[0])
+    if index.stat(path) is not None:
+        # Plain name: always revalidate (cheap with the ETag)
+        return serve_file(request, index, path, 'no-cache')
+    match = _HASHED_NAME.match(path)
+    if match:
+        name = match['base'] + match['ext']
+        current = index.content_hash(name)
+        if current == match['hash']:
+            return serve_file(request, index, name, f'public, max-age={IMMUTABLE_MAX_AGE}, immutable')
+        if current is not None:
+            # A page rendered before the file changed: serve the new content, but don't let it stick
+            return serve_file(request, index, name, 'no-cache')
+    raise Http404(path)
+
+
+def serve_media(request, path):
+    index = get_file_index(settings.MEDIA_ROOT)
+    return serve_file(request, index, path, f'public, max-age={settings.AUCTION_MEDIA_MAX_AGE}')
+
+
+def serve_file(request, index, name, cache_control):
+    """
+    Serve one file of `index` with ETag/Last-Modified (304s), single byte
+    Range requests and precompressed .br/.gz sidecars when the client accepts them.
+    """
+    found = index.stat(name)
+    if found is None:
+        raise Http404(name)
+    path, st = found
+
+    # Pick the representation first: the identity file and each precompressed
+    # sidecar carry their own ETag, so caches and If-None-Match never mix them up.
+    # Ranges are always served from the identity file.
+    range_header = request.headers.get('Range')
+    variant = None if range_header else _precompressed_variant(request, path, st)
+    version = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    etag = quote_etag(f"{version}-{variant[0]}" if variant else version)
+    last_modified = int(st.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or 'application/octet-stream'
+        # If-Range: only send the part when the client's copy is still this version
+        if range_header and request.headers.get('If-Range', etag) in (etag, http_date(last_modified)):
+            response = _range_response(path, st.st_size, range_header, content_type)
+        if response is None:
+            if variant:
+                encoding, sidecar = variant
+                response = FileResponse(open(sidecar, 'rb'), content_type=content_type, filename=os.path.basename(path))
+                response['Content-Encoding'] = encoding
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=content_type, filename=os.path.basename(path))
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _precompressed_variant(request, path, st):
+    """(Content-Encoding, sidecar path) of the preferred up-to-date .br/.gz copy the client accepts, or None."""
+    if not path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+        return None
+    for encoding, suffix in PRECOMPRESSED:
+        if not _accepts(request, encoding):
+            continue
+        try:
+            compressed = os.stat(path + suffix)
+        except OSError:
+            continue
+        if compressed.st_mtime_ns < st.st_mtime_ns:
+            continue    # Left over from an older version of the file
+        return encoding, path + suffix
+    return None
+
+
+def _range_response(path, size, range_header, content_type):
+    """206 for a single satisfiable byte range, 416 for an unsatisfiable one, None to serve it all."""
+    match = _RANGE.match(range_header.strip())
+    if not match or not (match[1] or match[2]):
+        return None    # Multiple or malformed ranges: answer with the whole file
+    if match[1]:
+        start = int(match[1])
+        end = min(int(match[2]), size - 1) if match[2] else size - 1
+    else:
+        start, end = max(size - int(match[2]), 0), size - 1
+    if start >= size or start > end:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start + 1)
+    response = HttpResponse(body, status=206, content_type=content_type)
+    response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    return response
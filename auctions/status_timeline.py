@@ -0,0 +1,86 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MS = timedelta(milliseconds=1)
+
+
+def _epoch_ms(dt):
+    """Aware datetime -> int epoch milliseconds (exact, no float rounding)."""
+    return (dt - _EPOCH) // _MS
+
+
+def _now_ms(now=None):
+    if now is None:
+        return time.time_ns() // 1_000_000
+    return _epoch_ms(now)
+
+
+class StatusTimeline:
+    """
+    Start/end times of the whole catalog as int64 epoch milliseconds, parsed
+    once per snapshot. The status of every product is then one vectorized
+    comparison against the clock, and the next instant any status flips is a
+    binary search.
+
+    Same rules as BaseAdapter._derive_status: 'Unsold' is sticky, products
+    without both times keep their stored status, otherwise
+    Upcoming (now < start) / Closed (now > end) / Open.
+    """
+
+    def __init__(self, products):
+        """`products`: rows with id, status and start/end times already converted to aware datetimes."""
+        ids, starts, ends, fixed = [], [], [], []
+        self._index = {}
+        for i, p in enumerate(products):
+            start, end = p.get('start_time'), p.get('end_time')
+            ids.append(p['id'])
+            self._index.setdefault(p['id'], i)
+            if p.get('status') == 'Unsold' or not isinstance(start, datetime) or not isinstance(end, datetime):
+                fixed.append(p.get('status', 'Upcoming'))
+                starts.append(0)
+                ends.append(0)
+            else:
+                fixed.append(None)
+                starts.append(_epoch_ms(start))
+                ends.append(_epoch_ms(end))
+
+        self.ids = ids
+        self._start = np.array(starts, dtype=np.int64)
+        self._end = np.array(ends, dtype=np.int64)
+        self._fixed = np.array(fixed, dtype=object)
+        self._timed = np.array([f is None for f in fixed], dtype=bool)
+        # Every instant a status flips: at start, and just after end (Closed means now > end)
+        self._boundaries = np.unique(np.concatenate([self._start[self._timed], self._end[self._timed] + 1]))
+
+    def status_list(self, now=None):
+        """Statuses aligned with the rows the timeline was built from."""
+        now_ms = _now_ms(now)
+        status = np.where(now_ms < self._start, 'Upcoming', np.where(now_ms > self._end, 'Closed', 'Open')).astype(object)
+        status[~self._timed] = self._fixed[~self._timed]
+        return status.tolist()
+
+    def statuses(self, now=None):
+        """{product_id: status} for the whole catalog."""
+        return dict(zip(self.ids, self.status_list(now)))
+
+    def status_of(self, product_id, now=None):
+        i = self._index.get(int(product_id))
+        if i is None:
+            return None
+        if not self._timed[i]:
+            return self._fixed[i]
+        now_ms = _now_ms(now)
+        if now_ms < self._start[i]:
+            return 'Upcoming'
+        if now_ms > self._end[i]:
+            return 'Closed'
+        return 'Open'
+
+    def next_change(self, now=None):
+        """Epoch seconds of the next status flip after `now`, or None if no status will change."""
+        i = np.searchsorted(self._boundaries, _now_ms(now), side='right')
+        if i >= len(self._boundaries):
+            return None
+        return int(self._boundaries[i]) / 1000
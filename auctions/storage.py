@@ -0,0 +1,60 @@
+import threading
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .excel_adapter import ExcelAdapter
+from .sqlite_adapter import SqliteAdapter
+
+# Process-wide registry: one adapter (and one instance per service class) shared by
+# views, admin_views and services, so caches and write listeners see every mutation.
+_registry_lock = threading.RLock()
+_adapter = None
+_services = {}
+
+
+def create_adapter(data_dir=None):
+    """
+    Build the storage adapter selected by settings.AUCTION_STORAGE_BACKEND.
+    Both adapters expose the same methods, so services and views do not care which one they get.
+    """
+    data_dir = data_dir or settings.DATA_DIR
+    backend = getattr(settings, 'AUCTION_STORAGE_BACKEND', 'csv')
+    if backend == 'csv':
+        adapter = ExcelAdapter(data_dir)
+    elif backend == 'sqlite':
+        adapter = SqliteAdapter(data_dir, getattr(settings, 'AUCTION_SQLITE_PATH', None))
+    else:
+        raise ImproperlyConfigured(f"Unknown AUCTION_STORAGE_BACKEND '{backend}' (expected 'csv' or 'sqlite')")
+    adapter.enable_group_commit(getattr(settings, 'AUCTION_BID_GROUP_COMMIT_MS', 0))
+    return adapter
+
+
+def get_adapter():
+    """The shared storage adapter, created on first use."""
+    global _adapter
+    with _registry_lock:
+        if _adapter is None:
+            _adapter = create_adapter()
+        return _adapter
+
+
+def set_adapter(adapter):
+    """Replace the shared adapter (tests, maintenance scripts). Services are rebuilt on next use."""
+    global _adapter
+    with _registry_lock:
+        _adapter = adapter
+        _services.clear()
+
+
+def get_service(service_cls):
+    """Shared instance of a service class (BidService, ProductService, ...) bound to the shared adapter."""
+    with _registry_lock:
+        service = _services.get(service_cls)
+        if service is None:
+            service = _services[service_cls] = service_cls(get_adapter())
+        return service
+
+
+def on_write(listener):
+    """Subscribe `listener(event, product_id, data)` to every mutation of the shared adapter."""
+    get_adapter().add_write_listener(listener)
+    return listener
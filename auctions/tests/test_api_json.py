@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from auctions import api_json
+from auctions.base_adapter import TAIPEI_TZ
+
+
+class ApiJsonTests(SimpleTestCase):
+    def setUp(self):
+        self.end = TAIPEI_TZ.localize(datetime(2026, 3, 1, 12, 30))
+        self.row = {
+            'id': 7.0, 'current_price': 24010.0, 'bids_count': np.int64(3), 'ratio': 0.5,
+            'end_time': self.end, 'name': '商品', 'description': 'long text',
+        }
+
+    def test_compact_row_keeps_ints_and_formats_times(self):
+        row = api_json.compact_row(self.row, ('id', 'current_price', 'ratio', 'end_time', 'missing'))
+        self.assertEqual(row, {
+            'id': 7, 'current_price': 24010, 'ratio': 0.5,
+            'end_time': '2026-03-01T12:30:00+08:00', 'missing': None,
+        })
+        self.assertIsInstance(row['current_price'], int)
+
+    def test_dumps_matches_the_stdlib_encoding(self):
+        data = {'product': self.row, 'amount': Decimal('800'), 'when': self.end}
+        expected = {
+            'product': dict(self.row, bids_count=3, end_time='2026-03-01T12:30:00+08:00'),
+            'amount': 800, 'when': '2026-03-01T12:30:00+08:00',
+        }
+        self.assertEqual(json.loads(api_json.dumps(data)), expected)
+        # Same result without orjson
+        encoder = json.JSONEncoder(default=api_json._default, ensure_ascii=False, separators=(',', ':'))
+        with mock.patch.object(api_json, 'dumps', lambda d: encoder.encode(d).encode('utf-8')):
+            self.assertEqual(json.loads(api_json.ApiJsonResponse(data).content), expected)
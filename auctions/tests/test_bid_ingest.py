@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+import pandas as pd
+from datetime import timedelta
+from unittest import mock
+from importlib import import_module
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from auctions import bid_ingest
+from auctions.bid_ingest import BID_INGEST_PATH, BidIngestASGI, BidIngestWSGI, issue_bid_token, revoke_bid_tokens
+from auctions.services import BidService
+from auctions.excel_adapter import ExcelAdapter
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class BidIngestTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        now = timezone.now()
+        pd.DataFrame([{
+            'id': 1, 'name': 'Test', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+            'highest_bidder_id': '', 'last_bid_time': '',
+            'start_time': (now - timedelta(hours=1)).isoformat(),
+            'end_time': (now + timedelta(hours=1)).isoformat(),
+        }]).to_csv(os.path.join(self._tmp.name, 'products.csv'), index=False)
+        self.adapter = ExcelAdapter(self._tmp.name)
+        patcher = mock.patch.object(bid_ingest, 'get_service', lambda cls: BidService(self.adapter))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.django_app = mock.Mock(return_value=[b'django'])
+
+    def token(self, employee_id):
+        """A token bound to a new login session, as the product page issues it."""
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session['employee'] = {'employeeId': employee_id}
+        session.create()
+        return issue_bid_token(employee_id, session.session_key)
+
+    def _post(self, body, token=None, path=BID_INGEST_PATH, method='POST'):
+        body = body.encode()
+        environ = {
+            'PATH_INFO': path, 'REQUEST_METHOD': method,
+            'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body),
+        }
+        if token:
+            environ['HTTP_X_BID_TOKEN'] = token
+        start_response = mock.Mock()
+        content = b''.join(BidIngestWSGI(self.django_app)(environ, start_response))
+        return (start_response.call_args[0][0] if start_response.called else None), content
+
+    def test_signed_token_places_the_bid(self):
+        status, content = self._post('{"productId": 1, "amount": 100}', self.token('A'))
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(json.loads(content)['newPrice'], 100)
+        self.assertEqual(self.adapter.get_product_by_id(1)['highest_bidder_id'], 'A')
+
+        # Same business errors as the regular route
+        status, content = self._post('{"productId": 1, "amount": 100}', self.token('B'))
+        self.assertEqual(status, '400 Bad Request')
+        self.assertFalse(json.loads(content)['success'])
+
+    def test_rejects_bad_tokens_and_payloads(self):
+        self.assertEqual(self._post('{"productId": 1, "amount": 100}')[0], '401 Unauthorized')
+        self.assertEqual(self._post('{"productId": 1, "amount": 100}', self.token('A') + 'x')[0], '401 Unauthorized')
+        with self.settings(AUCTION_BID_TOKEN_MAX_AGE=-1):
+            self.assertEqual(self._post('{"productId": 1, "amount": 100}', self.token('A'))[0], '401 Unauthorized')
+        self.assertEqual(self._post('{"productId": 1}', self.token('A'))[0], '400 Bad Request')
+        self.assertEqual(self._post('', self.token('A'), method='GET')[0], '405 Method Not Allowed')
+        self.assertEqual(self.adapter.get_product_by_id(1)['bids_count'], 0)
+
+    def test_tokens_die_with_their_session(self):
+        token = self.token('A')
+        session_key = bid_ingest.signing.loads(token, salt=bid_ingest.BID_TOKEN_SALT)[1]
+        # Logout: refused at once, before the session check would run again
+        revoke_bid_tokens(session_key)
+        self.assertEqual(self._post('{"productId": 1, "amount": 100}', token)[0], '401 Unauthorized')
+
+        # A session ended elsewhere, or never created
+        self.assertEqual(self._post('{"productId": 1, "amount": 100}', issue_bid_token('A', 'gone'))[0], '401 Unauthorized')
+        # Tokens of the old format (no session)
+        old = bid_ingest.signing.dumps('A', salt=bid_ingest.BID_TOKEN_SALT)
+        self.assertEqual(self._post('{"productId": 1, "amount": 100}', old)[0], '401 Unauthorized')
+        self.assertEqual(self.adapter.get_product_by_id(1)['bids_count'], 0)
+
+    def test_other_paths_go_to_django(self):
+        self.assertEqual(self._post('{}', path='/zh-hant/api/bids/'), (None, b'django'))
+        self.django_app.assert_called_once()
+
+    async def test_asgi_ingest(self):
+        body = b'{"productId": 1, "amount": 100}'
+        messages = iter([{'type': 'http.request', 'body': body[:10], 'more_body': True},
+                         {'type': 'http.request', 'body': body[10:]}])
+        sent = []
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'path': BID_INGEST_PATH, 'method': 'POST',
+                 'headers': [(b'x-bid-token', self.token('A').encode())]}
+        await BidIngestASGI(None)(scope, receive, send)
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertEqual(json.loads(sent[1]['body'])['newPrice'], 100)
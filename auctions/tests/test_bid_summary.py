@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+from auctions.bid_summary import BidderSummary
+
+
+class BidderSummaryTests(SimpleTestCase):
+    def test_entries_and_outbid(self):
+        summary = BidderSummary()
+        self.assertIsNone(summary.add({'product_id': 1, 'bidder_id': 'A', 'amount': 100, 'bid_timestamp': '2026-01-01T10:00'}))
+        self.assertEqual(summary.add({'product_id': 1, 'bidder_id': 'B', 'amount': 110, 'bid_timestamp': '2026-01-01T10:01'}), 'A')
+        summary.add({'product_id': 2, 'bidder_id': 'A', 'amount': 50, 'bid_timestamp': '2026-01-01T10:02'})
+        self.assertEqual(summary.add({'product_id': 1, 'bidder_id': ' A ', 'amount': 120, 'bid_timestamp': '2026-01-01T10:03'}), 'B')
+
+        entries = summary.entries('A')
+        self.assertEqual([e['product_id'] for e in entries], [1, 2])
+        self.assertEqual(entries[0]['bid_count'], 2)
+        self.assertEqual(entries[0]['max_amount'], 120)
+        self.assertTrue(entries[0]['leading'])
+        self.assertEqual([b['amount'] for b in entries[0]['bids']], [120, 100])
+
+        self.assertEqual(summary.outbid_products('B'), [1])
+        self.assertEqual(summary.outbid_products('A'), [])
+        self.assertEqual(summary.leader(1), 'A')
+        self.assertTrue(summary.has_bids('B'))
+        self.assertFalse(summary.has_bids('C'))
+        self.assertEqual(summary.entries('C'), [])
+
+    def test_bidder_ids_are_normalized(self):
+        summary = BidderSummary()
+        summary.add({'product_id': 1, 'bidder_id': '0001', 'amount': 100, 'bid_timestamp': '2026-01-01T10:00'})
+        summary.add({'product_id': 1, 'bidder_id': 'B', 'amount': 110, 'bid_timestamp': '2026-01-01T10:01'})
+        # The same employee written as '1' (pandas) and 1.0 (float column)
+        self.assertEqual(summary.add({'product_id': 1, 'bidder_id': '1', 'amount': 120, 'bid_timestamp': '2026-01-01T10:02'}), 'B')
+        summary.add({'product_id': 2, 'bidder_id': 1.0, 'amount': 50, 'bid_timestamp': '2026-01-01T10:03'})
+
+        entries = summary.entries('0001')
+        self.assertEqual([(e['product_id'], e['bid_count']) for e in entries], [(2, 1), (1, 2)])
+        self.assertTrue(entries[1]['leading'])
+        self.assertEqual(summary.outbid_products(1), [])
+        self.assertEqual(summary.leader(1), '1')
@@ -0,0 +1,39 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from django.utils import translation
+from auctions.card_cache import CardCache
+
+
+class _CountingTemplate:
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, context):
+        p = context['p']
+        self.rendered.append(p['id'])
+        return f"<div>{p['id']}:{p['current_price']}:{context['LANGUAGE_CODE']}</div>"
+
+
+class CardCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.template = _CountingTemplate()
+        patcher = mock.patch('auctions.card_cache.get_template', return_value=self.template)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.products = [
+            {'id': 1, 'status': 'Open', 'current_price': 100, 'bids_count': 0},
+            {'id': 2, 'status': 'Open', 'current_price': 200, 'bids_count': 0},
+        ]
+
+    def test_only_changed_cards_are_rendered_again(self):
+        cache = CardCache()
+        with translation.override('zh-hant'):
+            self.assertEqual(cache.render(self.products), ['<div>1:100:zh-hant</div>', '<div>2:200:zh-hant</div>'])
+            self.products[1] = dict(self.products[1], current_price=250, bids_count=1)
+            self.assertEqual(cache.render(self.products)[1], '<div>2:250:zh-hant</div>')
+        self.assertEqual(self.template.rendered, [1, 2, 2])
+
+        # Each language has its own cards
+        with translation.override('id'):
+            self.assertEqual(cache.render(self.products[:1]), ['<div>1:100:id</div>'])
+        self.assertEqual(self.template.rendered, [1, 2, 2, 1])
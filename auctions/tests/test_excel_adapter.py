@@ -1,6 +1,7 @@
 import tempfile
 import os
 import pandas as pd
+from unittest import mock
 from django.test import SimpleTestCase
 from auctions.excel_adapter import ExcelAdapter
 
@@ -43,3 +44,266 @@ class ExcelAdapterTests(SimpleTestCase):
             self.assertIsNotNone(emp)
             self.assertEqual(emp['name'], '張三')
 
+    def test_products_snapshot_reused_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            pd.DataFrame([{
+                'id':1, 'name':'Test', 'start_price':100, 'current_price':100, 'bids_count':0,
+                'start_time':'2020-01-01T00:00', 'end_time':'2099-01-01T00:00'
+            }]).to_csv(os.path.join(d, 'products.csv'), index=False)
+
+            first = adapter.get_all_products()
+            self.assertEqual(first[0]['status'], 'Open')
+            # Caller-side decoration must not leak into the shared snapshot
+            first[0]['winner_name'] = 'X'
+
+            with mock.patch('auctions.excel_adapter.pd.read_csv') as read_csv:
+                again = adapter.get_all_products()
+                product = adapter.get_product_by_id(1)
+                read_csv.assert_not_called()
+            self.assertNotIn('winner_name', again[0])
+            self.assertEqual(product['name'], 'Test')
+
+            # Another adapter instance (e.g. admin views) writes -> snapshot rebuilt
+            ExcelAdapter(d).update_product(1, {'name': 'Renamed'})
+            self.assertEqual(adapter.get_product_by_id(1)['name'], 'Renamed')
+
+    def test_get_top_bids_one_pass(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            pd.DataFrame([
+                {'id':1, 'product_id':1, 'bidder_id':'A', 'amount':100, 'bid_timestamp':'2026-01-01T10:00:00'},
+                {'id':2, 'product_id':1, 'bidder_id':'B', 'amount':150, 'bid_timestamp':'2026-01-01T10:00:05'},
+                {'id':3, 'product_id':2, 'bidder_id':'A', 'amount':300, 'bid_timestamp':'2026-01-01T10:00:07'},
+            ]).to_csv(os.path.join(d, 'bids.csv'), index=False)
+
+            top = adapter.get_top_bids([1, 2, 3])
+            self.assertEqual(set(top), {1, 2})
+            self.assertEqual(top[1]['bidder_id'], 'B')
+            self.assertEqual(top[1]['amount'], 150)
+            self.assertEqual(adapter.get_top_bids([2])[2]['bidder_id'], 'A')
+            self.assertEqual(list(adapter.get_top_bids([2])), [2])
+
+    def test_employee_index_batch_lookup_and_rebuild(self):
+        with tempfile.TemporaryDirectory() as d:
+            emp_path = os.path.join(d, 'employees.csv')
+            pd.DataFrame([
+                {'id':1, 'employeeId':'0001', 'name':'張三', 'email':' A@KingSteel.com '},
+                {'id':2, 'employeeId':'1244', 'name':'Polar', 'email':'polar@kingsteel.com'},
+            ]).to_csv(emp_path, index=False)
+            adapter = ExcelAdapter(d)
+
+            found = adapter.get_employees_by_ids(['1', 1244.0, 'NOPE'])
+            self.assertEqual(found['1']['name'], '張三')
+            self.assertEqual(found[1244.0]['name'], 'Polar')
+            self.assertNotIn('NOPE', found)
+            self.assertEqual(adapter.get_employee_by_email('a@kingsteel.com')['employeeId'], '0001')
+
+            pd.DataFrame([
+                {'id':3, 'employeeId':'0477', 'name':'咪姐', 'email':'mlp@kingsteel.com'},
+            ]).to_csv(emp_path, index=False)
+            self.assertIsNone(adapter.get_employee_by_employeeId('0001'))
+            self.assertEqual(adapter.get_employee_by_employeeId(477)['name'], '咪姐')
+
+    def test_save_bid_appends_to_journal(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            pd.DataFrame([{
+                'id':1, 'name':'Test', 'start_price':100, 'current_price':100, 'bids_count':0,
+                'highest_bidder_id':'', 'last_bid_time':''
+            }]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            bids_path = os.path.join(d, 'bids.csv')
+            with open(bids_path, 'w', encoding='utf-8') as f:
+                # Legacy history as written by pandas/Excel: float ids, blank row, no final newline
+                f.write('id,product_id,bidder_id,amount,bid_timestamp\n,,,,\n7.0,2.0,X,50.0,2026-01-01T00:00:00')
+
+            adapter.save_bid(1, 'A', 100)
+            res = adapter.save_bid(1, 'B', 120)
+            self.assertEqual(res['bidId'], 9)
+
+            # Existing lines are untouched (a pandas rewrite would reformat them)
+            with open(bids_path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines[1], ',,,,')
+            self.assertEqual(lines[2], '7.0,2.0,X,50.0,2026-01-01T00:00:00')
+            self.assertTrue(lines[3].startswith('8,1,A,100,'))
+            self.assertTrue(lines[4].startswith('9,1,B,120,'))
+
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, 'C', 120)
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, 'B', 200)
+            self.assertEqual(adapter.journal.tail(1)['count'], 2)
+            self.assertEqual(adapter.get_product_by_id(1)['highest_bidder_id'], 'B')
+
+    def test_bid_summary_serves_my_bids_and_first_bid_check(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            pd.DataFrame([
+                {'id':1, 'name':'One', 'start_price':100, 'current_price':100, 'bids_count':0, 'highest_bidder_id':'', 'status':'Active'},
+                {'id':2, 'name':'Two', 'start_price':100, 'current_price':100, 'bids_count':0, 'highest_bidder_id':'', 'status':'Active'},
+            ]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            bids_path = os.path.join(d, 'bids.csv')
+            with open(bids_path, 'w', encoding='utf-8') as f:
+                f.write('id,product_id,bidder_id,amount,bid_timestamp\n1,2,0001,150,2026-01-01T00:00:00\n')
+
+            self.assertTrue(adapter.user_has_any_bids('0001'))
+            self.assertTrue(adapter.user_has_any_bids('1'))   # Same employee as '0001' and 1.0
+            self.assertTrue(adapter.user_has_any_bids(1.0))
+            self.assertFalse(adapter.user_has_any_bids('0002'))
+
+            adapter.save_bid(1, '0002', 110)
+            adapter.save_bid(1, '0001', 120)
+            self.assertTrue(adapter.user_has_any_bids('0002'))
+
+            # Appended by another process: picked up on the next lookup
+            with open(bids_path, 'a', encoding='utf-8') as f:
+                f.write('9,2,0002,200,2026-01-02T00:00:00\n')
+
+            with mock.patch('pandas.read_csv', side_effect=AssertionError('full read')):
+                mine = {g['product_id']: g for g in adapter.get_bids_for_employee('0001')}
+            self.assertEqual(mine[1]['bid_count'], 1)
+            self.assertTrue(mine[1]['is_winning'])
+            self.assertEqual((mine[1]['state'], mine[1]['max_amount']), ('winning', 120))
+            self.assertEqual(mine[2]['product_name'], 'Two')
+            self.assertEqual(mine[2]['state'], 'outbid')
+            self.assertEqual(adapter.get_outbid_product_ids('0001'), [2])
+            self.assertEqual(adapter.get_outbid_product_ids('0002'), [1])
+            self.assertEqual(adapter.get_bids_for_employee('nobody'), [])
+
+    def test_bids_on_different_products_share_the_writes(self):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            pd.DataFrame([
+                {'id':pid, 'name':f'P{pid}', 'start_price':100, 'current_price':100, 'bids_count':0,
+                 'highest_bidder_id':'', 'last_bid_time':''}
+                for pid in range(1, 9)
+            ]).to_csv(os.path.join(d, 'products.csv'), index=False)
+
+            # A slow disk: every journal append takes 0.2 s. Eight bids on eight products
+            # one write after another would take 1.6 s; batched by the writer they take two
+            appends = []
+            append_many = adapter.journal.append_many
+            def slow_append(plan):
+                appends.append(threading.current_thread().name)
+                time.sleep(0.2)
+                return append_many(plan)
+            with mock.patch.object(adapter.journal, 'append_many', side_effect=slow_append):
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    results = list(pool.map(lambda pid: adapter.save_bid(pid, 'A', 100), range(1, 9)))
+                elapsed = time.perf_counter() - start
+            self.assertTrue(all(r['success'] for r in results))
+            self.assertLessEqual(len(appends), 3)
+            self.assertLess(elapsed, 0.8)
+            self.assertEqual([adapter.get_product_by_id(pid)['highest_bidder_id'] for pid in range(1, 9)], ['A'] * 8)
+
+            # Same-amount collision: exactly one of the racing bidders wins
+            def bid(i):
+                try:
+                    adapter.save_bid(1, f'U{i}', 150)
+                    return True
+                except ValueError:
+                    return False
+            with ThreadPoolExecutor(max_workers=10) as pool:
+                results = list(pool.map(bid, range(10)))
+            self.assertEqual(results.count(True), 1)
+
+            product = adapter.get_product_by_id(1)
+            self.assertEqual(product['bids_count'], 2)
+            self.assertEqual(product['current_price'], 150)
+
+    def test_save_bid_checks_rules_against_products_read_under_the_lock(self):
+        with tempfile.TemporaryDirectory() as d:
+            future = (pd.Timestamp.now(tz='Asia/Taipei') + pd.Timedelta(hours=1)).isoformat()
+            past = (pd.Timestamp.now(tz='Asia/Taipei') - pd.Timedelta(minutes=1)).isoformat()
+            pd.DataFrame([{'id': 1, 'name': 'P', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+                           'highest_bidder_id': '', 'start_time': '2020-01-01T00:00:00+08:00', 'end_time': future}]
+                         ).to_csv(os.path.join(d, 'products.csv'), index=False)
+            adapter = ExcelAdapter(d)
+            self.assertEqual(adapter.get_product_by_id(1)['status'], 'Open')
+
+            # An admin closes the auction from another process while the bid waits for bids.csv
+            append_many = adapter.journal.append_many
+            def admin_edit_then_append(plan):
+                ExcelAdapter(d).update_product(1, {'end_time': past})
+                return append_many(plan)
+            seen = []
+            with mock.patch.object(adapter.journal, 'append_many', side_effect=admin_edit_then_append):
+                adapter.save_bid(1, 'A', 100, rules=lambda product, last_bid: seen.append(product['status']))
+            self.assertEqual(seen, ['Closed'])
+
+    def test_get_all_products_columnar_cleanup_and_image_table(self):
+        with tempfile.TemporaryDirectory() as root:
+            d = os.path.join(root, 'data')
+            os.makedirs(os.path.join(root, 'data_photo', '1'))
+            open(os.path.join(root, 'data_photo', '1', 'b.jpg'), 'wb').close()
+            open(os.path.join(root, 'data_photo', '1', 'a.png'), 'wb').close()
+            os.makedirs(d)
+            with open(os.path.join(d, 'products.csv'), 'w', encoding='utf-8') as f:
+                f.write("id,name,start_price,current_price,bids_count,start_time,end_time\n")
+                f.write("1.0,A,100,24010.0,3,2026/01/01 10:00,2026-01-01T12:00:00+08:00\n")
+                f.write(",,,,,,\n")
+                f.write("2,,200,,0,,\n")
+
+            products = ExcelAdapter(d).get_all_products()
+            self.assertEqual([p['id'] for p in products], [1, 2])
+            first, second = products
+            self.assertEqual((first['current_price'], type(first['current_price'])), (24010, int))
+            self.assertEqual(first['start_time'].isoformat(), '2026-01-01T10:00:00+08:00')
+            self.assertEqual(first['main_image'], '/data_photo/1/a.png')
+            # No derivative built: cards fall back to the original
+            self.assertEqual(first['main_image_thumb'], '/data_photo/1/a.png')
+            self.assertEqual((second['name'], second['current_price'], second['start_time']), ('', '', ''))
+            self.assertIsNone(second['main_image'])
+
+    def test_product_writes_replace_the_file_atomically(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            products_path = os.path.join(d, 'products.csv')
+            pd.DataFrame([{'id':1, 'name':'Test', 'start_price':100, 'current_price':100, 'bids_count':0}]).to_csv(products_path, index=False)
+            inode = os.stat(products_path).st_ino
+
+            # Readers never see a truncated file: the old content stays until the rename
+            with mock.patch('auctions.excel_adapter.os.replace', side_effect=OSError('crash')):
+                with self.assertRaises(OSError):
+                    adapter.update_product(1, {'name': 'Renamed'})
+            self.assertEqual(pd.read_csv(products_path).iloc[0]['name'], 'Test')
+            self.assertEqual([n for n in os.listdir(d) if n.endswith('.tmp')], [])
+
+            adapter.update_product(1, {'name': 'Renamed'})
+            self.assertNotEqual(os.stat(products_path).st_ino, inode)
+            self.assertEqual(adapter.get_product_by_id(1)['name'], 'Renamed')
+            self.assertTrue(os.path.exists(products_path + '.lock'))
+            # The lock was released: another read-modify-write goes through
+            adapter.update_product(1, {'name': 'Again'})
+            self.assertEqual(pd.read_csv(products_path).iloc[0]['name'], 'Again')
+
+    def test_save_bid_reuses_snapshot_frame_for_product_write(self):
+        with tempfile.TemporaryDirectory() as d:
+            adapter = ExcelAdapter(d)
+            products_path = os.path.join(d, 'products.csv')
+            pd.DataFrame([
+                {'id':1, 'name':'One', 'start_price':100, 'current_price':100, 'bids_count':0, 'highest_bidder_id':''},
+                {'id':2, 'name':'Two', 'start_price':100, 'current_price':100, 'bids_count':0, 'highest_bidder_id':''},
+            ]).to_csv(products_path, index=False)
+            adapter.save_bid(1, 'A', 100)
+
+            with mock.patch('pandas.read_csv', side_effect=AssertionError('products.csv re-read')):
+                adapter.save_bid(1, 'B', 110)
+                adapter.save_bid(2, 'A', 100)
+
+            df = pd.read_csv(products_path).set_index('id')
+            self.assertEqual((df.at[1, 'current_price'], df.at[1, 'bids_count'], df.at[1, 'highest_bidder_id']), (110, 2, 'B'))
+            self.assertEqual(df.at[2, 'highest_bidder_id'], 'A')
+
+            # Changed on disk by someone else: the writer reads the file instead of the stale frame
+            df.loc[2, 'name'] = 'Edited'
+            df.reset_index().to_csv(products_path, index=False)
+            adapter.save_bid(2, 'B', 120)
+            df = pd.read_csv(products_path).set_index('id')
+            self.assertEqual((df.at[2, 'name'], df.at[2, 'current_price']), ('Edited', 120))
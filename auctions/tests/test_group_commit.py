@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+import pandas as pd
+from django.test import SimpleTestCase
+from auctions.excel_adapter import ExcelAdapter
+from auctions.group_commit import GroupCommitter
+
+
+class GroupCommitterTests(SimpleTestCase):
+    def test_concurrent_items_share_one_commit(self):
+        batches = []
+
+        def commit(items):
+            batches.append(list(items))
+            return [ValueError(item) if item % 2 else item * 10 for item in items]
+
+        committer = GroupCommitter(commit, window=0.2)
+        barrier = threading.Barrier(4)
+        outcomes = {}
+
+        def submit(i):
+            barrier.wait()
+            outcomes[i] = committer.submit(i)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), [0, 1, 2, 3])
+        self.assertEqual((outcomes[0], outcomes[2]), (0, 20))
+        self.assertIsInstance(outcomes[3], ValueError)
+
+    def test_commit_failure_is_every_outcome(self):
+        committer = GroupCommitter(lambda items: 1 / 0, window=0)
+        self.assertIsInstance(committer.submit('x'), ZeroDivisionError)
+
+
+class ExcelGroupCommitTests(SimpleTestCase):
+    def test_batch_checks_in_order_and_writes_once(self):
+        with tempfile.TemporaryDirectory() as d:
+            pd.DataFrame([
+                {'id': pid, 'name': f'P{pid}', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+                 'highest_bidder_id': '', 'last_bid_time': ''} for pid in (1, 2)
+            ]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            pd.DataFrame(columns=['id', 'product_id', 'bidder_id', 'amount', 'bid_timestamp']).to_csv(
+                os.path.join(d, 'bids.csv'), index=False)
+            adapter = ExcelAdapter(d)
+
+            requests = [
+                {'product_id': 1, 'employee_id': 'A', 'amount': 120, 'rules': None},
+                {'product_id': 1, 'employee_id': 'B', 'amount': 120, 'rules': None},   # not higher
+                {'product_id': 2, 'employee_id': 'B', 'amount': 150, 'rules': None},
+                {'product_id': 1, 'employee_id': 'A', 'amount': 130, 'rules': None},   # already highest
+                {'product_id': 1, 'employee_id': 'C', 'amount': 140, 'rules': lambda p, last: {'end_time': '2030-01-01T00:00:00+0800'}},
+                {'product_id': 9, 'employee_id': 'C', 'amount': 140, 'rules': None},
+            ]
+            with mock.patch.object(adapter.journal, 'append_many', wraps=adapter.journal.append_many) as append_many, \
+                 mock.patch.object(adapter, '_write_product_rows', wraps=adapter._write_product_rows) as write_rows:
+                outcomes = adapter._save_bids(requests)
+            self.assertEqual(append_many.call_count, 1)
+            self.assertEqual(write_rows.call_count, 1)
+
+            self.assertEqual([o['bidId'] for o in (outcomes[0], outcomes[2], outcomes[4])], [1, 2, 3])
+            self.assertIsInstance(outcomes[1], ValueError)
+            self.assertIsInstance(outcomes[3], ValueError)
+            self.assertIsInstance(outcomes[5], LookupError)
+
+            df = pd.read_csv(os.path.join(d, 'products.csv')).set_index('id')
+            self.assertEqual((df.at[1, 'current_price'], df.at[1, 'bids_count'], df.at[1, 'highest_bidder_id']), (140, 2, 'C'))
+            self.assertEqual(df.at[1, 'end_time'], '2030-01-01T00:00:00+0800')
+            self.assertEqual((df.at[2, 'current_price'], df.at[2, 'bids_count']), (150, 1))
+            self.assertEqual(adapter.journal.tail(1)['count'], 2)
+
+    def test_save_bid_through_group_commit(self):
+        with tempfile.TemporaryDirectory() as d:
+            pd.DataFrame([{'id': 1, 'name': 'P', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+                           'highest_bidder_id': ''}]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            adapter = ExcelAdapter(d)
+            adapter.enable_group_commit(1)
+            self.assertEqual(adapter.save_bid(1, 'A', 100)['bidId'], 1)
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, 'A', 200)
+            adapter.enable_group_commit(0)
+            self.assertEqual(adapter._group_commit.window, 0)
+
+    def test_journal_failure_fails_every_bid(self):
+        with tempfile.TemporaryDirectory() as d:
+            pd.DataFrame([{'id': 1, 'name': 'P', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+                           'highest_bidder_id': ''}]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            adapter = ExcelAdapter(d)
+            # bids.csv held open by Excel: the append fails before plan() runs
+            with mock.patch.object(adapter.journal, 'append_many', side_effect=PermissionError('bids.csv')):
+                outcomes = adapter._save_bids([{'product_id': 1, 'employee_id': 'A', 'amount': 100, 'rules': None}])
+                self.assertIsInstance(outcomes[0], PermissionError)
+                with self.assertRaises(PermissionError):
+                    adapter.save_bid(1, 'A', 100)
+
+    def test_products_write_failure_keeps_appended_bids(self):
+        with tempfile.TemporaryDirectory() as d:
+            pd.DataFrame([{'id': 1, 'name': 'P', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+                           'highest_bidder_id': ''}]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            adapter = ExcelAdapter(d)
+            with mock.patch.object(adapter, '_write_product_rows', side_effect=PermissionError('products.csv')), \
+                 self.assertLogs('auctions.excel_adapter', 'ERROR'):
+                res = adapter.save_bid(1, 'A', 100)
+            self.assertEqual(res['bidId'], 1)
+            # Later bids are checked against the journal tail, not the stale products.csv row
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, 'B', 100)
+            self.assertEqual(adapter.save_bid(1, 'B', 110)['bidId'], 2)
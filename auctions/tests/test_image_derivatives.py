@@ -0,0 +1,39 @@
+import tempfile
+import os
+from unittest import skipIf
+from django.test import SimpleTestCase
+from auctions.base_adapter import BaseAdapter
+from auctions.image_derivatives import DerivativePipeline, Image
+
+
+class ImageDerivativeTests(SimpleTestCase):
+    def test_variants_fall_back_to_originals(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, 'data'))
+            os.makedirs(os.path.join(root, 'data_photo', '3'))
+            open(os.path.join(root, 'data_photo', '3', '1.jpg'), 'wb').close()
+            adapter = BaseAdapter(os.path.join(root, 'data'))
+            self.assertEqual(adapter.get_image_variants(3), [{
+                'name': '1.jpg', 'url': '/data_photo/3/1.jpg',
+                'thumb': '/data_photo/3/1.jpg', 'medium': '/data_photo/3/1.jpg',
+            }])
+            self.assertEqual(adapter.get_image_variants(4), [])
+
+    @skipIf(Image is None, 'Pillow is not installed')
+    def test_build_resizes_and_remove_deletes(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, '5'))
+            Image.new('RGB', (2400, 1200), 'red').save(os.path.join(root, '5', '1.png'))
+            pipeline = DerivativePipeline(root)
+
+            pipeline.schedule(5, '1.png').result()
+            thumb = pipeline.url(5, '1.png', 'thumb')
+            self.assertEqual(thumb, '/data_photo/_derived/5/1-thumb.jpg')
+            with Image.open(os.path.join(root, '_derived', '5', '1-thumb.jpg')) as small:
+                self.assertEqual(small.size, (400, 200))
+            with Image.open(os.path.join(root, '_derived', '5', '1-medium.jpg')) as medium:
+                self.assertEqual(medium.size, (1200, 600))
+
+            pipeline.remove(5, '1.png')
+            self.assertIsNone(pipeline.url(5, '1.png', 'thumb'))
+            self.assertFalse(os.path.exists(os.path.join(root, '_derived', '5', '1-medium.jpg')))
@@ -0,0 +1,41 @@
+import tempfile
+import os
+from unittest import mock
+from django.test import SimpleTestCase
+from auctions import image_manifest
+from auctions.image_manifest import ImageManifest
+
+
+def _touch(*parts):
+    open(os.path.join(*parts), 'wb').close()
+
+
+class ImageManifestTests(SimpleTestCase):
+    def test_lists_folders_once_and_follows_changes(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, '7'))
+            _touch(root, '7', '2.jpg')
+            _touch(root, '7', '1.png')
+            _touch(root, '7', 'notes.txt')
+            manifest = ImageManifest(root)
+            self.assertEqual(manifest.table(), {7: ['1.png', '2.jpg']})
+
+            # Unchanged root and within the revalidation window: no folder listing at all
+            with mock.patch('auctions.image_manifest.os.listdir') as listdir:
+                self.assertEqual(manifest.images(7), ['1.png', '2.jpg'])
+                listdir.assert_not_called()
+
+            # A new product folder changes the root mtime -> rescan
+            os.makedirs(os.path.join(root, '8'))
+            _touch(root, '8', '1.jpg')
+            self.assertEqual(manifest.images(8), ['1.jpg'])
+
+            # Uploads refresh their folder explicitly
+            _touch(root, '7', '3.jpg')
+            manifest.refresh(7)
+            self.assertEqual(manifest.images(7), ['1.png', '2.jpg', '3.jpg'])
+
+            # Files dropped in by hand are found by the periodic folder sweep
+            os.remove(os.path.join(root, '8', '1.jpg'))
+            with mock.patch.object(image_manifest, 'REVALIDATE_SECONDS', 0):
+                self.assertEqual(manifest.images(8), [])
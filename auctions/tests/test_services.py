@@ -61,6 +61,43 @@ class BidServiceTests(SimpleTestCase):
                 service.place_bid(1, '0001', 400)
             self.assertEqual(cm.exception.code, 'AUCTION_NOT_ACTIVE')
 
+    def test_place_bid_is_one_atomic_adapter_call(self):
+        from datetime import datetime, timedelta
+        from unittest import mock
+        from auctions.services import TAIPEI_TZ
+        with tempfile.TemporaryDirectory() as d:
+            self.setup_data(d)
+            now = datetime.now(TAIPEI_TZ)
+            df_prod = pd.read_csv(os.path.join(d, 'products.csv'))
+            df_prod['start_time'] = (now - timedelta(hours=1)).isoformat()
+            df_prod['end_time'] = (now + timedelta(seconds=5)).isoformat()
+            df_prod.to_csv(os.path.join(d, 'products.csv'), index=False)
+            adapter = ExcelAdapter(d)
+            service = BidService(adapter)
+
+            with mock.patch.object(adapter, 'update_product') as update_product, \
+                 mock.patch.object(adapter, 'get_bids_for_product') as get_bids_for_product:
+                res = service.place_bid(1, '0001', 350)
+            update_product.assert_not_called()
+            get_bids_for_product.assert_not_called()
+
+            # Anti-sniper extension written together with the bid
+            self.assertTrue(res['time_extended'])
+            end_time = adapter.get_product_by_id(1)['end_time']
+            self.assertGreater((end_time - now).total_seconds(), 10)
+
+            # Rules run against the state under the lock: the race loser gets a business error
+            with self.assertRaises(BusinessException) as cm:
+                service.place_bid(1, '0002', 350)
+            self.assertEqual(cm.exception.code, 'INVALID_BID_AMOUNT')
+            with self.assertRaises(BusinessException) as cm:
+                service.place_bid(1, '0001', 400)
+            self.assertEqual(cm.exception.code, 'ALREADY_HIGHEST_BIDDER')
+            with self.assertRaises(BusinessException) as cm:
+                service.place_bid(99, '0001', 400)
+            self.assertEqual(cm.exception.code, 'PRODUCT_NOT_FOUND')
+            self.assertEqual(adapter.journal.tail(1)['count'], 1)
+
 class AuthServiceTests(SimpleTestCase):
     def setUp(self):
         pass
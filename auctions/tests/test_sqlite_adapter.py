@@ -0,0 +1,74 @@
+import tempfile
+import os
+import pandas as pd
+from django.test import SimpleTestCase
+from auctions.sqlite_adapter import SqliteAdapter
+
+
+class SqliteAdapterTests(SimpleTestCase):
+    def setup_csv(self, d):
+        pd.DataFrame([{
+            'id':1, 'name':'Test', 'start_price':100, 'current_price':120, 'status':'',
+            'start_time':'2020-01-01T00:00', 'end_time':'2099-01-01T00:00',
+            'bids_count':1, 'highest_bidder_id':'0001', 'image_url':''
+        }]).to_csv(os.path.join(d, 'products.csv'), index=False)
+        pd.DataFrame([
+            {'id':1.0, 'product_id':1.0, 'bidder_id':'0001', 'amount':120.0, 'bid_timestamp':'2026-01-01T10:00:00'},
+        ]).to_csv(os.path.join(d, 'bids.csv'), index=False)
+        pd.DataFrame([
+            {'id':1, 'employeeId':'0001', 'name':'張三', 'email':'Test@KingSteel.com'},
+            {'id':2, 'employeeId':'1244', 'name':'Polar', 'email':'polar@kingsteel.com'},
+        ]).to_csv(os.path.join(d, 'employees.csv'), index=False)
+
+    def test_import_bid_and_export_roundtrip(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.setup_csv(d)
+            adapter = SqliteAdapter(d)
+            counts = adapter.import_csv(d)
+            self.assertEqual(counts, {'products': 1, 'bids': 1, 'employees': 2})
+            self.assertEqual(adapter._conn().execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+            product = adapter.get_product_by_id(1)
+            self.assertEqual(product['status'], 'Open')
+            self.assertEqual(adapter.get_employee_by_email('test@kingsteel.com')['name'], '張三')
+            self.assertEqual(adapter.get_employees_by_ids([1244.0])[1244.0]['name'], 'Polar')
+
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, '0001', 200)  # already the highest bidder
+            with self.assertRaises(ValueError):
+                adapter.save_bid(1, '1244', 120)  # not higher than current price
+            res = adapter.save_bid(1, '1244', 150)
+            self.assertEqual(res['bidId'], 2)
+
+            self.assertEqual(adapter.get_top_bids([1])[1]['bidder_id'], '1244')
+            self.assertEqual([b['amount'] for b in adapter.get_bids_for_product(1)], [150, 120])
+            self.assertTrue(adapter.user_has_any_bids('0001'))
+            mine = adapter.get_bids_for_employee('1244')
+            self.assertTrue(mine[0]['is_winning'])
+            self.assertEqual(adapter.get_outbid_product_ids('0001'), [1])
+            self.assertEqual(adapter.get_product_by_id(1)['bids_count'], 2)
+
+            out = os.path.join(d, 'export')
+            adapter.export_csv(out)
+            self.assertEqual(sorted(os.listdir(out)), ['bids.csv', 'employees.csv', 'products.csv'])
+            with open(os.path.join(out, 'products.csv'), 'rb') as f:
+                self.assertTrue(f.read().startswith(b'\xef\xbb\xbf'))  # Excel-friendly BOM kept
+            df_bids = pd.read_csv(os.path.join(out, 'bids.csv'), encoding='utf-8-sig')
+            df_prod = pd.read_csv(os.path.join(out, 'products.csv'), encoding='utf-8-sig')
+            self.assertEqual(len(df_bids), 2)
+            self.assertEqual(df_prod.iloc[0]['current_price'], 150)
+
+    def test_product_reads_take_statuses_from_the_timeline(self):
+        from unittest import mock
+        with tempfile.TemporaryDirectory() as d:
+            self.setup_csv(d)
+            adapter = SqliteAdapter(d)
+            adapter.import_csv(d)
+            with mock.patch.object(adapter, '_derive_status', side_effect=AssertionError('per-row status')):
+                product = adapter.get_product_by_id(1)
+                self.assertEqual(product['status'], adapter.get_product_statuses()[1])
+                self.assertEqual([p['status'] for p in adapter.get_all_products()], [product['status']])
+            # Callers decorate the dicts they get; the cached rows stay as they were
+            product['name'] = 'changed'
+            self.assertEqual(adapter.get_product_by_id(1)['name'], 'Test')
+            self.assertIsNone(adapter.get_product_by_id(99))
@@ -0,0 +1,91 @@
+import gzip
+import os
+import tempfile
+from django.contrib.staticfiles.handlers import StaticFilesHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+
+class StaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = self.tmp.name
+        os.makedirs(os.path.join(root, 'static', 'js'))
+        os.makedirs(os.path.join(root, 'photos', '1'))
+        self.script = os.path.join(root, 'static', 'js', 'app.js')
+        with open(self.script, 'w') as f:
+            f.write('console.log("hello");\n' * 20)
+        with open(os.path.join(root, 'photos', '1', '1.jpg'), 'wb') as f:
+            f.write(bytes(range(100)))
+        settings = override_settings(
+            STATICFILES_DIRS=[os.path.join(root, 'static')], MEDIA_ROOT=os.path.join(root, 'photos'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_hashed_url_is_immutable_and_revalidates(self):
+        url = static('js/app.js')
+        self.assertRegex(url, r'^/static/js/app\.[0-9a-f]{12}\.js$')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content).count(b'hello'), 20)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # The plain name and an outdated hash still work, but are not cached for long
+        self.assertEqual(self.client.get('/static/js/app.js')['Cache-Control'], 'no-cache')
+        with open(self.script, 'a') as f:
+            f.write('// changed\n')
+        stale = self.client.get(url)
+        self.assertEqual((stale.status_code, stale['Cache-Control']), (200, 'no-cache'))
+        self.assertNotEqual(static('js/app.js'), url)
+        self.assertEqual(self.client.get('/static/js/missing.js').status_code, 404)
+
+    @override_settings(DEBUG=True)
+    def test_hashed_url_under_runserver_static_handler(self):
+        # runserver wraps the app in StaticFilesHandler, which answers /static/ from the finders
+        url = static('js/app.js')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = StaticFilesHandler(WSGIHandler()).get_response(RequestFactory().get(url))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content).count(b'hello'), 20)
+        response.close()
+
+    def test_precompressed_variant_when_accepted(self):
+        with open(self.script, 'rb') as f:
+            original = f.read()
+        with open(self.script + '.gz', 'wb') as f:
+            f.write(gzip.compress(original))
+
+        response = self.client.get(static('js/app.js'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), original)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        identity = self.client.get(static('js/app.js'))
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertNotIn('Content-Encoding', self.client.get(static('js/app.js'), HTTP_ACCEPT_ENCODING='gzip;q=0, deflate'))
+        self.assertNotIn('Content-Encoding', self.client.get(static('js/app.js'), HTTP_ACCEPT_ENCODING='x-gzip-ish'))
+
+        # Each representation has its own validator
+        self.assertNotEqual(response['ETag'], identity['ETag'])
+        revalidate = self.client.get(static('js/app.js'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(revalidate.status_code, 200)
+        self.assertEqual(self.client.get(static('js/app.js'), HTTP_ACCEPT_ENCODING='gzip',
+                                         HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_media_range_requests(self):
+        response = self.client.get('/data_photo/1/1.jpg', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, bytes(range(10, 20)))
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        self.assertEqual(self.client.get('/data_photo/1/1.jpg', HTTP_RANGE='bytes=-5').content, bytes(range(95, 100)))
+        self.assertEqual(self.client.get('/data_photo/1/1.jpg', HTTP_RANGE='bytes=200-').status_code, 416)
+        # A Range for another version of the file gets the whole file
+        full = self.client.get('/data_photo/1/1.jpg', HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"other"')
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(self.client.get('/data_photo/1/..%2F..%2Fstatic%2Fjs%2Fapp.js').status_code, 404)
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from django.test import SimpleTestCase
+from auctions.base_adapter import BaseAdapter, TAIPEI_TZ
+from auctions.status_timeline import StatusTimeline
+
+
+class StatusTimelineTests(SimpleTestCase):
+    def setUp(self):
+        self.now = TAIPEI_TZ.localize(datetime(2026, 3, 1, 12, 0, 0))
+        hour = timedelta(hours=1)
+        self.rows = [
+            {'id': 1, 'status': '', 'start_time': self.now + hour, 'end_time': self.now + 2 * hour},
+            {'id': 2, 'status': '', 'start_time': self.now - hour, 'end_time': self.now + hour},
+            {'id': 3, 'status': '', 'start_time': self.now - 2 * hour, 'end_time': self.now - hour},
+            {'id': 4, 'status': 'Unsold', 'start_time': self.now - hour, 'end_time': self.now + hour},
+            {'id': 5, 'status': 'Open', 'start_time': '', 'end_time': ''},
+            {'id': 6, 'status': '', 'start_time': self.now, 'end_time': self.now},
+        ]
+
+    def test_statuses_match_derive_status(self):
+        timeline = StatusTimeline(self.rows)
+        self.assertEqual(timeline.statuses(self.now), {
+            1: 'Upcoming', 2: 'Open', 3: 'Closed', 4: 'Unsold', 5: 'Open', 6: 'Open',
+        })
+
+        # Same answers as the per-row rule at the real clock
+        adapter = BaseAdapter('.')
+        expected = [adapter._derive_status(row) for row in self.rows]
+        self.assertEqual(timeline.status_list(), expected)
+        self.assertEqual(timeline.status_of(2, self.now), 'Open')
+        self.assertIsNone(timeline.status_of(99))
+
+    def test_next_change_is_the_next_start_or_end(self):
+        timeline = StatusTimeline(self.rows)
+        # Product 6 closes 1 ms after its end time
+        self.assertEqual(timeline.next_change(self.now), self.now.timestamp() + 0.001)
+        later = self.now + timedelta(minutes=30)
+        self.assertEqual(timeline.next_change(later), (self.now + timedelta(hours=1)).timestamp())
+        self.assertIsNone(timeline.next_change(self.now + timedelta(days=1)))
+        self.assertIsNone(StatusTimeline([]).next_change())
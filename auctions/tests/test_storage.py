@@ -0,0 +1,41 @@
+import tempfile
+import os
+import pandas as pd
+from django.test import SimpleTestCase
+from auctions import storage
+from auctions.excel_adapter import ExcelAdapter
+from auctions.services import BidService, ProductService
+
+
+class StorageRegistryTests(SimpleTestCase):
+    def tearDown(self):
+        storage.set_adapter(None)
+
+    def test_services_share_one_adapter_and_listeners_see_every_write(self):
+        with tempfile.TemporaryDirectory() as d:
+            pd.DataFrame([{
+                'id':1, 'name':'Test', 'start_price':100, 'current_price':100, 'bids_count':0,
+                'highest_bidder_id':'', 'last_bid_time':'',
+            }]).to_csv(os.path.join(d, 'products.csv'), index=False)
+            storage.set_adapter(ExcelAdapter(d))
+
+            adapter = storage.get_adapter()
+            self.assertIs(storage.get_service(BidService).adapter, adapter)
+            self.assertIs(storage.get_service(ProductService).adapter, adapter)
+            self.assertIs(storage.get_service(BidService), storage.get_service(BidService))
+
+            events = []
+            storage.on_write(lambda event, product_id, data: events.append((event, product_id)))
+
+            # Prime the bidder-facing snapshot, then mutate through the "admin" side
+            self.assertEqual(adapter.get_product_by_id(1)['name'], 'Test')
+            storage.get_service(ProductService).update_product(1, {'name': 'Renamed'})
+            self.assertEqual(adapter.get_product_by_id(1)['name'], 'Renamed')
+
+            adapter.save_bid(1, 'A', 100)
+            new_id = adapter.save_product({'name': 'New', 'start_price': 10})
+            adapter.delete_product(new_id)
+
+            self.assertEqual(events, [
+                ('update_product', 1), ('save_bid', 1), ('save_product', new_id), ('delete_product', new_id),
+            ])
@@ -0,0 +1,179 @@
+import gzip
+import json
+import tempfile
+import os
+import pandas as pd
+from datetime import timedelta
+from unittest import mock
+from django.test import SimpleTestCase, AsyncRequestFactory, override_settings
+from django.urls import reverse, resolve
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.utils import timezone
+from auctions import views, events, urls
+from auctions.services import BidService
+from auctions.excel_adapter import ExcelAdapter
+
+
+# Streams are off under WSGI by default; these tests stream through the sync test client
+@override_settings(AUCTION_SSE_WSGI_MAX_STREAMS=8)
+class PollViewTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        d = self._tmp.name
+        now = timezone.now()
+        pd.DataFrame([{
+            'id': pid, 'name': f'Test {pid}', 'start_price': 100, 'current_price': 100, 'bids_count': 0,
+            'highest_bidder_id': '', 'last_bid_time': '',
+            'start_time': (now - timedelta(hours=1)).isoformat(),
+            'end_time': (now + timedelta(hours=1)).isoformat(),
+        } for pid in (1, 2)]).to_csv(os.path.join(d, 'products.csv'), index=False)
+        self.adapter = ExcelAdapter(d)
+        patcher = mock.patch.object(views, 'adapter', self.adapter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _assert_revalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b'')
+
+        self.adapter.save_bid(1, 'A', 100)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(changed.json()['success'], True)
+
+    def test_products_poll_answers_304_until_a_bid_lands(self):
+        self._assert_revalidates(reverse('auctions:products_poll'))
+
+    def test_product_poll_answers_304_until_a_bid_lands(self):
+        self._assert_revalidates(reverse('auctions:product_poll', args=[1]))
+
+    def test_since_returns_only_changed_products(self):
+        url = reverse('auctions:products_poll')
+        full = self.client.get(url).json()
+        self.assertTrue(full['full'])
+        self.assertEqual(sorted(p['id'] for p in full['products']), [1, 2])
+
+        idle = self.client.get(url, {'since': full['version']}).json()
+        self.assertFalse(idle['full'])
+        self.assertEqual(idle['products'], [])
+        self.assertEqual(idle['version'], full['version'])
+
+        self.adapter.save_bid(2, 'A', 100)
+        delta = self.client.get(url, {'since': full['version']}).json()
+        self.assertGreater(delta['version'], full['version'])
+        self.assertEqual([p['id'] for p in delta['products']], [2])
+        self.assertEqual(delta['products'][0]['highest_bidder_id'], 'A')
+        self.assertEqual(delta['status_counts']['Open'], 2)
+        self.assertEqual(delta['removed'], [])
+
+        # A deleted product is announced in the delta, so clients drop its card
+        self.adapter.delete_product(1)
+        gone = self.client.get(url, {'since': delta['version']}).json()
+        self.assertFalse(gone['full'])
+        self.assertEqual((gone['products'], gone['removed']), ([], [1]))
+        self.assertEqual(self.client.get(url, {'since': full['version']}).json()['removed'], [1])
+        self.assertEqual(self.client.get(url, {'since': gone['version']}).json()['removed'], [])
+
+    def test_unknown_version_falls_back_to_full_list(self):
+        data = self.client.get(reverse('auctions:products_poll'), {'since': 1}).json()
+        self.assertTrue(data['full'])
+        self.assertEqual(len(data['products']), 2)
+
+    def test_poll_payload_is_slim_and_compressed(self):
+        url = reverse('auctions:products_poll')
+        plain = self.client.get(url).json()
+        self.assertEqual(set(plain['products'][0]), set(views.POLL_LIST_FIELDS))
+        self.assertEqual(set(self.client.get(reverse('auctions:product_poll', args=[1])).json()['product']),
+                         set(views.POLL_PRODUCT_FIELDS))
+
+        with self.settings(AUCTION_COMPRESS_MIN_SIZE=0):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(json.loads(gzip.decompress(response.content))['products'], plain['products'])
+            # The weakened ETag still revalidates
+            self.assertTrue(response['ETag'].startswith('W/'))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+            # Never buffered: the event stream keeps flowing uncompressed
+            stream = self.client.get(reverse('auctions:products_stream'), HTTP_ACCEPT_ENCODING='gzip')
+            self.assertFalse(stream.has_header('Content-Encoding'))
+            stream.close()
+        with self.settings(AUCTION_COMPRESS_MIN_SIZE=10 ** 6):
+            self.assertFalse(self.client.get(url, HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+
+    def test_product_stream_pushes_bid_events(self):
+        response = self.client.get(reverse('auctions:product_stream', args=[1]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.assertTrue(next(stream).startswith(b'retry:'))
+
+        BidService(self.adapter).place_bid(1, 'A', 100)
+        self.assertTrue(next(stream).startswith(b'event: bid-placed\n'))
+        price = next(stream).decode()
+        self.assertTrue(price.startswith('event: price-changed\n'))
+        self.assertIn('"highest_bidder_id":"A"', price)
+        # Everything a card shows comes with the event, so viewers need no poll
+        self.assertIn('"bids_count":1', price)
+
+        response.close()
+        self.assertEqual(events.bus.subscriber_count(), 0)
+
+    def test_streams_beyond_the_limit_are_refused(self):
+        with self.settings(AUCTION_SSE_WSGI_MAX_STREAMS=0):
+            response = self.client.get(reverse('auctions:products_stream'))
+        self.assertEqual(response.status_code, 503)
+
+    async def test_asgi_streams_have_their_own_limit(self):
+        request = AsyncRequestFactory().get(reverse('auctions:products_stream'))
+        with self.settings(AUCTION_SSE_MAX_STREAMS=0):
+            self.assertEqual((await views.products_stream_async(request)).status_code, 503)
+
+    async def test_product_stream_under_asgi_waits_on_the_event_loop(self):
+        request = AsyncRequestFactory().get(reverse('auctions:product_stream', args=[1]))
+        response = await views.product_stream_async(request, 1)
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+
+        events.bus.publish(events.ANTI_SNIPER_EXTENDED, 1, {'end_time': 'x'})
+        self.assertTrue((await anext(stream)).startswith(b'event: anti-sniper-extended\n'))
+        await stream.aclose()
+
+    def test_place_bid_places_the_bid(self):
+        with mock.patch.object(views, 'bid_service', BidService(self.adapter)):
+            response = self.client.post(
+                reverse('auctions:place_bid'),
+                data='{"productId": 1, "amount": 100, "employeeId": "A"}',
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['newPrice'], 100)
+        self.assertEqual(self.adapter.get_product_by_id(1)['highest_bidder_id'], 'A')
+
+    async def test_place_bid_async_view_places_the_bid(self):
+        request = AsyncRequestFactory().post(
+            reverse('auctions:place_bid'),
+            data='{"productId": 1, "amount": 100, "employeeId": "A"}',
+            content_type='application/json',
+        )
+        request.session = SessionStore()
+        with mock.patch.object(views, 'bid_service', BidService(self.adapter)):
+            response = await views.place_bid_async(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['newPrice'], 100)
+
+        request = AsyncRequestFactory().get(reverse('auctions:product_poll', args=[1]))
+        response = await views.product_poll_async(request, 1)
+        self.assertEqual(json.loads(response.content)['product']['highest_bidder_id'], 'A')
+
+    def test_urls_route_to_the_views_of_the_server_type(self):
+        self.assertIs(resolve(reverse('auctions:place_bid')).func, views.place_bid)
+        self.assertIs(urls._for_server(views.place_bid, views.place_bid_async), views.place_bid)
+        with self.settings(AUCTION_ASYNC_VIEWS=True):
+            self.assertIs(urls._for_server(views.place_bid, views.place_bid_async), views.place_bid_async)
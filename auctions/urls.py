@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from . import admin_views
 
 app_name = 'auctions'
 
+
+def _for_server(sync_view, async_view):
+    # Async views under ASGI (auction_site/asgi.py sets AUCTION_ASYNC_VIEWS); under WSGI
+    # Django would run them through async_to_sync plus a thread-pool hop per request
+    return async_view if settings.AUCTION_ASYNC_VIEWS else sync_view
+
+
 urlpatterns = [
     # User Views
     path('', views.index, name='index'),
@@ -26,9 +34,11 @@ urlpatterns = [
 
     # API endpoints
     path('api/check-first-bid/', views.check_first_bid, name='check_first_bid'),
-    path('api/products/poll/', views.products_poll, name='products_poll'),  # 商品列表輪詢
-    path('api/products/<int:product_id>/poll/', views.product_poll, name='product_poll'),
-    path('api/bids/', views.place_bid, name='place_bid'),
+    path('api/products/poll/', _for_server(views.products_poll, views.products_poll_async), name='products_poll'),  # 商品列表輪詢
+    path('api/products/<int:product_id>/poll/', _for_server(views.product_poll, views.product_poll_async), name='product_poll'),
+    path('api/bids/', _for_server(views.place_bid, views.place_bid_async), name='place_bid'),
+    path('api/stream/products/', _for_server(views.products_stream, views.products_stream_async), name='products_stream'),  # 即時推播 (SSE)
+    path('api/stream/products/<int:product_id>/', _for_server(views.product_stream, views.product_stream_async), name='product_stream'),
     path('api/products/<int:product_id>/images/', admin_views.get_product_images, name='get_product_images'),
     path('api/products/<int:product_id>/upload-images/', admin_views.upload_product_images, name='upload_product_images'),
 ]
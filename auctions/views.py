@@ -1,17 +1,28 @@
 import os
 import json
+import hashlib
 import logging
+import time
 from functools import wraps
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.conf import settings
 
 from datetime import datetime
 import pytz
-from django.utils import timezone
-from .excel_adapter import ExcelAdapter
+from .storage import get_adapter, get_service
 from .services import BidService, AuthService
+from . import events, api_json
+from .api_json import ApiJsonResponse, compact_row
+from .card_cache import card_cache
+from .bid_ingest import issue_bid_token, revoke_bid_tokens
+from .executors import run_read, run_write
 from common.exceptions import BusinessException, SystemException
 
 # Timezone settings
@@ -20,11 +31,10 @@ TAIPEI_TZ = pytz.timezone('Asia/Taipei')
 # Initialize logger (using common logger if configured, else standard django logger)
 logger = logging.getLogger(__name__)
 
-# Dependeny Injection Setup
-DATA_DIR = os.path.join(settings.BASE_DIR, 'data')
-adapter = ExcelAdapter(DATA_DIR)
-bid_service = BidService(adapter)
-auth_service = AuthService(adapter)
+# Dependeny Injection Setup: shared with admin_views through the storage registry
+adapter = get_adapter()
+bid_service = get_service(BidService)
+auth_service = get_service(AuthService)
 
 
 # Login required decorator for employee views
@@ -80,18 +90,23 @@ def products_list(request):
         products = closed_products + other_products
         
         # Add highest bidder and winner information for all products
+        # (one pass over bids.csv for the whole catalog instead of one read per product)
+        top_bids = adapter.get_top_bids([p['id'] for p in products])
+        winners = adapter.get_employees_by_ids(
+            bid.get('bidder_id') for bid in top_bids.values()
+        )
         for product in products:
             # Get the highest bid for this product
-            bids = adapter.get_bids_for_product(product['id'], limit=1)
+            top_bid = top_bids.get(product['id'])
             
-            if bids:
-                bidder_id = bids[0].get('bidder_id')
+            if top_bid:
+                bidder_id = top_bid.get('bidder_id')
                 # For all products: store highest bidder ID (工號)
                 product['highest_bidder_id'] = bidder_id
                 
                 #  For closed products: also get winner name
                 if product.get('status') in ['Closed', 'Unsold', 'Ended']:
-                    winner = adapter.get_employee_by_employeeId(bidder_id)
+                    winner = winners.get(bidder_id)
                     product['winner_name'] = winner.get('name') if winner else bidder_id
                     logger.info(f"Product {product['id']} ({product['name']}): Winner = {product['winner_name']}")
                 else:
@@ -124,7 +139,7 @@ def products_list(request):
         
         employee = request.session.get('employee')
         return render(request, 'products.html', {
-            'products': products, 
+            'cards': card_cache.render(products),
             'employee': employee,
             'status_counts': status_counts
         })
@@ -146,39 +161,116 @@ def product_detail(request, product_id):
         start_price = int(product.get('start_price', 0))
         bid_increment = math.ceil(start_price / 10) if start_price > 0 else 1
         
-        images = adapter.get_product_images(product_id)
+        images = adapter.get_image_variants(product_id)
         employee = request.session.get('employee')
         return render(request, 'product_detail.html', {
             'product': product, 
             'images': images, 
             'employee': employee,
-            'bid_increment': bid_increment
+            'bid_increment': bid_increment,
+            # Lets the page post bids to the fast route (auctions/bid_ingest.py) without a session read per bid
+            'bid_token': issue_bid_token(employee['employeeId'], request.session.session_key)
+                         if employee and request.session.session_key else '',
         })
     except Exception as e:
         logger.error(f"Error loading product {product_id}", exc_info=True)
         return render(request, 'error.html', {'error': '系統錯誤'})
 
 
+# Product fields sent by the poll endpoints: only what changes during an auction and
+# what the pages update in place. Name, description, images... come with the page.
+POLL_LIST_FIELDS = ('id', 'status', 'current_price', 'bids_count', 'end_time', 'highest_bidder_id', 'winner_name')
+POLL_PRODUCT_FIELDS = ('id', 'status', 'start_price', 'current_price', 'bids_count', 'start_time', 'end_time', 'highest_bidder_id')
+
+
+def _poll_etag(*parts):
+    # The field lists are part of the version: a payload with another schema is another version
+    return hashlib.md5(repr((POLL_LIST_FIELDS, POLL_PRODUCT_FIELDS) + parts).encode('utf-8')).hexdigest()
+
+
+def product_poll_etag(request, product_id):
+    """
+    Version token of one product's poll payload: the product row (with its
+    derived status) plus the product's bid count and latest bid id.
+    """
+    try:
+        product = adapter.get_product_by_id(product_id)
+        if not product:
+            return None
+        return _poll_etag(sorted(product.items()), adapter.get_bid_stats(product_id))
+    except Exception:
+        logger.warning(f"Could not compute poll ETag for product {product_id}", exc_info=True)
+        return None
+
+
+def products_poll_etag(request):
+    """
+    Version token of the product list payload: the storage data version plus
+    the next status change. Statuses also change with the clock, but only at
+    those instants, and the next one moves forward each time one passes.
+    """
+    try:
+        return _poll_etag(adapter.get_data_version(), adapter.get_next_status_change())
+    except Exception:
+        logger.warning("Could not compute products poll ETag", exc_info=True)
+        return None
+
+
+async def _conditional_poll(request, etag_func, build_response, *args):
+    """
+    Async counterpart of Django's condition decorator: answers an empty 304 when
+    the client's If-None-Match still matches, otherwise builds the payload.
+    Both run on the read pool, off the event loop.
+    """
+    etag = await run_read(etag_func, request, *args)
+    etag = quote_etag(etag) if etag else None
+    response = get_conditional_response(request, etag=etag) if etag else None
+    if response is None:
+        response = await run_read(build_response, request, *args)
+    if etag and request.method in ('GET', 'HEAD'):
+        response.headers.setdefault('ETag', etag)
+    return response
+
+
+# Clients revalidate every poll; an unchanged payload is answered with an empty 304.
+# The *_async views are the same endpoints for ASGI; auctions/urls.py routes by server type.
+@cache_control(no_cache=True, private=True)
+@condition(etag_func=product_poll_etag)
 def product_poll(request, product_id):
+    return _product_poll_response(request, product_id)
+
+
+@cache_control(no_cache=True, private=True)
+async def product_poll_async(request, product_id):
+    return await _conditional_poll(request, product_poll_etag, _product_poll_response, product_id)
+
+
+@cache_control(no_cache=True, private=True)
+@condition(etag_func=products_poll_etag)
+def products_poll(request):
+    """
+    API endpoint for real-time product list polling.
+    Returns all products with latest data, status counts, and winner information.
+
+    With `?since=<version>` (the `version` of a previous response) only the
+    products changed after that version are returned; `full` tells the client
+    whether the list is complete or a delta.
+    """
+    return _products_poll_response(request)
+
+
+@cache_control(no_cache=True, private=True)
+async def products_poll_async(request):
+    return await _conditional_poll(request, products_poll_etag, _products_poll_response)
+
+
+def _product_poll_response(request, product_id):
     try:
         product = adapter.get_product_by_id(product_id)
         if not product:
-            return JsonResponse({'success': False, 'message': 'PRODUCT_NOT_FOUND'}, status=404)
-        
-        # Convert datetime objects to strings for JSON serialization
-        # Ensure they are timezone-aware so isoformat() includes the offset
-        if isinstance(product.get('end_time'), datetime):
-            dt = product['end_time']
-            if timezone.is_naive(dt):
-                dt = timezone.make_aware(dt)
-            product['end_time'] = dt.isoformat()
-            
-        if isinstance(product.get('start_time'), datetime):
-            dt = product['start_time']
-            if timezone.is_naive(dt):
-                dt = timezone.make_aware(dt)
-            product['start_time'] = dt.isoformat()
+            return ApiJsonResponse({'success': False, 'message': 'PRODUCT_NOT_FOUND'}, status=404)
         
+        # start_time / end_time are aware datetimes: ApiJsonResponse writes them as ISO 8601 with the offset
         bids = adapter.get_bids_for_product(product_id, limit=10)
         
         # Add highest bidder information (只返回工號)
@@ -191,34 +283,40 @@ def product_poll(request, product_id):
             }
         
         # Add bidder names to bid history
+        bidders = adapter.get_employees_by_ids(bid.get('bidder_id') for bid in bids)
         for bid in bids:
-            bidder = adapter.get_employee_by_employeeId(bid.get('bidder_id'))
+            bidder = bidders.get(bid.get('bidder_id'))
             if bidder:
                 bid['bidder_name'] = bidder.get('name')
             else:
                 bid['bidder_name'] = bid.get('bidder_id')
         
-        return JsonResponse({
+        return ApiJsonResponse({
             'success': True, 
             'timestamp': datetime.now(TAIPEI_TZ).isoformat(),
-            'product': product, 
-            'bids': bids,
-            'highest_bidder': highest_bidder
+            'product': compact_row(product, POLL_PRODUCT_FIELDS), 
+            'bids': [compact_row(bid) for bid in bids],
+            'highest_bidder': compact_row(highest_bidder) if highest_bidder else None
         })
     except Exception as e:
         logger.error(f"Error polling product {product_id}", exc_info=True)
-        return JsonResponse({'success': False, 'message': 'INTERNAL_ERROR'}, status=500)
+        return ApiJsonResponse({'success': False, 'message': 'INTERNAL_ERROR'}, status=500)
 
 
-def products_poll(request):
-    """
-    API endpoint for real-time product list polling.
-    Returns all products with latest data, status counts, and winner information.
-    """
+def _products_poll_response(request):
     try:
         from datetime import datetime
-        
-        products = adapter.get_all_products()
+
+        try:
+            since = int(request.GET['since'])
+        except (KeyError, ValueError):
+            since = None
+        version, changed_ids, removed_ids = adapter.get_product_changes(since)
+
+        if changed_ids is not None:
+            products = [p for p in (adapter.get_product_by_id(pid) for pid in changed_ids) if p]
+        else:
+            products = adapter.get_all_products()
         
         # Separate products by status for sorting
         closed_products = [p for p in products if p.get('status') in ['Closed', 'Unsold', 'Ended']]
@@ -243,18 +341,23 @@ def products_poll(request):
         products = closed_products + other_products
         
         # Add highest bidder and winner information for all products
+        # (one pass over bids.csv for the whole catalog instead of one read per product)
+        top_bids = adapter.get_top_bids([p['id'] for p in products])
+        winners = adapter.get_employees_by_ids(
+            bid.get('bidder_id') for bid in top_bids.values()
+        )
         for product in products:
             # Get the highest bid for this product
-            bids = adapter.get_bids_for_product(product['id'], limit=1)
+            top_bid = top_bids.get(product['id'])
             
-            if bids:
-                bidder_id = bids[0].get('bidder_id')
+            if top_bid:
+                bidder_id = top_bid.get('bidder_id')
                 # For all products: store highest bidder ID (工號)
                 product['highest_bidder_id'] = bidder_id
                 
                 # For closed products: also get winner name
                 if product.get('status') in ['Closed', 'Unsold', 'Ended']:
-                    winner = adapter.get_employee_by_employeeId(bidder_id)
+                    winner = winners.get(bidder_id)
                     product['winner_name'] = winner.get('name') if winner else bidder_id
                 else:
                     product['winner_name'] = None
@@ -263,25 +366,21 @@ def products_poll(request):
                 product['highest_bidder_id'] = None
                 product['winner_name'] = None
         
-        # Ensure end_time format is consistent (ISO 8601 with timezone offset)
+        # Ensure end_time format is consistent (ISO 8601 with timezone offset). Parsed times are
+        # aware datetimes and ApiJsonResponse formats them; only unparsed strings need fixing here.
         for product in products:
             end_time = product.get('end_time')
-            if end_time:
-                if isinstance(end_time, datetime):
-                    dt = end_time
-                    if timezone.is_naive(dt):
-                        dt = timezone.make_aware(dt)
-                    product['end_time'] = dt.isoformat()
-                elif isinstance(end_time, str):
-                    # If it's a simple string without T or offset, it's likely naive local time
-                    if 'T' not in end_time and ' ' in end_time:
-                        end_time = end_time.replace(' ', 'T')
-                    product['end_time'] = end_time
-        
-        # Calculate status counts
+            if isinstance(end_time, str) and 'T' not in end_time and ' ' in end_time:
+                # A simple string without T or offset is likely naive local time
+                product['end_time'] = end_time.replace(' ', 'T')
+        
+        # Calculate status counts (over the whole catalog, also for a delta)
+        if changed_ids is not None:
+            statuses = adapter.get_product_statuses().values()
+        else:
+            statuses = [product.get('status') for product in products]
         status_counts = {'Open': 0, 'Closed': 0, 'Upcoming': 0}
-        for product in products:
-            status = product.get('status')
+        for status in statuses:
             if status == 'Open':
                 status_counts['Open'] += 1
             elif status == 'Upcoming':
@@ -289,17 +388,196 @@ def products_poll(request):
             else:  # Closed, Ended or Unsold
                 status_counts['Closed'] += 1
         
-        return JsonResponse({
+        return ApiJsonResponse({
             'success': True,
             'timestamp': datetime.now(TAIPEI_TZ).isoformat(),
-            'products': products,
+            'version': version,
+            'full': changed_ids is None,
+            'products': [compact_row(product, POLL_LIST_FIELDS) for product in products],
+            # Deleted products, for a delta; a full list simply leaves them out
+            'removed': removed_ids or [],
             'status_counts': status_counts
         })
     except Exception as e:
         logger.error("Error in products_poll", exc_info=True)
-        return JsonResponse({'success': False, 'message': 'INTERNAL_ERROR'}, status=500)
+        return ApiJsonResponse({'success': False, 'message': 'INTERNAL_ERROR'}, status=500)
+
+
+
+
+# Seconds between keep-alive comments on an idle stream
+SSE_KEEPALIVE_SECONDS = 15
+# Reconnect delay suggested to EventSource (ms)
+SSE_RETRY_MS = 2000
+# Re-read statuses at least this often, for end times edited outside the bid path
+SSE_STATUS_RECHECK_SECONDS = 30
 
 
+def _sse_message(event_type, data):
+    return f"event: {event_type}\ndata: {api_json.dumps(data).decode()}\n\n"
+
+
+def _current_statuses(product_id=None):
+    """(statuses the stream watches, epoch seconds of the next status change)"""
+    next_change = adapter.get_next_status_change()
+    if product_id is None:
+        return adapter.get_product_statuses(), next_change
+    product = adapter.get_product_by_id(product_id)
+    return ({product['id']: product.get('status')} if product else {}), next_change
+
+
+class _StreamState:
+    """
+    What one SSE stream has told its client so far. Bid events come from
+    BidService through the event bus; status changes are clock driven, so the
+    stream re-reads statuses when the adapter's next status change is due
+    (or after an event, which may have moved an end time).
+    """
+
+    def __init__(self, subscription, product_id, current):
+        self.subscription = subscription
+        self.product_id = product_id
+        self.statuses, self.next_change = current
+        self.checked_at = time.monotonic()
+        self.deadline = time.monotonic() + settings.AUCTION_SSE_MAX_SECONDS
+        self.last_write = time.monotonic()
+
+    def alive(self):
+        return time.monotonic() < self.deadline
+
+    def statuses_due(self, event):
+        if event or time.monotonic() - self.checked_at >= SSE_STATUS_RECHECK_SECONDS:
+            return True
+        return self.next_change is not None and time.time() >= self.next_change
+
+    def messages(self, event, current=None):
+        """SSE messages for one loop turn; `event` and `current` (see _current_statuses) may be None."""
+        out = []
+        if event:
+            event_type, event_product_id, data = event
+            out.append(_sse_message(event_type, dict(data, product_id=event_product_id)))
+        if current is not None:
+            latest, self.next_change = current
+            for pid, status in latest.items():
+                if self.statuses.get(pid) != status:
+                    out.append(_sse_message(events.STATUS_CHANGED, {'product_id': pid, 'status': status}))
+            self.statuses = latest
+            self.checked_at = time.monotonic()
+
+        now = time.monotonic()
+        if not out and now - self.last_write >= SSE_KEEPALIVE_SECONDS:
+            out.append(": keep-alive\n\n")
+        if out:
+            self.last_write = now
+        return out
+
+
+def _event_stream(subscription, product_id=None):
+    """Yields SSE messages for `subscription` until the stream's lifetime ends (WSGI)."""
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        state = _StreamState(subscription, product_id, _current_statuses(product_id))
+        while state.alive():
+            event = subscription.get(timeout=1)
+            if subscription.overflowed:
+                # Missed events: close so the client resyncs with a poll and reconnects
+                yield _sse_message('resync', {})
+                return
+            current = _current_statuses(product_id) if state.statuses_due(event) else None
+            yield from state.messages(event, current)
+    except Exception:
+        logger.error("Error in event stream", exc_info=True)
+    finally:
+        subscription.close()
+
+
+async def _event_stream_async(subscription, product_id=None):
+    """Same as _event_stream, but waits on the event loop instead of holding a thread (ASGI)."""
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        state = _StreamState(subscription, product_id, await run_read(_current_statuses, product_id))
+        while state.alive():
+            event = await subscription.get_async(timeout=1)
+            if subscription.overflowed:
+                yield _sse_message('resync', {})
+                return
+            current = await run_read(_current_statuses, product_id) if state.statuses_due(event) else None
+            for message in state.messages(event, current):
+                yield message
+    except Exception:
+        logger.error("Error in event stream", exc_info=True)
+    finally:
+        subscription.close()
+
+
+class _EventStream:
+    """
+    Streaming body that releases its subscription when the response is closed,
+    even if the server never started iterating it.
+    """
+
+    def __init__(self, subscription, product_id=None):
+        self._subscription = subscription
+        self._messages = _event_stream(subscription, product_id)
+
+    def __iter__(self):
+        return self._messages
+
+    def close(self):
+        self._messages.close()
+        self._subscription.close()
+
+
+class _AsyncEventStream:
+    """_EventStream for ASGI servers, which iterate streaming bodies asynchronously."""
+
+    def __init__(self, subscription, product_id=None):
+        self._subscription = subscription
+        self._messages = _event_stream_async(subscription, product_id)
+
+    def __aiter__(self):
+        return self._messages
+
+    def close(self):
+        self._subscription.close()
+
+
+def _stream_response(request, product_id=None):
+    # Under WSGI a stream holds a server thread until it ends, so far fewer are allowed (by default none)
+    asgi = isinstance(request, ASGIRequest)
+    limit = settings.AUCTION_SSE_MAX_STREAMS if asgi else settings.AUCTION_SSE_WSGI_MAX_STREAMS
+    subscription = events.bus.subscribe(product_id, limit=limit)
+    if subscription is None:
+        # Every stream slot is taken; the client keeps polling
+        return JsonResponse({'success': False, 'message': 'TOO_MANY_STREAMS'}, status=503)
+    # A WSGI server can only consume a sync body, an ASGI server should get an async one
+    body_cls = _AsyncEventStream if asgi else _EventStream
+    response = StreamingHttpResponse(body_cls(subscription, product_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def product_stream(request, product_id):
+    """Server-Sent Events for one product: bid-placed, price-changed, anti-sniper-extended, status-changed."""
+    if not adapter.get_product_by_id(product_id):
+        return JsonResponse({'success': False, 'message': 'PRODUCT_NOT_FOUND'}, status=404)
+    return _stream_response(request, product_id)
+
+
+async def product_stream_async(request, product_id):
+    if not await run_read(adapter.get_product_by_id, product_id):
+        return JsonResponse({'success': False, 'message': 'PRODUCT_NOT_FOUND'}, status=404)
+    return _stream_response(request, product_id)
+
+
+def products_stream(request):
+    """Server-Sent Events for every product (products list page)."""
+    return _stream_response(request)
+
+
+async def products_stream_async(request):
+    return _stream_response(request)
 
 
 def login_view(request):
@@ -315,7 +593,10 @@ def login_view(request):
             
             # Pass full_email and password to auth_service
             emp = auth_service.login(full_email, password)
-            # Session management remains in View
+            # Session management remains in View. A new session key per login, so bid
+            # tokens issued to whoever used this browser before stop working
+            revoke_bid_tokens(request.session.session_key)
+            request.session.cycle_key()
             request.session['employee'] = {
                 'id': emp.get('id'),
                 'employeeId': emp.get('employeeId'), 
@@ -348,6 +629,9 @@ def user_bids_list(request):
 def logout_view(request):
     request.session.pop('employee', None)
     request.session.pop('is_admin', None)
+    # Fast-route bid tokens are bound to the session: revoke them and retire its key
+    revoke_bid_tokens(request.session.session_key)
+    request.session.cycle_key()
     return redirect('auctions:login')
 
 
@@ -384,57 +668,77 @@ def check_first_bid(request):
         return JsonResponse({'success': False, 'message': 'INTERNAL_ERROR'}, status=500)
 
 
-@csrf_exempt
-def place_bid(request):
-    if request.method != 'POST':
-        return HttpResponseBadRequest('POST required')
-        
+def _parse_bid(request, session_emp):
+    """(product_id, amount, bidder employee id) of a bid request; BusinessException when unusable."""
+    data = json.loads(request.body)
+    product_id = data.get('productId')
+    amount = data.get('amount')
+
+    # Validation of input types
+    if not product_id or not amount:
+         raise BusinessException("Missing productId or amount", code='INVALID_PAYLOAD')
+
     try:
-        data = json.loads(request.body)
-        product_id = data.get('productId')
-        amount = data.get('amount')
-        
-        # Validation of input types
-        if not product_id or not amount:
-             raise BusinessException("Missing productId or amount", code='INVALID_PAYLOAD')
-             
-        try:
-            product_id = int(product_id)
-            amount = int(amount)
-        except ValueError:
-             raise BusinessException("Invalid number format", code='INVALID_PAYLOAD')
-
-        # Authentication check
-        session_emp = request.session.get('employee')
-        bidder_employee_id = session_emp.get('employeeId') if session_emp else data.get('employeeId')
-        
-        if not bidder_employee_id:
-            raise BusinessException("User not logged in", code='UNAUTHORIZED')
+        product_id = int(product_id)
+        amount = int(amount)
+    except ValueError:
+         raise BusinessException("Invalid number format", code='INVALID_PAYLOAD')
 
-        # Call Service
-        result = bid_service.place_bid(product_id, bidder_employee_id, amount)
-        return JsonResponse(result)
+    # Authentication check
+    bidder_employee_id = session_emp.get('employeeId') if session_emp else data.get('employeeId')
+
+    if not bidder_employee_id:
+        raise BusinessException("User not logged in", code='UNAUTHORIZED')
+    return product_id, amount, bidder_employee_id
 
-    except BusinessException as e:
+
+def _bid_error_response(e):
+    if isinstance(e, BusinessException):
         logger.info(f"Bid business error: {e.message}")
         return JsonResponse({
             'success': False, 
             'message': e.message, 
             'errorCode': e.code
         }, status=400)
-        
-    except SystemException as e:
+
+    if isinstance(e, SystemException):
         logger.error(f"Bid system error: {e.message}")
         return JsonResponse({
             'success': False, 
             'message': '系統繁忙，請稍後重試', 
             'errorCode': 'INTERNAL_ERROR'
         }, status=500)
-        
+
+    logger.error("Unexpected error in place_bid", exc_info=e)
+    return JsonResponse({
+        'success': False, 
+        'message': '未知錯誤', 
+        'errorCode': 'UNKNOWN_ERROR'
+    }, status=500)
+
+
+@csrf_exempt
+def place_bid(request):
+    if request.method != 'POST':
+        return HttpResponseBadRequest('POST required')
+
+    try:
+        product_id, amount, bidder_employee_id = _parse_bid(request, request.session.get('employee'))
+        result = bid_service.place_bid(product_id, bidder_employee_id, amount)
+        return JsonResponse(result)
     except Exception as e:
-        logger.error("Unexpected error in place_bid", exc_info=True)
-        return JsonResponse({
-            'success': False, 
-            'message': '未知錯誤', 
-            'errorCode': 'UNKNOWN_ERROR'
-        }, status=500)
+        return _bid_error_response(e)
+
+
+@csrf_exempt
+async def place_bid_async(request):
+    """place_bid for ASGI: the bid runs on the write pool, so bids never queue behind polls."""
+    if request.method != 'POST':
+        return HttpResponseBadRequest('POST required')
+
+    try:
+        product_id, amount, bidder_employee_id = _parse_bid(request, await request.session.aget('employee'))
+        result = await run_write(bid_service.place_bid, product_id, bidder_employee_id, amount)
+        return JsonResponse(result)
+    except Exception as e:
+        return _bid_error_response(e)
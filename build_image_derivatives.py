@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+產生商品圖片縮圖 (thumb / medium，及 WebP)
+
+    python build_image_derivatives.py           # 只補上缺少的縮圖
+    python build_image_derivatives.py --force   # 全部重新產生
+
+後台上傳的圖片會自動在背景產生縮圖；此工具用於手動複製到 data_photo 的既有圖片。
+"""
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from auctions.image_manifest import get_image_manifest
+from auctions.image_derivatives import DERIVATIVE_SIZES, get_derivative_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build resized copies of product photos')
+    parser.add_argument('--photo-dir', default=str(settings.MEDIA_ROOT), help='圖片資料夾 (預設: data_photo)')
+    parser.add_argument('--force', action='store_true', help='已存在的縮圖也重新產生')
+    args = parser.parse_args()
+
+    pipeline = get_derivative_pipeline(args.photo_dir)
+    if not pipeline.enabled:
+        print("✗ 未安裝 Pillow，請先執行 pip install Pillow")
+        sys.exit(1)
+
+    built = failed = 0
+    derived_table = pipeline.table()
+    for product_id, names in sorted(get_image_manifest(args.photo_dir).table().items()):
+        for name in names:
+            if not args.force and all(
+                pipeline.url(product_id, name, size, table=derived_table) for size in DERIVATIVE_SIZES
+            ):
+                continue
+            try:
+                pipeline.build(product_id, name)
+                built += 1
+            except Exception as e:
+                print(f"  ✗ {product_id}/{name}: {e}")
+                failed += 1
+
+    print(f"✓ 已產生 {built} 張圖片的縮圖" + (f"，{failed} 張失敗" if failed else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+預先壓縮靜態檔 (static/ 下的 js / css / svg ...)
+
+    python build_static_assets.py
+
+每個檔案旁會產生 .gz (以及安裝 brotli 時的 .br)，伺服器會直接送出壓縮版本，
+不必每次請求都重新壓縮。修改靜態檔後請重新執行；過期的壓縮檔會被自動忽略。
+"""
+import os
+import sys
+import gzip
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from auctions.static_files import COMPRESSIBLE_EXTENSIONS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Keep a compressed copy only if it saves at least this share of the bytes
+MIN_SAVING = 0.05
+
+
+def _write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write precompressed copies of static files')
+    parser.add_argument('--static-dir', default=str(settings.STATICFILES_DIRS[0]), help='靜態檔資料夾 (預設: static)')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("! 未安裝 brotli，只產生 .gz (pip install brotli 可另外產生 .br)")
+
+    written = 0
+    for folder, _, files in os.walk(args.static_dir):
+        for name in files:
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data)))
+            for suffix, compressed in variants:
+                if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                    _write(path + suffix, compressed)
+                    written += 1
+                elif os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    print(f"✓ 已產生 {written} 個壓縮檔於 {args.static_dir}")
+
+
+if __name__ == '__main__':
+    main()
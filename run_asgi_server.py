@@ -0,0 +1,49 @@
+import os
+import socket
+import uvicorn
+
+# ASGI alternative to run_server.py: polls, streams and bids are async views, so
+# thousands of idle poll/stream connections no longer hold a server thread each.
+# Keep a single worker: bid locks, caches and the live-update bus are per process.
+
+
+def _can_bind(host, port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind((host, port))
+            return True
+        except OSError:
+            return False
+
+
+def run():
+    host = '0.0.0.0'
+    port = 80
+
+    print("----------------------------------------------------------------")
+    print("Attempting to start ASGI (uvicorn) server on Port 80...")
+    print("----------------------------------------------------------------")
+
+    if not _can_bind(host, port):
+        print("\n[WARNING] Could not bind to port 80 (Access Denied or in use).")
+        print("To use Port 80, you must run this script as Administrator.")
+        print("\nFalling back to Port 8080...")
+        port = 8080
+
+    print(f"Serving on http://{host}:{port}")
+    print(f"Access via: http://test-auction.kingsteel.com:{port}/")
+    print("----------------------------------------------------------------")
+    uvicorn.run('auction_site.asgi:application', host=host, port=port, workers=1, log_level='info')
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+    try:
+        run()
+    except KeyboardInterrupt:
+        print("\nServer stopped by user.")
+    except Exception as e:
+        print(f"\nUnexpected error: {e}")
+
+    # Keep window open
+    input("\nPress Enter to exit...")
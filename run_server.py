@@ -1,8 +1,12 @@
 import os
 import sys
 from waitress import serve
+from django.conf import settings
 from auction_site.wsgi import application
 
+# Live-update streams (SSE) each hold a thread; see AUCTION_SSE_WSGI_MAX_STREAMS
+THREADS = settings.WAITRESS_THREADS
+
 def run():
     port = 80
     host = '0.0.0.0'
@@ -17,7 +21,7 @@ def run():
         print("  http://localhost")
         print("  http://test-auction.kingsteel.com/")
         print("----------------------------------------------------------------")
-        serve(application, host=host, port=port)
+        serve(application, host=host, port=port, threads=THREADS)
     except OSError as e:
         if hasattr(e, 'winerror') and e.winerror == 10013: # Access denied
             print("\n[WARNING] Could not bind to port 80 (Access Denied).")
@@ -27,7 +31,7 @@ def run():
             print(f"Serving on http://{host}:{port}")
             print(f"Access via: http://test-auction.kingsteel.com:{port}/")
             try:
-                serve(application, host=host, port=port)
+                serve(application, host=host, port=port, threads=THREADS)
             except Exception as e2:
                 print(f"[ERROR] Failed to start on port 8080: {e2}")
         else:
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CSV <-> SQLite 資料同步工具
+
+    python sqlite_sync.py import   # data/*.csv -> SQLite (AUCTION_SQLITE_PATH)
+    python sqlite_sync.py export   # SQLite -> data/*.csv，供 Excel 編輯後再 import
+
+切換到 SQLite 儲存：先 import，再於 .env 設定 AUCTION_STORAGE_BACKEND=sqlite
+"""
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from auctions.sqlite_adapter import SqliteAdapter
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync auction data between CSV files and SQLite')
+    parser.add_argument('direction', choices=['import', 'export'])
+    parser.add_argument('--csv-dir', default=str(settings.DATA_DIR), help='CSV 資料夾 (預設: DATA_DIR)')
+    parser.add_argument('--db', default=settings.AUCTION_SQLITE_PATH, help='SQLite 檔案路徑')
+    args = parser.parse_args()
+
+    adapter = SqliteAdapter(settings.DATA_DIR, args.db)
+    if args.direction == 'import':
+        counts = adapter.import_csv(args.csv_dir)
+        print(f"✓ 已匯入 {args.csv_dir} -> {args.db}")
+    else:
+        counts = adapter.export_csv(args.csv_dir)
+        print(f"✓ 已匯出 {args.db} -> {args.csv_dir}")
+
+    for table, count in counts.items():
+        print(f"  - {table}: {count} 筆")
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,93 @@ const ServerTime = {
     }
 };
 
+// --- Conditional polling ---
+// Sends the ETag of the last applied payload; the server answers 304 with an
+// empty body while nothing changed. 'no-store' keeps the browser cache from
+// turning that 304 back into a 200 with the old body.
+function conditionalFetch(url, etag) {
+    const headers = etag ? { 'If-None-Match': etag } : {};
+    return fetch(url, { headers, cache: 'no-store' });
+}
+
+// --- Live updates (Server-Sent Events) ---
+// While a stream is open, pushed events are applied to the page as they are
+// (price, highest bidder, bid count, end time, status): a bid costs viewers no
+// request at all. The pollers poll when the stream (re)connects or asks for a
+// resync, and otherwise only as a slow safety net for changes the stream can't
+// see (admin edits, bids handled by another server process). If the stream is
+// unavailable or refused, the pollers keep polling every second.
+const STREAM_SAFETY_POLL_INTERVAL = 15000;
+const LIVE_EVENT_TYPES = ['bid-placed', 'price-changed', 'anti-sniper-extended', 'status-changed', 'resync'];
+
+class LiveStream {
+    constructor(path, handlers) {
+        this.path = path;
+        this.handlers = handlers;
+        this.source = null;
+    }
+
+    open() {
+        if (!window.EventSource || this.source) return;
+        const langPrefix = window.location.pathname.split('/')[1] || 'zh-hant';
+        this.source = new EventSource(`/${langPrefix}${this.path}`);
+
+        this.source.onopen = () => this.handlers.onOpen();
+        this.source.onerror = () => {
+            // EventSource reconnects by itself unless the server refused the stream (e.g. 503)
+            if (this.source && this.source.readyState === EventSource.CLOSED) {
+                this.source = null;
+            }
+            this.handlers.onLost();
+        };
+        LIVE_EVENT_TYPES.forEach(type => {
+            this.source.addEventListener(type, event => {
+                this.handlers.onEvent(type, event.data ? JSON.parse(event.data) : {});
+            });
+        });
+    }
+
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+
+    isOpen() {
+        return !!this.source && this.source.readyState === EventSource.OPEN;
+    }
+}
+
+// Stream wired to a poller: events go to poller.applyEvent(); a (re)connect or
+// a resync polls once to catch up on whatever the stream did not deliver
+function createPollerStream(poller, path) {
+    return new LiveStream(path, {
+        onOpen: () => {
+            poller.pollInterval = STREAM_SAFETY_POLL_INTERVAL;
+            poller.poll();
+        },
+        onLost: () => {
+            poller.pollInterval = 1000;
+            if (!poller.inFlight) schedulePoll(poller);
+        },
+        onEvent: (type, data) => {
+            if (type === 'resync' || !poller.applyEvent(type, data)) {
+                poller.poll();
+            }
+        },
+    });
+}
+
+// Schedule a poller's next poll (right away if an event arrived during the last one)
+function schedulePoll(poller) {
+    if (!poller.isPolling) return;
+    const delay = poller.pollQueued ? 0 : poller.pollInterval;
+    poller.pollQueued = false;
+    clearTimeout(poller.timeoutId);
+    poller.timeoutId = setTimeout(() => poller.poll(), delay);
+}
+
 // Translation strings (will be injected by Django template)
 let i18nStrings = {};
 
@@ -35,17 +122,24 @@ class ProductListPoller {
         this.failCount = 0;
         this.maxRetries = 3;
         this.timeoutId = null;
+        this.etag = null; // ETag of the last payload applied to the page
+        this.version = null; // Catalog version of the last payload (for delta polls)
+        this.inFlight = false;
+        this.pollQueued = false;
+        this.stream = createPollerStream(this, '/api/stream/products/');
     }
 
     start() {
         console.log('🟢 Starting product list polling...');
         this.isPolling = true;
+        this.stream.open();
         this.poll();
     }
 
     stop() {
         console.log('🔴 Stopping product list polling...');
         this.isPolling = false;
+        this.stream.close();
         if (this.timeoutId) {
             clearTimeout(this.timeoutId);
         }
@@ -53,32 +147,52 @@ class ProductListPoller {
 
     async poll() {
         if (!this.isPolling) return;
+        if (this.inFlight) {
+            // A pushed event arrived mid-request; poll again once it is done
+            this.pollQueued = true;
+            return;
+        }
+        this.inFlight = true;
+        clearTimeout(this.timeoutId);
 
         try {
-            const response = await fetch('/api/products/poll/');
+            // After the first full list, only ask for products changed since our version
+            const url = this.version === null ? '/api/products/poll/' : `/api/products/poll/?since=${this.version}`;
+            const response = await conditionalFetch(url, this.etag);
 
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}`);
-            }
+            if (response.status === 304) {
+                // Nothing changed since the last poll
+                this.failCount = 0;
+            } else {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
 
-            const data = await response.json();
+                const data = await response.json();
 
-            if (data.success) {
-                // Sync time
-                ServerTime.sync(data.timestamp);
+                if (data.success) {
+                    this.etag = response.headers.get('ETag');
+                    this.version = data.version;
 
-                this.updateProducts(data.products);
-                this.updateStatusCounts(data.status_counts);
-                this.failCount = 0; // Reset on success
+                    // Sync time
+                    ServerTime.sync(data.timestamp);
+
+                    this.updateProducts(data.products);
+                    this.removeProducts(data.removed || []);
+                    this.updateStatusCounts(data.status_counts);
+                    this.failCount = 0; // Reset on success
+                }
             }
 
         } catch (error) {
             console.warn('⚠️ Polling error:', error);
             this.handleError(error);
+        } finally {
+            this.inFlight = false;
         }
 
         // Schedule next poll
-        this.timeoutId = setTimeout(() => this.poll(), this.pollInterval);
+        schedulePoll(this);
     }
 
     updateProducts(products) {
@@ -156,6 +270,55 @@ class ProductListPoller {
         }
     }
 
+    // Apply one pushed event to its card. Returns false when the page needs a poll
+    // instead (unknown card, or a closed auction whose winner name isn't in the event).
+    applyEvent(type, data) {
+        const card = document.querySelector(`[data-product-id="${data.product_id}"]`);
+        if (!card) return type === 'bid-placed';
+
+        if (type === 'price-changed') {
+            if (data.current_price !== parseInt(card.dataset.price)) {
+                this.updatePrice(card, data.current_price);
+                card.dataset.price = data.current_price;
+            }
+            if (data.bids_count != null && data.bids_count !== parseInt(card.dataset.bidsCount)) {
+                this.updateBidsCount(card, data.bids_count);
+                card.dataset.bidsCount = data.bids_count;
+            }
+            if (card.dataset.status === 'Open') {
+                this.updateHighestBidder(card, data.highest_bidder_id);
+            }
+        } else if (type === 'anti-sniper-extended') {
+            if (data.end_time && data.end_time !== card.dataset.end) {
+                this.updateEndTime(card, data.end_time);
+            }
+        } else if (type === 'status-changed') {
+            const oldStatus = card.dataset.status;
+            if (data.status === oldStatus) return true;
+            if (['Closed', 'Ended'].includes(data.status) && parseInt(card.dataset.bidsCount) > 0) {
+                return false;  // The poll brings the winner name along with the status
+            }
+            this.updateStatus(card, data.status, { id: data.product_id, winner_name: card.dataset.winner });
+            this.shiftStatusCount(oldStatus, data.status);
+        }
+        return true;
+    }
+
+    // Cards of products deleted since our version
+    removeProducts(ids) {
+        let removed = false;
+        ids.forEach(id => {
+            const card = document.querySelector(`[data-product-id="${id}"]`);
+            if (card) {
+                card.remove();
+                removed = true;
+            }
+        });
+        if (removed && typeof window.refreshFilters === 'function') {
+            window.refreshFilters();
+        }
+    }
+
     updatePrice(card, newPrice) {
         const priceElement = card.querySelector('.price-display');
         if (!priceElement) return;
@@ -330,6 +493,16 @@ class ProductListPoller {
     }
 
 
+    shiftStatusCount(from, to) {
+        [[from, -1], [to, 1]].forEach(([status, delta]) => {
+            const countElement = document.getElementById(`count-${status}`);
+            const count = countElement ? parseInt(countElement.textContent.replace(/[^\d]/g, '')) : NaN;
+            if (!isNaN(count)) {
+                countElement.textContent = `(${count + delta})`;
+            }
+        });
+    }
+
     updateStatusCounts(counts) {
         Object.keys(counts).forEach(status => {
             const countElement = document.getElementById(`count-${status}`);
@@ -348,7 +521,7 @@ class ProductListPoller {
 
             // Reset after 10 seconds
             setTimeout(() => {
-                this.pollInterval = 1000;
+                this.pollInterval = this.stream.isOpen() ? STREAM_SAFETY_POLL_INTERVAL : 1000;
                 this.failCount = 0;
             }, 10000);
         }
@@ -366,18 +539,24 @@ class ProductDetailPoller {
         this.failCount = 0;
         this.maxRetries = 3;
         this.timeoutId = null;
+        this.etag = null;
+        this.inFlight = false;
+        this.pollQueued = false;
+        this.stream = createPollerStream(this, `/api/stream/products/${productId}/`);
         this.lastBidIds = new Set();
     }
 
     start() {
         console.log(`🟢 Starting product ${this.productId} detail polling...`);
         this.isPolling = true;
+        this.stream.open();
         this.poll();
     }
 
     stop() {
         console.log(`🔴 Stopping product ${this.productId} detail polling...`);
         this.isPolling = false;
+        this.stream.close();
         if (this.timeoutId) {
             clearTimeout(this.timeoutId);
         }
@@ -385,32 +564,64 @@ class ProductDetailPoller {
 
     async poll() {
         if (!this.isPolling) return;
+        if (this.inFlight) {
+            this.pollQueued = true;
+            return;
+        }
+        this.inFlight = true;
+        clearTimeout(this.timeoutId);
 
         try {
-            const response = await fetch(`/api/products/${this.productId}/poll/`);
+            const response = await conditionalFetch(`/api/products/${this.productId}/poll/`, this.etag);
 
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}`);
-            }
+            if (response.status === 304) {
+                this.failCount = 0;
+            } else {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
 
-            const data = await response.json();
+                const data = await response.json();
 
-            if (data.success) {
-                // Sync time
-                ServerTime.sync(data.timestamp);
+                if (data.success) {
+                    this.etag = response.headers.get('ETag');
 
-                this.updateProduct(data.product);
-                this.updateHighestBidder(data.highest_bidder);
-                this.updateBidHistory(data.bids);
-                this.failCount = 0;
+                    // Sync time
+                    ServerTime.sync(data.timestamp);
+
+                    this.updateProduct(data.product);
+                    this.updateHighestBidder(data.highest_bidder);
+                    this.updateBidHistory(data.bids);
+                    this.failCount = 0;
+                }
             }
 
         } catch (error) {
             console.warn('⚠️ Detail polling error:', error);
             this.handleError(error);
+        } finally {
+            this.inFlight = false;
         }
 
-        this.timeoutId = setTimeout(() => this.poll(), this.pollInterval);
+        schedulePoll(this);
+    }
+
+    // Apply one pushed event to the page. Returns false when the page needs a poll instead.
+    applyEvent(type, data) {
+        if (type === 'price-changed') {
+            this.updateProduct(data);
+            this.updateHighestBidder({ id: data.highest_bidder_id });
+        } else if (type === 'bid-placed') {
+            const historyContainer = document.querySelector('[data-bid-history]');
+            if (historyContainer && !this.lastBidIds.has(data.id)) {
+                this.addBidWithAnimation(historyContainer, data);
+                this.lastBidIds.add(data.id);
+            }
+        } else if (type !== 'anti-sniper-extended') {
+            // Status changes re-render more than this poller handles
+            return false;
+        }
+        return true;
     }
 
     updateProduct(product) {
@@ -430,6 +641,7 @@ class ProductDetailPoller {
         // Update bids count
         const bidsCountElements = document.querySelectorAll('[data-bids-count-display]');
         bidsCountElements.forEach(el => {
+            if (product.bids_count == null) return;
             const bidsText = el.textContent.match(/\d+(.+)/)?.[1] || '次出價';
             el.textContent = `${product.bids_count || 0}${bidsText}`;
         });
@@ -517,7 +729,7 @@ class ProductDetailPoller {
             this.pollInterval = 5000;
 
             setTimeout(() => {
-                this.pollInterval = 1000;
+                this.pollInterval = this.stream.isOpen() ? STREAM_SAFETY_POLL_INTERVAL : 1000;
                 this.failCount = 0;
             }, 10000);
         }
@@ -543,6 +755,8 @@ function setupVisibilityHandling(poller) {
 // Export for use in templates
 // ============================================
 window.ServerTime = ServerTime;
+window.conditionalFetch = conditionalFetch;
+window.LiveStream = LiveStream;
 window.ProductListPoller = ProductListPoller;
 window.ProductDetailPoller = ProductDetailPoller;
 window.setupVisibilityHandling = setupVisibilityHandling;
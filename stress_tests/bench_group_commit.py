@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: bids per second under contention for several group commit windows.
+
+    python stress_tests/bench_group_commit.py [--players 30] [--rounds 20]
+
+Every round, all players bid at once on a few hot products (the closing-second
+burst of network_stress.py, without the network). Runs BidService against a
+throwaway copy of a small catalog for each AUCTION_BID_GROUP_COMMIT_MS window.
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Add project root to path to import auctions module
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+
+import django
+django.setup()
+
+import pandas as pd
+from auctions.excel_adapter import ExcelAdapter
+from auctions.services import BidService, TAIPEI_TZ
+from common.exceptions import BusinessException
+
+HOT_PRODUCTS = 3
+
+
+def make_catalog(d):
+    now = datetime.now(TAIPEI_TZ)
+    pd.DataFrame([{
+        'id': pid, 'name': f'Hot {pid}', 'start_price': 100, 'current_price': 100, 'status': 'Open',
+        'start_time': (now - timedelta(hours=1)).isoformat(), 'end_time': (now + timedelta(hours=1)).isoformat(),
+        'last_bid_time': '', 'bids_count': 0, 'highest_bidder_id': '',
+    } for pid in range(1, 101)]).to_csv(os.path.join(d, 'products.csv'), index=False)
+    pd.DataFrame(columns=['id', 'product_id', 'bidder_id', 'amount', 'bid_timestamp']).to_csv(
+        os.path.join(d, 'bids.csv'), index=False)
+
+
+def run(window_ms, players, rounds):
+    with tempfile.TemporaryDirectory() as d:
+        make_catalog(d)
+        adapter = ExcelAdapter(d)
+        adapter.enable_group_commit(window_ms)
+        service = BidService(adapter)
+        counts = {'accepted': 0, 'rejected': 0, 'errors': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(players)
+
+        def player(i):
+            for r in range(rounds):
+                barrier.wait()
+                # Unique amounts: every bid is valid on its own, the race decides
+                amount = 1000 + r * players + i
+                try:
+                    service.place_bid(1 + (i % HOT_PRODUCTS), f'P{i:03d}', amount)
+                    key = 'accepted'
+                except BusinessException:
+                    key = 'rejected'
+                except Exception:
+                    key = 'errors'
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=player, args=(i,)) for i in range(players)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        return counts, players * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Group commit throughput')
+    parser.add_argument('--players', type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--windows', default='0,2,5', help='comma separated AUCTION_BID_GROUP_COMMIT_MS values')
+    args = parser.parse_args()
+
+    print(f"{args.players} players x {args.rounds} rounds on {HOT_PRODUCTS} products")
+    for window in (float(w) for w in args.windows.split(',')):
+        counts, rate = run(window, args.players, args.rounds)
+        print(f"  window {window:4.1f} ms: {rate:8.1f} bids/s  "
+              f"accepted={counts['accepted']} rejected={counts['rejected']} errors={counts['errors']}")
+
+
+if __name__ == '__main__':
+    main()
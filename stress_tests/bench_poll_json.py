@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: serialization time of one products poll payload.
+
+    python stress_tests/bench_poll_json.py
+
+Compares the old path (end_time.isoformat() per product + JsonResponse) with
+ApiJsonResponse on the stdlib encoder and, when installed, on orjson.
+"""
+import sys
+import os
+import time
+import json
+from datetime import datetime, timedelta
+
+# Add project root to path to import auctions module
+sys.path.append(os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+
+import django
+django.setup()
+
+import pytz
+from django.http import JsonResponse
+from auctions import api_json
+from auctions.api_json import ApiJsonResponse, compact_row
+from auctions.views import POLL_LIST_FIELDS
+
+TAIPEI_TZ = pytz.timezone('Asia/Taipei')
+REPEAT = 200
+
+
+def make_products(count):
+    start = TAIPEI_TZ.localize(datetime(2026, 3, 1, 9, 0))
+    return [{
+        'id': i, 'name': f'商品 {i}', 'description': '拍賣說明 ' * 40, 'brand': 'Brand',
+        'start_price': 500, 'current_price': 24010, 'bids_count': i % 17, 'status': 'Open',
+        'start_time': start, 'end_time': start + timedelta(minutes=i % 60),
+        'highest_bidder_id': f'{1000 + i}', 'winner_name': None, 'main_image': f'/data_photo/{i}/1.jpg',
+    } for i in range(1, count + 1)]
+
+
+def payload(products):
+    return {
+        'success': True, 'timestamp': datetime.now(TAIPEI_TZ).isoformat(), 'version': 1, 'full': True,
+        'products': products, 'status_counts': {'Open': len(products), 'Closed': 0, 'Upcoming': 0},
+    }
+
+
+def old_path(products):
+    products = [dict(p) for p in products]
+    for p in products:
+        p['end_time'] = p['end_time'].isoformat()
+    return JsonResponse(payload(products)).content
+
+
+def new_path(products):
+    return ApiJsonResponse(payload([compact_row(p, POLL_LIST_FIELDS) for p in products])).content
+
+
+def stdlib_path(products):
+    # The fallback encoder ApiJsonResponse uses when orjson is not installed
+    encoder = json.JSONEncoder(default=api_json._default, ensure_ascii=False, separators=(',', ':'))
+    return encoder.encode(payload([compact_row(p, POLL_LIST_FIELDS) for p in products])).encode('utf-8')
+
+
+def measure(func, products):
+    func(products)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        body = func(products)
+    return (time.perf_counter() - start) / REPEAT * 1000, len(body)
+
+
+def main():
+    paths = [('JsonResponse (before)', old_path), ('slim schema, stdlib', stdlib_path)]
+    if api_json.orjson is not None:
+        paths.append(('slim schema, orjson', new_path))
+    else:
+        print("orjson not installed: ApiJsonResponse uses the stdlib encoder")
+
+    for count in (100, 1000):
+        products = make_products(count)
+        print(f"\n{count} products ({REPEAT} polls each)")
+        for label, func in paths:
+            ms, size = measure(func, products)
+            print(f"  {label:<24} {ms:8.3f} ms/poll  {size / 1024:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
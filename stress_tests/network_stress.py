@@ -1,28 +1,64 @@
 import requests
 import concurrent.futures
+import argparse
+import os
+import sys
 import time
-import json
 
 # Target Configuration
 BASE_URL = "http://10.10.10.205"  # From user
 PRODUCT_ID = 34
 PLAYERS = 30
 
-def bid_task(user_index):
+# classic: /<lang>/api/bids/ through Django's middleware stack
+# fast:    /api/fast/bids/ with a signed bidder token (auctions/bid_ingest.py)
+ROUTES = {
+    'classic': '/zh-hant/api/bids/',
+    'fast': '/api/fast/bids/',
+}
+
+
+def bid_tokens(players):
+    """
+    Sign bidder tokens like the product page does, each bound to a new login
+    session. Needs the server's DJANGO_SECRET_KEY (.env) and session store
+    (db.sqlite3), so run this from the deployed project folder.
+    """
+    sys.path.append(os.getcwd())
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auction_site.settings')
+    import django
+    django.setup()
+    from importlib import import_module
+    from django.conf import settings
+    from auctions.bid_ingest import issue_bid_token
+    SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+    tokens = {}
+    for i in range(players):
+        employee_id = f"NET_STRESS_{i:03d}"
+        session = SessionStore()
+        session['employee'] = {'employeeId': employee_id}
+        session.create()
+        tokens[i] = issue_bid_token(employee_id, session.session_key)
+    return tokens
+
+
+def bid_task(user_index, route='classic', token=None, amount=30000):
     # API endpoint
-    url = f"{BASE_URL}/zh-hant/api/bids/"
-    
+    url = f"{BASE_URL}{ROUTES[route]}"
+
     bidder_id = f"NET_STRESS_{user_index:03d}"
     # ULTIMATE COLLISION: All users bid EXACTLY 30000 at the same time
     payload = {
         "productId": PRODUCT_ID,
-        "amount": 30000, 
+        "amount": amount,
         "employeeId": bidder_id
     }
-    
+
     headers = {
         "Content-Type": "application/json"
     }
+    if token:
+        headers["X-Bid-Token"] = token
 
     start = time.time()
     try:
@@ -48,27 +84,60 @@ def bid_task(user_index):
             "time": time.time() - start
         }
 
-def run_network_test():
-    print(f"🚀 Launching NETWORK STRESS TEST on {BASE_URL}")
-    print(f"🔥 Targets: {PLAYERS} concurrent bidders on Product {PRODUCT_ID}")
-    
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_network_test(route='classic', rounds=1, tokens=None, amount=30000):
+    print(f"🚀 Launching NETWORK STRESS TEST on {BASE_URL}{ROUTES[route]}")
+    print(f"🔥 Targets: {PLAYERS} concurrent bidders x {rounds} rounds on Product {PRODUCT_ID}")
+
     results = []
     start_all = time.time()
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=PLAYERS) as executor:
-        futures = [executor.submit(bid_task, i) for i in range(PLAYERS)]
-        for future in concurrent.futures.as_completed(futures):
-            results.append(future.result())
+        for r in range(rounds):
+            # Every round collides again one step higher, so each round has one winner
+            futures = [
+                executor.submit(bid_task, i, route, (tokens or {}).get(i), amount + r)
+                for i in range(PLAYERS)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                results.append(future.result())
 
     duration = time.time() - start_all
     success = [r for r in results if r['status'] == 200 and r.get('data', {}).get('success')]
     biz_fail = [r for r in results if r['status'] == 400]
-    sys_fail = [r for r in results if r['status'] == 500 or r['status'] == "ERROR"]
+    sys_fail = [r for r in results if r['status'] not in (200, 400)]
 
     print(f"RESULTS: Success={len(success)}, BizDeny={len(biz_fail)}, Error={len(sys_fail)}, Time={duration:.2f}s")
+    times = [r['time'] * 1000 for r in results]
+    print(f"LATENCY ({route}): p50={percentile(times, 50):.1f}ms  p99={percentile(times, 99):.1f}ms  max={max(times):.1f}ms")
     if success:
         last_success = max(success, key=lambda x: x['data'].get('amount', 0))
         print(f"WINNER: {last_success['user']} @ ${last_success['data'].get('amount')}")
+    return times
+
 
 if __name__ == "__main__":
-    run_network_test()
+    parser = argparse.ArgumentParser(description='Concurrent bids against a running server')
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--product', type=int, default=PRODUCT_ID)
+    parser.add_argument('--players', type=int, default=PLAYERS)
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--amount', type=int, default=30000, help='amount of the first round')
+    parser.add_argument('--route', choices=['classic', 'fast', 'both'], default='classic')
+    args = parser.parse_args()
+    BASE_URL, PRODUCT_ID, PLAYERS = args.base_url.rstrip('/'), args.product, args.players
+
+    if args.route in ('fast', 'both'):
+        tokens = bid_tokens(PLAYERS)
+    amount = args.amount
+    for route in (['classic', 'fast'] if args.route == 'both' else [args.route]):
+        run_network_test(route, args.rounds, tokens if route == 'fast' else None, amount)
+        amount += args.rounds
+        print()